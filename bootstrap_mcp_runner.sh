@@ -14,6 +14,7 @@ REPO_PATH="$SCRIPT_DIR"
 APIMESH_DIR=""
 VENV_DIR=""
 CLONE_DIR=""
+EXTRA_ARGS=()
 
 need() { command -v "$1" >/dev/null 2>&1 || { echo "Missing dependency: $1" >&2; exit 2; }; }
 need bash; need git; need curl; need python3; need pip3
@@ -24,6 +25,8 @@ while [[ $# -gt 0 ]]; do
     --openai-api-key)  OPENAI_API_KEY="${2:-null}";  shift 2 ;;
     --ai-chat-id)      AI_CHAT_ID="${2:-null}";      shift 2 ;;
     --repo-path)       REPO_PATH="${2:-$REPO_PATH}"; shift 2 ;;
+    --resume)          EXTRA_ARGS+=("--resume");     shift ;;
+    --deadline-at)     EXTRA_ARGS+=("--deadline-at" "${2:-0}"); shift 2 ;;
     *) echo "Ignoring unknown arg: $1"; shift ;;
   esac
 done
@@ -115,6 +118,6 @@ export APIMESH_OUTPUT_FILEPATH="$APIMESH_DIR/swagger.json"
 
 
 cd "$REPO_DIR"
-python3 -m swagger_generation_cli "$OPENAI_API_KEY" "$PROJECT_API_KEY" "$AI_CHAT_ID" true
+python3 -m swagger_generation_cli "$OPENAI_API_KEY" "$PROJECT_API_KEY" "$AI_CHAT_ID" true ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"}
 
 exit 0
@@ -1,28 +1,135 @@
 import os
+import re
+import threading
+from pathlib import PurePath
+from types import MappingProxyType
+
 import yaml
 
+# One validated snapshot per (path, mtime) of config.yml, shared by every
+# module, so the file is read and parsed once per process.
+_SNAPSHOTS = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def _reset_snapshots_lock():
+    # Forked metadata workers load configuration on their first lazy import.
+    global _SNAPSHOTS_LOCK
+    _SNAPSHOTS_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_snapshots_lock)
+
+
+class PathMatcher:
+    """Ignored directory names, matched against path components."""
+
+    __slots__ = ("names",)
+
+    def __init__(self, names):
+        self.names = frozenset(names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def is_ignored(self, path):
+        """True if any component of ``path`` (str, os.sep-separated, or PurePath) is ignored."""
+        parts = path.parts if isinstance(path, PurePath) else str(path).split(os.sep)
+        return not self.names.isdisjoint(parts)
+
+    def prune(self, dirs):
+        """Entries of ``dirs`` to keep descending into, for ``os.walk``."""
+        return [name for name in dirs if name not in self.names]
+
+
+def _compile_routing_patterns(patterns_map):
+    """
+    One regex per framework, alternating its routing patterns, so a file is
+    scanned once instead of once per pattern.
+    """
+    compiled = {}
+    for framework, patterns in patterns_map.items():
+        patterns = list(patterns or [])
+        try:
+            for pattern in patterns:
+                re.compile(pattern)
+        except re.error as exc:
+            raise ValueError(f"Invalid routing pattern for '{framework}' in config.yml: {exc}") from exc
+        compiled[framework] = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+    return MappingProxyType(compiled)
+
+
+def _section(config, name):
+    value = config.get(name) or {}
+    if not isinstance(value, dict):
+        raise ValueError(f"'{name}' in config.yml must be a mapping")
+    return MappingProxyType(value)
+
 
 class Configurations:
-    def __init__(self):
-        # Get config path from environment variable
-        config_path = os.environ.get("APIMESH_CONFIG_PATH")
+    """Read-only settings from config.yml; use ``get_configurations()`` to share one instance."""
+
+    def __init__(self, config_path=None):
         if config_path is None:
-            raise ValueError(
-                "APIMESH_CONFIG_PATH environment variable is not set. "
-                "Please set it to the path of your config.yml file."
-            )
-        
+            config_path = _config_path()
+
         # Load YAML configurations
-        self.config = self._load_config(config_path)
+        self.config = MappingProxyType(self._load_config(config_path))
 
         # Assign values from the YAML file
-        self.ignored_dirs = set(self.config.get("ignored_dirs", []))
-        self.routing_patters_map = self.config.get("routing_patterns_map", {})
+        self.ignored_dirs = frozenset(self.config.get("ignored_dirs", []) or [])
+        self.ignored_paths = PathMatcher(self.ignored_dirs)
+        self.routing_patters_map = _section(self.config, "routing_patterns_map")
+        self.routing_patterns = _compile_routing_patterns(self.routing_patters_map)
         self.gpt_4o_model_name = self.config.get("gpt_4o_model_name", "gpt-4o")
+        self.metadata_workers = int(self.config.get("metadata_workers", 0) or 0)
+        self.metadata_file_timeout_seconds = float(self.config.get("metadata_file_timeout_seconds", 60) or 0)
+        self.metadata_max_file_bytes = int(self.config.get("metadata_max_file_bytes", 5_000_000) or 0)
+        self.metadata_worker_memory_mb = int(self.config.get("metadata_worker_memory_mb", 2048) or 0)
+        self.endpoint_workers = int(self.config.get("endpoint_workers", 5) or 5)
+        self.endpoint_retry_attempts = int(self.config.get("endpoint_retry_attempts", 1) or 0)
+        self.endpoint_queue_size = int(self.config.get("endpoint_queue_size", 256) or 256)
+        self.file_cache_max_mb = int(self.config.get("file_cache_max_mb", 256) or 0)
+        self.run_deadline_seconds = float(self.config.get("run_deadline_seconds", 0) or 0)
+        self.run_budget = _section(self.config, "run_budget")
+        self.plan = _section(self.config, "plan")
+        self.scope = _section(self.config, "scope")
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Configurations are read-only; cannot set '{name}'")
+        super().__setattr__(name, value)
 
-    def _load_config(self, config_path):
+    @staticmethod
+    def _load_config(config_path):
         """Loads configuration from a YAML file."""
         with open(config_path, "r", encoding="utf-8") as file:
             config = yaml.safe_load(file)
-            return config if config is not None else {}
+        config = config if config is not None else {}
+        if not isinstance(config, dict):
+            raise ValueError(f"{config_path} must contain a YAML mapping")
+        return config
+
+
+def _config_path():
+    # Get config path from environment variable
+    config_path = os.environ.get("APIMESH_CONFIG_PATH")
+    if config_path is None:
+        raise ValueError(
+            "APIMESH_CONFIG_PATH environment variable is not set. "
+            "Please set it to the path of your config.yml file."
+        )
+    return config_path
+
 
+def get_configurations():
+    """The shared ``Configurations`` for APIMESH_CONFIG_PATH, reloaded only when the file changes."""
+    config_path = _config_path()
+    key = (os.path.abspath(config_path), os.stat(config_path).st_mtime_ns)
+    with _SNAPSHOTS_LOCK:
+        configurations = _SNAPSHOTS.get(key)
+        if configurations is None:
+            configurations = Configurations(config_path)
+            _SNAPSHOTS[key] = configurations
+        return configurations
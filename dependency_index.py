@@ -0,0 +1,123 @@
+"""
+Line-range lookups over a file's extracted metadata.
+
+Building the context of an endpoint asks which calls and import usages of
+its file fall inside the handler's line range. ``FileDependencyIndex`` keeps
+them sorted by line, so each question is a bisection rather than a scan of
+the whole file's metadata, and ``load_file_metadata`` builds the document and
+its index once per metadata file instead of once per endpoint.
+"""
+
+import json
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+_MAX_CACHED_FILES = 256
+
+
+class LineRangeIndex:
+    """Positions of entries keyed by line number, looked up by line range."""
+
+    __slots__ = ("lines", "positions")
+
+    def __init__(self, keyed: Iterable[Tuple[int, int]]):
+        pairs = sorted(keyed)
+        self.lines = array("q", [line for line, _ in pairs])
+        self.positions = array("q", [position for _, position in pairs])
+
+    def positions_within(self, start_line: int, end_line: int) -> List[int]:
+        """Positions keyed by a line in ``start_line..end_line``, in position order."""
+        low = bisect_left(self.lines, start_line)
+        high = bisect_right(self.lines, end_line)
+        return sorted(self.positions[low:high])
+
+
+class FileDependencyIndex:
+    """
+    Calls, definitions and import usages of one metadata document
+    (``{"elements": {"functions", "function_calls"}, "imports"}``).
+
+    Returned entries are the document's own dicts and must not be modified.
+    """
+
+    __slots__ = ("function_names", "functions_by_name", "_calls", "_call_index",
+                 "_imports", "_usage_index")
+
+    def __init__(self, data: Dict):
+        elements = data.get("elements", {})
+        functions = elements.get("functions", [])
+        self.function_names = frozenset(function.get("name") for function in functions)
+        self.functions_by_name: Dict[str, List[Dict]] = {}
+        for function in functions:
+            self.functions_by_name.setdefault(function.get("name"), []).append(function)
+        for candidates in self.functions_by_name.values():
+            candidates.sort(key=lambda function: function.get("start_line", 0))
+
+        self._calls = elements.get("function_calls", [])
+        self._call_index = LineRangeIndex(
+            (call.get("start_line"), position)
+            for position, call in enumerate(self._calls)
+            if isinstance(call.get("start_line"), int)
+        )
+        # Node.js metadata keeps its imports with the other elements.
+        self._imports = data["imports"] if "imports" in data else elements.get("imports", [])
+        self._usage_index = LineRangeIndex(
+            (line, position)
+            for position, item in enumerate(self._imports)
+            for line in item.get("usage_lines") or []
+            if isinstance(line, int)
+        )
+
+    def calls_starting_within(self, start_line: int, end_line: int) -> List[Dict]:
+        """Calls whose first line is in ``start_line..end_line``, in document order."""
+        return [self._calls[position] for position in self._call_index.positions_within(start_line, end_line)]
+
+    def imports_used_within(self, start_line: int, end_line: int) -> List[Tuple[Dict, int]]:
+        """``(import, usages in range)`` for imports used in ``start_line..end_line``, in document order."""
+        counts: "OrderedDict[int, int]" = OrderedDict()
+        for position in self._usage_index.positions_within(start_line, end_line):
+            counts[position] = counts.get(position, 0) + 1
+        return [(self._imports[position], count) for position, count in counts.items()]
+
+
+_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], Dict, FileDependencyIndex]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _reset_lock() -> None:
+    # Metadata workers are forked while executor threads may hold the lock.
+    global _CACHE_LOCK
+    _CACHE_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_lock)
+
+
+def load_file_metadata(json_path: str) -> Tuple[Dict, FileDependencyIndex]:
+    """
+    The metadata document at ``json_path`` and its index, shared until the
+    file changes. Raises OSError or ValueError like ``json.load``; the
+    document must not be modified.
+    """
+    json_path = os.path.abspath(json_path)
+    stat = os.stat(json_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(json_path)
+        if cached is not None and cached[0] == signature:
+            _CACHE.move_to_end(json_path)
+            return cached[1], cached[2]
+
+    with open(json_path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    index = FileDependencyIndex(data)
+    with _CACHE_LOCK:
+        _CACHE[json_path] = (signature, data, index)
+        _CACHE.move_to_end(json_path)
+        while len(_CACHE) > _MAX_CACHED_FILES:
+            _CACHE.popitem(last=False)
+    return data, index
@@ -5,6 +5,7 @@ set -e
 PROJECT_API_KEY="${PROJECT_API_KEY:-null}"
 OPENAI_API_KEY="${OPENAI_API_KEY:-null}"
 AI_CHAT_ID="${AI_CHAT_ID:-null}"
+EXTRA_ARGS=()
 
 # Parse command line arguments
 while [[ $# -gt 0 ]]; do
@@ -21,6 +22,10 @@ while [[ $# -gt 0 ]]; do
       AI_CHAT_ID="$2"
       shift 2
       ;;
+    --resume)
+      EXTRA_ARGS+=("--resume")
+      shift
+      ;;
     --help)
       echo "Swagger Generator Docker Image"
       echo ""
@@ -53,6 +58,7 @@ while [[ $# -gt 0 ]]; do
       echo "  --project-api-key   - Override PROJECT_API_KEY env var"
       echo "  --openai-api-key    - Override OPENAI_API_KEY env var"
       echo "  --ai-chat-id        - Override AI_CHAT_ID env var"
+      echo "  --resume            - Continue an interrupted run from its checkpoint journal"
       echo ""
       echo "Note: Always run docker commands from your repository directory. Use -it flags for interactive mode."
       exit 0
@@ -83,4 +89,4 @@ fi
 cd /app
 export PYTHONPATH=/app:$PYTHONPATH
 
-python3 swagger_generation_cli.py "$OPENAI_API_KEY" "$PROJECT_API_KEY" "$AI_CHAT_ID"
\ No newline at end of file
+python3 swagger_generation_cli.py "$OPENAI_API_KEY" "$PROJECT_API_KEY" "$AI_CHAT_ID" "" ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"}
\ No newline at end of file
@@ -0,0 +1,515 @@
+"""
+Per-endpoint Swagger generation shared by the language pipelines.
+
+Every endpoint is generated independently on a bounded thread pool. A failing
+endpoint (an LLM error, an unparsable response, a missing metadata file) is
+recorded and retried on its own instead of aborting the pipeline, so one bad
+response no longer discards every fragment that already succeeded. Completed
+fragments can be checkpointed to a journal so an interrupted run resumes
+where it stopped.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from config import get_configurations
+from run_budget import BudgetExceeded, budget_exhausted, get_run_budget
+from run_context import bind
+from run_deadline import RunLimitExceeded, deadline_expired, get_run_deadline, mark_incomplete
+from run_progress import get_run_progress
+from utils import get_file_churn
+
+config = get_configurations()
+
+FAILED_ENDPOINTS_KEY = "x-apimesh-failed-endpoints"
+
+_IDENTITY_FIELDS = ("route", "http_method", "name", "file_path", "start_line")
+
+
+def describe_endpoint(method_info: Dict) -> Dict:
+    """Return the identifying fields of an endpoint job."""
+    return {field: method_info[field] for field in _IDENTITY_FIELDS if method_info.get(field) is not None}
+
+
+def endpoint_key(method_info: Dict) -> str:
+    """Stable identity of an endpoint job, used to key the checkpoint journal."""
+    identity = describe_endpoint(method_info)
+    if "http_method" not in identity and method_info.get("method"):
+        identity["http_method"] = method_info["method"]
+    encoded = json.dumps(identity, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class EndpointJournal:
+    """
+    Append-only JSON-lines checkpoint of generated endpoint fragments.
+
+    The first line records the commit the run was started against; every
+    following line is ``{"key", "endpoint", "fragment"}`` for one completed
+    endpoint. A run killed mid-write leaves at most one truncated trailing
+    line, which is ignored on replay.
+    """
+
+    def __init__(self, path: str, commit_reference: Optional[str] = None, resume: bool = False):
+        self.path = path
+        self.commit_reference = commit_reference
+        self.completed: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if resume:
+            self.completed = self._replay()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.completed:
+            self._handle = open(path, "a", encoding="utf-8")
+        else:
+            self._handle = open(path, "w", encoding="utf-8")
+            self._write({"commit_reference": commit_reference})
+
+    def _replay(self) -> Dict[str, Dict]:
+        completed: Dict[str, Dict] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                lines = handle.readlines()
+        except OSError:
+            return completed
+        if not lines:
+            return completed
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return completed
+        if header.get("commit_reference") != self.commit_reference:
+            print("Checkpoint journal was written for a different commit; starting from scratch")
+            return completed
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+                completed[entry["key"]] = entry["fragment"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        print(f"Resuming with {len(completed)} endpoints from {self.path}")
+        return completed
+
+    def _write(self, entry: Dict) -> None:
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+
+    def get(self, method_info: Dict) -> Optional[Dict]:
+        return self.completed.get(endpoint_key(method_info))
+
+    def record(self, method_info: Dict, fragment: Dict) -> None:
+        key = endpoint_key(method_info)
+        with self._lock:
+            self.completed[key] = fragment
+            self._write({"key": key, "endpoint": describe_endpoint(method_info), "fragment": fragment})
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.close()
+
+    def discard(self) -> None:
+        """Remove the journal once its run has been saved."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _validate_fragment(fragment) -> Dict:
+    if not isinstance(fragment, dict) or not isinstance(fragment.get("paths"), dict) or not fragment["paths"]:
+        raise ValueError("Swagger response did not contain any paths.")
+    return fragment
+
+
+def _deadline_reason() -> str:
+    deadline = get_run_deadline()
+    return "cancelled" if deadline is not None and deadline.cancelled else "deadline reached"
+
+
+def _skip_reason(exc: Optional[BaseException] = None) -> str:
+    if isinstance(exc, BudgetExceeded) or (exc is None and budget_exhausted()):
+        return "budget exhausted"
+    return _deadline_reason()
+
+
+def _route_priority(route: str) -> int:
+    segments = {segment.lower() for segment in str(route or "").strip("/").split("/") if segment}
+    return 1 if segments & set(config.run_budget.get("low_priority_route_segments", [])) else 0
+
+
+def prioritize_endpoints(endpoint_jobs: Sequence[Dict], indexes: Sequence[int]) -> List[int]:
+    """
+    Order endpoint indexes so that, under a tight budget, the most important
+    endpoints are admitted first: public routes before admin/internal/debug
+    ones, then handlers in frequently changed files, then shallower routes.
+    """
+    churn = get_file_churn()
+
+    def _key(index: int):
+        job = endpoint_jobs[index]
+        route = job.get("route") or ""
+        return (
+            _route_priority(route),
+            -churn.get(str(job.get("file_path") or ""), 0),
+            route.count("/"),
+            index,
+        )
+
+    return sorted(indexes, key=_key)
+
+
+def _admit(generate: Callable[[Dict], Dict], method_info: Dict) -> Dict:
+    deadline = get_run_deadline()
+    if deadline is not None:
+        deadline.check()
+    return generate(method_info)
+
+
+class EndpointGeneration:
+    """
+    Incremental per-endpoint generation on a bounded thread pool.
+
+    Jobs are registered with ``add`` in discovery order and started with
+    ``start`` whenever their inputs are ready, so generation can begin while
+    later endpoints are still being identified. Each fragment is handed to
+    ``on_fragment(index, fragment)`` as soon as it is validated. ``finish``
+    waits for the outstanding work, retries the failed jobs and returns the
+    results. When a budget is enforced, started jobs are held until
+    ``finish`` so they can be admitted in priority order.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[Dict], Dict],
+        max_workers: Optional[int] = None,
+        retry_attempts: Optional[int] = None,
+        journal: Optional[EndpointJournal] = None,
+        on_fragment: Optional[Callable[[int, Dict], None]] = None,
+    ):
+        self.generate = generate
+        self.max_workers = max_workers if max_workers is not None else config.endpoint_workers
+        self.retry_attempts = retry_attempts if retry_attempts is not None else config.endpoint_retry_attempts
+        self.journal = journal
+        self.on_fragment = on_fragment
+        self.jobs: List[Dict] = []
+        self.fragments: List[Optional[Dict]] = []
+        self.errors: Dict[int, str] = {}
+        self.skipped: Dict[int, str] = {}
+        budget = get_run_budget()
+        self._hold = budget is not None and budget.enabled
+        self._held: List[int] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[Future, int] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._completed = 0
+        self._start_time = time.time()
+        self._latest_message = ""
+        self._succeeded = 0
+        self._progress = get_run_progress()
+
+    def _report_progress(self) -> None:
+        if self._progress is not None:
+            self._progress.update_endpoints(len(self.jobs), self._succeeded, len(self.errors), len(self.skipped))
+
+    def add(self, job: Dict) -> Optional[int]:
+        """Register a job; returns its index, or None when the journal already has its fragment."""
+        index = len(self.jobs)
+        self.jobs.append(job)
+        replayed = self.journal.get(job) if self.journal is not None else None
+        self.fragments.append(replayed)
+        if replayed:
+            self._succeeded += 1
+            if self.on_fragment is not None:
+                self.on_fragment(index, replayed)
+            self._report_progress()
+            return None
+        self._report_progress()
+        return index
+
+    def start(self, index: int) -> None:
+        if self._hold:
+            self._held.append(index)
+        else:
+            self._submit(index)
+
+    def _submit(self, index: int) -> None:
+        if deadline_expired() or budget_exhausted():
+            with self._lock:
+                self.skipped[index] = _skip_reason()
+            self._report_progress()
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        with self._lock:
+            future = self._executor.submit(bind(_admit), self.generate, self.jobs[index])
+            self._futures[future] = index
+        future.add_done_callback(bind(self._on_done))
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            index = self._futures.get(future)
+        if index is None or future.cancelled():
+            # Abandoned at the deadline.
+            return
+        fragment = None
+        error = None
+        try:
+            fragment = _validate_fragment(future.result())
+        except Exception as exc:
+            error = exc
+        with self._idle:
+            if future not in self._futures:
+                return
+            if fragment is not None:
+                self.fragments[index] = fragment
+                self.errors.pop(index, None)
+                self._succeeded += 1
+            elif isinstance(error, RunLimitExceeded) or deadline_expired():
+                self.skipped[index] = _skip_reason(error)
+                self.errors.pop(index, None)
+            else:
+                self.errors[index] = f"{type(error).__name__}: {error}"
+        if fragment is not None:
+            if self.journal is not None:
+                self.journal.record(self.jobs[index], fragment)
+            if self.on_fragment is not None:
+                self.on_fragment(index, fragment)
+        with self._idle:
+            # Only now is the job settled for ``_wait``.
+            self._futures.pop(future, None)
+            self._completed += 1
+            self._latest_message = (
+                f"Completed generating endpoint related information for {self._completed} endpoints in "
+                f"{int(time.time() - self._start_time)} seconds"
+            )
+            print(self._latest_message, end="\r", flush=True)
+            self._idle.notify_all()
+        self._report_progress()
+
+    def _wait(self) -> None:
+        """Wait for the submitted jobs; at the deadline, abandon the ones still running."""
+        deadline = get_run_deadline()
+        with self._idle:
+            while self._futures:
+                timeout = deadline.remaining() if deadline is not None else None
+                if timeout is not None and timeout <= 0:
+                    break
+                self._idle.wait(timeout)
+            # Deadline reached: in-flight HTTP calls are already bounded by it.
+            for index in self._futures.values():
+                self.skipped[index] = _deadline_reason()
+                self.errors.pop(index, None)
+            self._futures.clear()
+
+    def finish(self) -> Tuple[List[Optional[Dict]], List[Dict], List[Dict]]:
+        """
+        Wait for every started job and retry only the jobs that failed.
+        Returns the fragments in job order (None where a job never
+        succeeded), the failed endpoints with their last error, and the
+        endpoints skipped because the run deadline or budget was reached.
+        """
+        try:
+            if self._held:
+                held, self._held = self._held, []
+                for index in prioritize_endpoints(self.jobs, held):
+                    self._submit(index)
+            self._wait()
+            attempt = 1
+            pending = sorted(self.errors)
+            while pending and attempt <= self.retry_attempts and not deadline_expired() and not budget_exhausted():
+                if self._completed:
+                    print(self._latest_message)
+                print(f"Retrying {len(pending)} failed endpoints (attempt {attempt} of {self.retry_attempts})")
+                self._completed = 0
+                self._start_time = time.time()
+                for index in pending:
+                    self._submit(index)
+                self._wait()
+                pending = sorted(self.errors)
+                attempt += 1
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=not deadline_expired(), cancel_futures=True)
+        if self._completed:
+            print(self._latest_message)
+        if deadline_expired() or budget_exhausted():
+            for index, fragment in enumerate(self.fragments):
+                if fragment is None and index not in self.errors and index not in self.skipped:
+                    self.skipped[index] = _skip_reason()
+        self._report_progress()
+
+        failed = []
+        for index in sorted(self.errors):
+            if index in self.skipped:
+                continue
+            entry = describe_endpoint(self.jobs[index])
+            entry["error"] = self.errors[index]
+            failed.append(entry)
+        skipped_endpoints = []
+        for index in sorted(self.skipped):
+            entry = describe_endpoint(self.jobs[index])
+            entry["reason"] = self.skipped[index]
+            skipped_endpoints.append(entry)
+        return self.fragments, failed, skipped_endpoints
+
+
+def generate_endpoint_fragments(
+    endpoint_jobs: Sequence[Dict],
+    generate: Callable[[Dict], Dict],
+    max_workers: Optional[int] = None,
+    retry_attempts: Optional[int] = None,
+    journal: Optional[EndpointJournal] = None,
+) -> Tuple[List[Optional[Dict]], List[Dict], List[Dict]]:
+    """
+    Run ``generate(job)`` for every endpoint job; see ``EndpointGeneration``.
+
+    Endpoints already present in ``journal`` are replayed instead of
+    regenerated, and every newly generated fragment is appended to it.
+    """
+    generation = EndpointGeneration(generate, max_workers, retry_attempts, journal)
+    for job in endpoint_jobs:
+        index = generation.add(job)
+        if index is not None:
+            generation.start(index)
+    return generation.finish()
+
+
+class FragmentMerger:
+    """
+    Merge endpoint fragments into the spec as they complete. Each operation
+    keeps the fragment of the latest endpoint in discovery order, so the
+    result matches an in-order merge whatever order fragments arrive in.
+    ``merge(target, fragment)`` is the pipeline's own merge function.
+    """
+
+    def __init__(self, swagger: Dict, merge: Callable[[Dict, Dict], None]):
+        self.swagger = swagger
+        self._merge = merge
+        self._owners: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, index: int, fragment: Dict) -> None:
+        staged: Dict = {"paths": {}}
+        self._merge(staged, fragment)
+        with self._lock:
+            paths = self.swagger.setdefault("paths", {})
+            for path_key, operations in staged["paths"].items():
+                target = paths.setdefault(path_key, {})
+                for method, payload in operations.items():
+                    if self._owners.get((path_key, method), -1) <= index:
+                        target[method] = payload
+                        self._owners[(path_key, method)] = index
+
+
+def record_failed_endpoints(swagger: Dict, failed: List[Dict], skipped: Optional[List[Dict]] = None) -> Dict:
+    """Attach the failed and skipped endpoints to the spec and report them."""
+    if skipped:
+        mark_incomplete(swagger, ", ".join(sorted({entry["reason"] for entry in skipped})), skipped)
+    if not failed:
+        return swagger
+    swagger[FAILED_ENDPOINTS_KEY] = failed
+    print(f"Failed to generate {len(failed)} endpoints:")
+    for entry in failed:
+        label = " ".join(str(entry[field]) for field in ("http_method", "route") if field in entry)
+        print(f"  - {label or entry.get('name', '<unknown>')}: {entry['error']}")
+    return swagger
+
+
+class StaticDiscovery:
+    """
+    What a language pipeline learned before handing off or failing: the API
+    files it parsed, the endpoints it identified and the repository files
+    those endpoints reference. The fallback procedure uses this to avoid
+    re-extracting endpoints and embedding the whole repository.
+    """
+
+    def __init__(self):
+        self.api_files: Set[str] = set()
+        self.endpoints: List[Dict] = []
+        self.identified: List[Dict] = []
+        self.referenced_files: Set[str] = set()
+        self._unseeded_files: Set[str] = set()
+        self._unresolved_files: Set[str] = set()
+
+    def record_api_files(self, api_files: Iterable) -> None:
+        self.api_files.update(str(path) for path in api_files)
+
+    def record_endpoint(self, job: Dict) -> None:
+        """Record an identified endpoint as soon as it is known, so a later failure keeps it."""
+        self.identified.append(job)
+        file_path = job.get("file_path")
+        if not file_path:
+            return
+        source_files = {file_path, job.get("route_file") or file_path}
+        method = job.get("http_method") or job.get("method")
+        if not method:
+            # Without an HTTP method the endpoint cannot be seeded, so its
+            # files are left for the LLM extractor.
+            self._unseeded_files.update(source_files)
+            return
+        self.endpoints.append({
+            "method": method.upper(),
+            "path": job["route"],
+            "file_path": file_path,
+            "start_line": job.get("start_line"),
+            "end_line": job.get("end_line"),
+            "api_file": job.get("route_file") or file_path,
+        })
+        self._unresolved_files.update(source_files)
+
+    def resolve_references(self, metadata_path_for: Callable[[str], str]) -> None:
+        """
+        Add the files recorded endpoints reference, with their in-repo
+        imports. ``metadata_path_for`` maps a source file to its metadata
+        JSON, which must be written by now.
+        """
+        for source_file in self._unresolved_files:
+            self.referenced_files.add(source_file)
+            self.referenced_files.update(_imported_repo_files(metadata_path_for(source_file), source_file))
+        self._unresolved_files.clear()
+
+    @property
+    def handled_files(self) -> Set[str]:
+        files = set(self.api_files)
+        for endpoint in self.endpoints:
+            files.add(endpoint["file_path"])
+            files.add(endpoint["api_file"])
+        return files - self._unseeded_files
+
+    @property
+    def seed_endpoints(self) -> List[Dict]:
+        unseeded = self._unseeded_files
+        return [
+            endpoint for endpoint in self.endpoints
+            if endpoint["file_path"] not in unseeded and endpoint["api_file"] not in unseeded
+        ]
+
+
+def _imported_repo_files(metadata_path: str, source_file: str) -> Set[str]:
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return set()
+    files = set()
+    suffix = os.path.splitext(source_file)[1]
+    for item in data.get("imports", []):
+        origin = item.get("origin")
+        if not item.get("path_exists") or not origin:
+            continue
+        if os.path.isdir(origin):
+            # Go imports resolve to package directories.
+            files.update(
+                os.path.join(origin, name) for name in os.listdir(origin)
+                if name.endswith(suffix) and os.path.isfile(os.path.join(origin, name))
+            )
+        elif os.path.isfile(origin):
+            files.add(origin)
+    return files
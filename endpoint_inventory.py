@@ -0,0 +1,121 @@
+"""
+Static endpoint inventory and single-endpoint regeneration.
+
+In inventory mode the language pipelines run metadata extraction and
+endpoint identification but start no generation, so the endpoint list costs
+no LLM calls. Regeneration matches a stored operation, such as
+``GET /users/{id}``, to the identified endpoints that serve it, generates
+only those and patches their operations into the stored spec.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from endpoint_generation import FAILED_ENDPOINTS_KEY, describe_endpoint, endpoint_key
+from run_context import current_run
+from run_deadline import INCOMPLETE_KEY
+
+# Path parameters across frameworks: {id}, <int:id>, :id, *path and (?P<id>...).
+_PARAMETER_PATTERN = re.compile(r"\(\?P<[^>]+>[^)]*\)|<[^>]*>|\{[^}]*\}|:[A-Za-z_][A-Za-z0-9_]*|\*[A-Za-z_][A-Za-z0-9_]*")
+
+
+def set_inventory_mode(enabled: bool) -> None:
+    current_run().inventory_mode = enabled
+
+
+def inventory_mode() -> bool:
+    return current_run().inventory_mode
+
+
+def normalize_route_template(route: Optional[str]) -> str:
+    """Route with every path parameter replaced by ``{}``, so framework and OpenAPI paths compare equal."""
+    route = str(route or "").strip().lstrip("^").rstrip("$")
+    route = "/" + route.strip("/")
+    return _PARAMETER_PATTERN.sub("{}", route)
+
+
+def _endpoint_method(job: Dict) -> Optional[str]:
+    method = job.get("http_method") or job.get("method")
+    return str(method).upper() if method else None
+
+
+def inventory_entry(job: Dict, base_directory: Optional[str] = None) -> Dict:
+    """Describe an identified endpoint job for listing, keyed like the checkpoint journal."""
+    entry = describe_endpoint(job)
+    file_path = entry.get("file_path")
+    if file_path and base_directory and os.path.isabs(file_path):
+        entry["file_path"] = os.path.relpath(file_path, base_directory)
+    handler = job.get("handler_name") or job.get("name")
+    if job.get("class_name") and job.get("name"):
+        handler = f"{job['class_name']}#{job['name']}"
+    entry.pop("name", None)
+    entry.pop("http_method", None)
+    return {"method": _endpoint_method(job), "route": entry.pop("route", None), "handler": handler, **entry,
+            "key": endpoint_key(job)}
+
+
+def match_endpoints(inventory: Iterable[Dict], method: str, path: str) -> List[Dict]:
+    """Inventory entries serving ``method path``; entries without a known method match on the path alone."""
+    target = normalize_route_template(path)
+    method = method.upper()
+    return [
+        entry for entry in inventory
+        if normalize_route_template(entry.get("route")) == target and entry.get("method") in (None, method)
+    ]
+
+
+def _matches(entry: Dict, method: str, target: str) -> bool:
+    entry_method = entry.get("http_method") or entry.get("method")
+    if entry_method and str(entry_method).upper() != method:
+        return False
+    return normalize_route_template(entry.get("route") or entry.get("path")) == target
+
+
+def patch_spec(spec: Dict, regenerated: Dict, method: str, path: str) -> List[str]:
+    """
+    Replace the stored ``method path`` operation with the regenerated one and
+    clear the endpoint from the failed and skipped lists. Other methods in
+    ``regenerated``, e.g. from a handler that serves several, are ignored.
+    Returns the operations written, as ``METHOD path``; when there are none
+    the spec is left unchanged.
+    """
+    target = normalize_route_template(path)
+    method = method.upper()
+    operation = method.lower()
+    replacements = [
+        (path_key, operations[operation])
+        for path_key, operations in regenerated.get("paths", {}).items()
+        if operation in operations
+    ]
+    if not replacements:
+        return []
+
+    paths = spec.setdefault("paths", {})
+    for path_key in [key for key in paths if normalize_route_template(key) == target]:
+        paths[path_key].pop(operation, None)
+        if not paths[path_key]:
+            del paths[path_key]
+
+    updated = []
+    for path_key, payload in replacements:
+        paths.setdefault(path_key, {})[operation] = payload
+        updated.append(f"{method} {path_key}")
+    for section, items in regenerated.get("components", {}).items():
+        if isinstance(items, dict):
+            spec.setdefault("components", {}).setdefault(section, {}).update(items)
+
+    failed = [entry for entry in spec.get(FAILED_ENDPOINTS_KEY, []) if not _matches(entry, method, target)]
+    if failed:
+        spec[FAILED_ENDPOINTS_KEY] = failed
+    else:
+        spec.pop(FAILED_ENDPOINTS_KEY, None)
+    incomplete = spec.get(INCOMPLETE_KEY)
+    if isinstance(incomplete, dict):
+        skipped = [entry for entry in incomplete.get("skipped_endpoints", []) if not _matches(entry, method, target)]
+        if skipped:
+            incomplete["skipped_endpoints"] = skipped
+        else:
+            spec.pop(INCOMPLETE_KEY, None)
+            spec.get("info", {}).pop(INCOMPLETE_KEY, None)
+    return updated
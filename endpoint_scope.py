@@ -0,0 +1,180 @@
+"""
+Include/exclude filters that restrict a run to part of an API.
+
+Filters are applied to the endpoints the static pipelines identify, before
+any context is built or LLM call is made, so out-of-scope routes cost
+nothing. Routes match by prefix (``/v2/public``) or glob (``/v2/*/users/**``),
+source files by glob relative to the repository root, and handlers by glob
+against the handler name, its class or controller, and ``Controller#action``.
+Endpoints can also be selected exactly by their checkpoint journal key. An
+endpoint is kept when it matches every include list that is set and no
+exclude list.
+"""
+
+import fnmatch
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence
+
+from endpoint_generation import endpoint_key
+from run_context import current_run
+
+_GLOB_CHARS = set("*?[")
+
+
+def _glob_to_regex(pattern: str) -> Pattern:
+    """Translate a path glob where ``*`` stays within a segment and ``**`` spans segments."""
+    parts = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("/**", index) and index + 3 == len(pattern):
+            parts.append("(?:/.*)?")
+            index += 3
+        elif pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            parts.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            parts.append("[^/]")
+            index += 1
+        else:
+            parts.append(re.escape(pattern[index]))
+            index += 1
+    return re.compile("^" + "".join(parts) + "$")
+
+
+def _normalize_route(route: str) -> str:
+    route = "/" + str(route).strip().lstrip("/")
+    return route.rstrip("/") or "/"
+
+
+class _RouteMatcher:
+    def __init__(self, pattern: str):
+        self.pattern = _normalize_route(pattern)
+        self.regex = _glob_to_regex(self.pattern) if _GLOB_CHARS & set(self.pattern) else None
+
+    def matches(self, route: str) -> bool:
+        route = _normalize_route(route)
+        if self.regex is not None:
+            return bool(self.regex.match(route))
+        return self.pattern == "/" or route == self.pattern or route.startswith(self.pattern + "/")
+
+
+class EndpointScope:
+    def __init__(
+        self,
+        include_routes: Sequence[str] = (),
+        exclude_routes: Sequence[str] = (),
+        include_files: Sequence[str] = (),
+        exclude_files: Sequence[str] = (),
+        include_handlers: Sequence[str] = (),
+        exclude_handlers: Sequence[str] = (),
+        include_endpoints: Sequence[str] = (),
+    ):
+        self.include_routes = [_RouteMatcher(pattern) for pattern in include_routes or ()]
+        self.exclude_routes = [_RouteMatcher(pattern) for pattern in exclude_routes or ()]
+        self.include_files = [_glob_to_regex(pattern.strip("/")) for pattern in include_files or ()]
+        self.exclude_files = [_glob_to_regex(pattern.strip("/")) for pattern in exclude_files or ()]
+        self.include_handlers = list(include_handlers or ())
+        self.exclude_handlers = list(exclude_handlers or ())
+        self.include_endpoints = set(include_endpoints or ())
+
+    @property
+    def enabled(self) -> bool:
+        return any((
+            self.include_routes, self.exclude_routes,
+            self.include_files, self.exclude_files,
+            self.include_handlers, self.exclude_handlers,
+            self.include_endpoints,
+        ))
+
+    def admits_file(self, file_path: Optional[str], base_directory: Optional[str] = None) -> bool:
+        """Whether a source file passes the file filters; unknown files pass."""
+        return self._file_included(file_path, base_directory) and not self._file_excluded(file_path, base_directory)
+
+    @staticmethod
+    def _relative_file(file_path: str, base_directory: Optional[str]) -> str:
+        candidate = str(file_path)
+        if base_directory and os.path.isabs(candidate):
+            candidate = os.path.relpath(candidate, base_directory)
+        return candidate.replace(os.sep, "/")
+
+    def _file_included(self, file_path: Optional[str], base_directory: Optional[str]) -> bool:
+        if not file_path or not self.include_files:
+            return True
+        candidate = self._relative_file(file_path, base_directory)
+        return any(regex.match(candidate) for regex in self.include_files)
+
+    def _file_excluded(self, file_path: Optional[str], base_directory: Optional[str]) -> bool:
+        if not file_path or not self.exclude_files:
+            return False
+        candidate = self._relative_file(file_path, base_directory)
+        return any(regex.match(candidate) for regex in self.exclude_files)
+
+    def _admits_route(self, route: Optional[str]) -> bool:
+        if route is None:
+            return not self.include_routes
+        if self.include_routes and not any(matcher.matches(route) for matcher in self.include_routes):
+            return False
+        return not any(matcher.matches(route) for matcher in self.exclude_routes)
+
+    @staticmethod
+    def _handler_names(endpoint: Dict) -> List[str]:
+        names = [endpoint.get(field) for field in ("name", "handler_name", "handler_selector", "class_name")]
+        if endpoint.get("class_name") and endpoint.get("name"):
+            names.append(f"{endpoint['class_name']}#{endpoint['name']}")
+            names.append(f"{endpoint['class_name']}.{endpoint['name']}")
+        return [str(name) for name in names if name]
+
+    def _admits_handler(self, endpoint: Dict) -> bool:
+        if not (self.include_handlers or self.exclude_handlers):
+            return True
+        names = self._handler_names(endpoint)
+        matches = lambda patterns: any(fnmatch.fnmatchcase(name, pattern) for name in names for pattern in patterns)
+        if self.include_handlers and not matches(self.include_handlers):
+            return False
+        return not matches(self.exclude_handlers)
+
+    def admits(self, endpoint: Dict, base_directory: Optional[str] = None) -> bool:
+        if self.include_endpoints and endpoint_key(endpoint) not in self.include_endpoints:
+            return False
+        route = endpoint.get("route", endpoint.get("path"))
+        if not self._admits_route(route):
+            return False
+        # Include patterns select the handler's file (Go and Rails also record
+        # the router file); an excluded handler or router file rejects.
+        handler_file = endpoint.get("file_path") or endpoint.get("route_file")
+        if not self._file_included(handler_file, base_directory):
+            return False
+        if any(self._file_excluded(endpoint.get(field), base_directory) for field in ("file_path", "route_file")):
+            return False
+        return self._admits_handler(endpoint)
+
+    def filter(self, endpoints: Iterable[Dict], base_directory: Optional[str] = None) -> List[Dict]:
+        endpoints = list(endpoints)
+        if not self.enabled:
+            return endpoints
+        kept = [endpoint for endpoint in endpoints if self.admits(endpoint, base_directory)]
+        print(f"Scope filters kept {len(kept)} of {len(endpoints)} endpoints")
+        return kept
+
+
+def set_endpoint_scope(scope: Optional[EndpointScope]) -> None:
+    current_run().scope = scope
+
+
+def get_endpoint_scope() -> Optional[EndpointScope]:
+    return current_run().scope
+
+
+def apply_endpoint_scope(endpoints: Iterable[Dict], base_directory: Optional[str] = None) -> List[Dict]:
+    """Drop endpoints outside the active scope; everything passes when none is set."""
+    scope = current_run().scope
+    if scope is None:
+        return list(endpoints)
+    return scope.filter(endpoints, base_directory)
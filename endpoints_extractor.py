@@ -1,15 +1,35 @@
 import ast
 from llm_client import OpenAiClient
-from config import Configurations
+from config import get_configurations
+from file_cache import read_file_lines_or_none
+from run_context import bind
 import prompts
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
-config = Configurations()
+config = get_configurations()
 
 class EndpointsExtractor:
     def __init__(self):
         self.openai_client = OpenAiClient()
+        self.seeded_endpoints = []
+        self.seeded_files = set()
+
+    def seed(self, endpoints, handled_files):
+        """
+        Reuse endpoints a static pipeline already identified. Files in
+        ``handled_files`` are not sent to the LLM again.
+        """
+        self.seeded_endpoints = list(endpoints)
+        self.seeded_files = set(handled_files)
+
+    def extract_endpoints(self, api_files, framework):
+        all_endpoints = list(self.seeded_endpoints)
+        for file_path in api_files:
+            if file_path in self.seeded_files:
+                continue
+            all_endpoints.extend(self.extract_endpoints_with_gpt(file_path, framework))
+        return all_endpoints
 
     def extract_endpoints_with_gpt(self, file_path, framework):
         print("\n***************************************************")
@@ -81,11 +101,14 @@ class EndpointsExtractor:
             query = f"This is the Method: {endpoint['method']} and this is the Endpoint Path: {endpoint['path']} fetch the controller information for the endpoint."
             docs = faiss_vector_db.similarity_search(str(query), k=4)
             content_list = [doc.page_content.strip() for doc in docs]
+            handler_code = EndpointsExtractor._read_handler_code(endpoint)
+            if handler_code:
+                content_list.insert(0, handler_code)
             return {'method': endpoint['method'], 'path': endpoint['path'], 'info': content_list}
 
         endpoint_related_content = []
         with ThreadPoolExecutor(max_workers=8) as executor:
-            future_to_endpoint = {executor.submit(process_endpoint, endpoint): endpoint
+            future_to_endpoint = {executor.submit(bind(process_endpoint), endpoint): endpoint
                                   for endpoint in endpoints}
 
             for future in as_completed(future_to_endpoint):
@@ -97,3 +120,16 @@ class EndpointsExtractor:
                     end="\r")
 
         return endpoint_related_content
+
+    @staticmethod
+    def _read_handler_code(endpoint):
+        """Return the handler source for endpoints seeded from a static pipeline."""
+        file_path = endpoint.get('file_path')
+        start_line = endpoint.get('start_line')
+        if not file_path or not start_line:
+            return None
+        lines = read_file_lines_or_none(file_path)
+        if lines is None:
+            return None
+        end_line = endpoint.get('end_line') or start_line
+        return "".join(lines[start_line - 1:end_line]).strip() or None
@@ -1,7 +1,40 @@
 from langchain_text_splitters import RecursiveCharacterTextSplitter, Language
 from langchain.vectorstores import FAISS
-from llm_client import OpenAiClient
+from llm_client import EMBEDDING_MODEL, OpenAiClient
+from run_budget import BudgetExceeded, get_run_budget
 from utils import num_tokens_from_string
+from collections import OrderedDict
+import os
+import threading
+
+# Indexes built in this process, keyed by framework and the exact state of
+# the embedded files, so a long-running process does not re-embed an
+# unchanged repository.
+_INDEX_CACHE_SIZE = 4
+_INDEX_CACHE = OrderedDict()
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def _index_cache_key(file_paths, framework):
+    fingerprint = []
+    for path in file_paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        fingerprint.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return framework, tuple(fingerprint)
+
+
+def clear_index_cache(repo_path=None):
+    """Drop cached indexes, or only those built from files under ``repo_path``."""
+    with _INDEX_CACHE_LOCK:
+        if repo_path is None:
+            _INDEX_CACHE.clear()
+            return
+        prefix = os.path.join(os.path.abspath(repo_path), "")
+        for key in [key for key in _INDEX_CACHE if any(path.startswith(prefix) for path, _, _ in key[1])]:
+            del _INDEX_CACHE[key]
 
 
 class GenerateFaissIndex:
@@ -9,6 +42,14 @@ class GenerateFaissIndex:
         self.openai_client = OpenAiClient()
 
     def create_faiss_index(self, file_paths, framework):
+        cache_key = _index_cache_key(file_paths, framework)
+        with _INDEX_CACHE_LOCK:
+            cached = _INDEX_CACHE.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                _INDEX_CACHE.move_to_end(cache_key)
+        if cached is not None:
+            print("Reusing the embedding index from a previous run")
+            return cached
         if framework == "ruby_on_rails":
             text_splitter = RecursiveCharacterTextSplitter.from_language(
                 chunk_size=2000,
@@ -47,30 +88,45 @@ class GenerateFaissIndex:
         batch = []
         batch_meta = []
         batch_token_count = 0
+        budget = get_run_budget()
+
+        def _embed_batch():
+            if budget is not None:
+                budget.charge_embedding(EMBEDDING_MODEL, batch_token_count)
+            all_indices.append(FAISS.from_texts(batch, self.openai_client.embeddings, metadatas=batch_meta))
 
-        for text, meta in zip(texts, metadata):
-            tokens = num_tokens_from_string(text)
+        try:
+            for text, meta in zip(texts, metadata):
+                tokens = num_tokens_from_string(text)
 
-            # Start new batch if adding this text exceeds token limit
-            if batch_token_count + tokens > 290000:
-                index = FAISS.from_texts(batch, self.openai_client.embeddings, metadatas=batch_meta)
-                all_indices.append(index)
-                batch, batch_meta, batch_token_count = [], [], 0
+                # Start new batch if adding this text exceeds token limit
+                if batch_token_count + tokens > 290000:
+                    _embed_batch()
+                    batch, batch_meta, batch_token_count = [], [], 0
 
-            batch.append(text)
-            batch_meta.append(meta)
-            batch_token_count += tokens
+                batch.append(text)
+                batch_meta.append(meta)
+                batch_token_count += tokens
 
-        # Final batch
-        if batch:
-            index = FAISS.from_texts(batch, self.openai_client.embeddings, metadatas=batch_meta)
-            all_indices.append(index)
+            # Final batch
+            if batch:
+                _embed_batch()
+        except BudgetExceeded:
+            if not all_indices:
+                raise
+            print("Spend budget reached while embedding; using the partial index")
+            cache_key = None
 
         # Merge all indices
         final_index = all_indices[0]
         for idx in all_indices[1:]:
             final_index.merge_from(idx)
-        return FAISS.from_texts(texts, self.openai_client.embeddings, metadatas=metadata)
+        if cache_key is not None:
+            with _INDEX_CACHE_LOCK:
+                _INDEX_CACHE[cache_key] = final_index
+                while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+                    _INDEX_CACHE.popitem(last=False)
+        return final_index
 
     @staticmethod
     def get_authentication_related_information(faiss_vector_db):
@@ -0,0 +1,109 @@
+"""
+Source file contents shared by every pipeline.
+
+The context builders slice the same handler and dependency files many times
+per run, from several executor threads. ``read_file_lines`` loads each file
+once as a ``LineIndex`` and keeps it in a process-wide LRU cache bounded by
+an approximate byte budget (``file_cache_max_mb`` in config.yml), so large
+repositories no longer keep every file they touched resident. An entry is
+reused only while the file's mtime and size are unchanged.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import get_configurations
+from line_index import LineIndex
+
+config = get_configurations()
+
+
+class FileCache:
+    """Thread-safe LRU of ``LineIndex`` per file, bounded to ``max_bytes`` (0 disables caching)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], LineIndex, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_lines(self, file_path: str) -> LineIndex:
+        """The lines of ``file_path``; raises OSError like ``open``."""
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Read outside the lock so a slow disk does not stall other threads;
+        # two threads missing on the same file at once both read it.
+        lines = LineIndex(file_path)
+        size = lines.nbytes
+        if size > self.max_bytes:
+            return lines
+
+        with self._lock:
+            previous = self._entries.pop(file_path, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[file_path] = (signature, lines, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_FILE_CACHE = FileCache(config.file_cache_max_mb * 1024 * 1024)
+
+
+def _reset_lock() -> None:
+    # Metadata workers are forked while executor threads may hold the lock.
+    _FILE_CACHE._lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_lock)
+
+
+def get_file_cache() -> FileCache:
+    return _FILE_CACHE
+
+
+def read_file_lines(file_path: str) -> LineIndex:
+    """The lines of ``file_path`` from the shared cache; slice it like ``readlines()``."""
+    return _FILE_CACHE.get_lines(file_path)
+
+
+def read_file_lines_or_none(file_path: str) -> Optional[LineIndex]:
+    """Like ``read_file_lines``, but None when the file cannot be read."""
+    try:
+        return _FILE_CACHE.get_lines(file_path)
+    except OSError:
+        return None
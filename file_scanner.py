@@ -1,10 +1,9 @@
 import os
 from typing import List
-from config import Configurations
+from config import get_configurations
 from utils import get_repo_path
-import re
 
-config = Configurations()
+config = get_configurations()
 class FileScanner:
 
     def __init__(self):
@@ -19,7 +18,7 @@ class FileScanner:
         supported_extensions = ('.py', '.js', '.ts', '.java', '.rb', '.go')
 
         for root, dirs, files in os.walk(repo_path):
-            dirs[:] = [d for d in dirs if d not in config.ignored_dirs]
+            dirs[:] = config.ignored_paths.prune(dirs)
 
             if not self.should_process_directory(root):
                 continue
@@ -32,8 +31,8 @@ class FileScanner:
 
     @staticmethod
     def find_api_files(file_paths, framework):
-        patterns = config.routing_patters_map.get(framework)
-        if not patterns:
+        routing_pattern = config.routing_patterns.get(framework)
+        if routing_pattern is None:
             print(f"Warning: No routing patterns configured for framework '{framework or 'unknown'}'. Scanning all supported files.")
             return list(file_paths)
         api_files = []
@@ -41,7 +40,7 @@ class FileScanner:
             try:
                 with open(file_path, 'r', encoding='utf-8') as file:
                     content = file.read()
-                    if any(re.search(pattern, content) for pattern in patterns):
+                    if routing_pattern.search(content):
                         if framework == "ruby_on_rails":
                             if file_path.endswith('.rb'):
                                 api_files.append(file_path)
@@ -56,5 +55,4 @@ class FileScanner:
         """
         Check if a directory should be processed or ignored
         """
-        path_parts = dir_path.split(os.sep)
-        return not any(part in config.ignored_dirs for part in path_parts)
+        return not config.ignored_paths.is_ignored(dir_path)
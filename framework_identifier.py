@@ -1,21 +1,51 @@
 import json
-from config import Configurations
+from config import get_configurations
+from file_scanner import FileScanner
 from prompts import framework_identifier_prompt, framework_identifier_system_prompt
 from llm_client import OpenAiClient
 
 
+FRAMEWORK_EXTENSIONS = {
+    "ruby_on_rails": (".rb",),
+    "django": (".py",),
+    "flask": (".py",),
+    "fastapi": (".py",),
+    "express": (".js", ".ts"),
+    "laravel": (".php",),
+    "spring": (".java",),
+    "golang": (".go",),
+}
+
+
 class FrameworkIdentifier:
     def __init__(self):
-        self.config = Configurations()
+        self.config = get_configurations()
         self.openai_client = OpenAiClient()
 
 
-    def get_framework(self, file_paths):
+    def build_messages(self, file_paths):
         prompt = framework_identifier_prompt.format(file_paths = file_paths, frameworks = str(list(self.config.routing_patters_map.keys())))
-        messages = [
+        return [
             {"role": "system", "content": framework_identifier_system_prompt},
             {"role": "user", "content": prompt}
         ]
+
+    def guess_framework(self, file_paths):
+        """
+        Pick the framework whose routing patterns match the most files, without
+        calling the LLM. Used by dry-run planning.
+        """
+        best_framework, best_count = None, 0
+        for framework in self.config.routing_patters_map:
+            extensions = FRAMEWORK_EXTENSIONS.get(framework)
+            candidates = [path for path in file_paths if not extensions or str(path).endswith(extensions)]
+            count = len(FileScanner.find_api_files(candidates, framework))
+            if count > best_count:
+                best_framework, best_count = framework, count
+        return {"framework": best_framework}
+
+    def get_framework(self, file_paths):
+        messages = self.build_messages(file_paths)
         response_content = self.openai_client.call_chat_completion(messages=messages)
         start_index = response_content.find('{')
         end_index = response_content.rfind('}')
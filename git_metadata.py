@@ -0,0 +1,188 @@
+"""
+Git metadata read straight from the repository's ``.git``, without running
+git or changing the working directory.
+
+Understands ``.git`` files (worktrees and submodules), the ``commondir`` of
+linked worktrees, loose and packed refs, and ``url.<base>.insteadOf``
+rewrites of the origin URL. Results are cached per repository until HEAD,
+the refs or the git config change, so the several lookups of a run read the
+files once.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+_MAX_SYMREF_DEPTH = 10
+_SECTION_PATTERN = re.compile(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+_CACHE: Dict[str, Tuple[tuple, Dict[str, str]]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def find_git_dir(repo_path: str) -> Optional[str]:
+    """The git directory for ``repo_path`` or its nearest enclosing repository."""
+    directory = os.path.abspath(repo_path)
+    while True:
+        dot_git = os.path.join(directory, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            content = _read_text(dot_git) or ""
+            if content.startswith("gitdir:"):
+                git_dir = content[len("gitdir:"):].strip()
+                return os.path.normpath(os.path.join(directory, git_dir))
+            return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _common_dir(git_dir: str) -> str:
+    """Where refs and config live; differs from ``git_dir`` for linked worktrees."""
+    common_dir = (_read_text(os.path.join(git_dir, "commondir")) or "").strip()
+    return os.path.normpath(os.path.join(git_dir, common_dir)) if common_dir else git_dir
+
+
+def _packed_refs(common_dir: str) -> Dict[str, str]:
+    refs = {}
+    for line in (_read_text(os.path.join(common_dir, "packed-refs")) or "").splitlines():
+        if not line or line[0] in "#^":
+            continue
+        sha, _, name = line.partition(" ")
+        refs[name.strip()] = sha
+    return refs
+
+
+def _resolve_head(git_dir: str, common_dir: str) -> str:
+    value = (_read_text(os.path.join(git_dir, "HEAD")) or "").strip()
+    packed = None
+    for _ in range(_MAX_SYMREF_DEPTH):
+        if not value.startswith("ref:"):
+            return value
+        ref = value[len("ref:"):].strip()
+        # Per-worktree refs (HEAD, refs/bisect/...) are under git_dir, shared ones under common_dir.
+        loose = _read_text(os.path.join(git_dir, ref)) or _read_text(os.path.join(common_dir, ref))
+        if loose is not None:
+            value = loose.strip()
+            continue
+        if packed is None:
+            packed = _packed_refs(common_dir)
+        # An unborn branch has no commit yet.
+        return packed.get(ref, "")
+    return ""
+
+
+def _parse_config_value(raw: str) -> str:
+    value, quoted, escaped = [], False, False
+    for char in raw.strip():
+        if escaped:
+            value.append({"n": "\n", "t": "\t", "b": "\b"}.get(char, char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            value.append(char)
+    return "".join(value).strip()
+
+
+def read_git_config(path: str) -> Dict[Tuple[str, Optional[str]], Dict[str, list]]:
+    """
+    Parse a git config file into ``{(section, subsection): {key: [values]}}``.
+    Section and key names are lower-cased; subsections keep their case.
+    """
+    sections: Dict[Tuple[str, Optional[str]], Dict[str, list]] = {}
+    current = None
+    for line in (_read_text(path) or "").splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        match = _SECTION_PATTERN.match(line)
+        if match:
+            name, subsection = match.group(1).lower(), match.group(2)
+            if subsection is None and "." in name:
+                # Legacy [section.subsection] syntax.
+                name, subsection = name.split(".", 1)
+            if subsection is not None:
+                subsection = re.sub(r"\\(.)", r"\1", subsection)
+            current = sections.setdefault((name, subsection), {})
+            line = line[match.end():].strip()
+            if not line:
+                continue
+        if current is None:
+            continue
+        key, separator, raw = line.partition("=")
+        current.setdefault(key.strip().lower(), []).append(_parse_config_value(raw) if separator else "true")
+    return sections
+
+
+def _origin_url(common_dir: str) -> str:
+    sections = read_git_config(os.path.join(common_dir, "config"))
+    urls = sections.get(("remote", "origin"), {}).get("url")
+    if not urls:
+        return ""
+    url = urls[0]
+    # url.<base>.insteadOf: the longest matching prefix wins, as in git.
+    best_prefix, best_base = "", None
+    for (section, base), keys in sections.items():
+        if section != "url" or base is None:
+            continue
+        for prefix in keys.get("insteadof", []):
+            if url.startswith(prefix) and len(prefix) > len(best_prefix):
+                best_prefix, best_base = prefix, base
+    return best_base + url[len(best_prefix):] if best_base is not None else url
+
+
+def _signature(git_dir: str, common_dir: str) -> tuple:
+    signature = []
+    for path in (os.path.join(git_dir, "HEAD"), os.path.join(common_dir, "packed-refs"),
+                 os.path.join(common_dir, "config")):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    head = (_read_text(os.path.join(git_dir, "HEAD")) or "").strip()
+    if head.startswith("ref:"):
+        ref = head[len("ref:"):].strip()
+        for base in (git_dir, common_dir):
+            try:
+                signature.append(os.stat(os.path.join(base, ref)).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+    return tuple(signature) + (head,)
+
+
+def read_git_metadata(repo_path: str) -> Dict[str, str]:
+    """
+    ``{"commit": ..., "origin_url": ...}`` for ``repo_path``; values are empty
+    strings when the repository, HEAD commit or origin remote is missing.
+    """
+    repo_path = os.path.abspath(repo_path)
+    git_dir = find_git_dir(repo_path)
+    if git_dir is None:
+        return {"commit": "", "origin_url": ""}
+    common_dir = _common_dir(git_dir)
+    signature = (git_dir,) + _signature(git_dir, common_dir)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(repo_path)
+        if cached is not None and cached[0] == signature:
+            return dict(cached[1])
+    metadata = {"commit": _resolve_head(git_dir, common_dir), "origin_url": _origin_url(common_dir)}
+    with _CACHE_LOCK:
+        _CACHE[repo_path] = (signature, metadata)
+    return dict(metadata)
@@ -1,16 +1,26 @@
 import os
-from typing import Dict, List, Optional
-
-from tree_sitter import Language, Parser, QueryCursor
-import tree_sitter_go
-
-from config import Configurations
-
-config = Configurations()
-
-GO_LANGUAGE = Language(tree_sitter_go.language())
-parser = Parser(GO_LANGUAGE)
-_MODULE_NAME_CACHE: Dict[str, Optional[str]] = {}
+from typing import Dict, List, Optional, Tuple
+
+from config import get_configurations
+from syntax_extractor import QueryExtractor, get_parser_pool
+
+config = get_configurations()
+
+parser = get_parser_pool("go")
+_ELEMENT_EXTRACTOR = QueryExtractor(
+    "go",
+    """
+    (function_declaration) @function
+    (method_declaration) @function
+    (type_spec) @type
+    (call_expression) @call
+    (import_spec) @import
+    (identifier) @ident
+    """,
+)
+# Module name per repository, valid while its go.mod is unchanged; shared by
+# runs on different repositories without going stale.
+_MODULE_NAME_CACHE: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
 
 
 def parse_file(filename: str):
@@ -34,11 +44,15 @@ def _strip_quotes(value: Optional[str]) -> str:
 
 
 def _get_module_name(base_directory: str) -> Optional[str]:
+    go_mod_path = os.path.join(base_directory, "go.mod")
+    try:
+        go_mod_mtime: Optional[int] = os.stat(go_mod_path).st_mtime_ns
+    except OSError:
+        go_mod_mtime = None
     cached = _MODULE_NAME_CACHE.get(base_directory)
-    if cached is not None:
-        return cached
+    if cached is not None and cached[0] == go_mod_mtime:
+        return cached[1]
     module_name = None
-    go_mod_path = os.path.join(base_directory, "go.mod")
     try:
         with open(go_mod_path, "r", encoding="utf-8") as f:
             for line in f:
@@ -50,7 +64,7 @@ def _get_module_name(base_directory: str) -> Optional[str]:
                     break
     except OSError:
         module_name = None
-    _MODULE_NAME_CACHE[base_directory] = module_name
+    _MODULE_NAME_CACHE[base_directory] = (go_mod_mtime, module_name)
     return module_name
 
 
@@ -80,57 +94,35 @@ def _resolve_import_origin(import_path: str, base_directory: Optional[str]) -> O
     return None
 
 
-def _collect_functions(root, source: str, file_path: str) -> List[Dict]:
-    functions: List[Dict] = []
-    stack = [root]
-    while stack:
-        node = stack.pop()
-        if node.type in {"function_declaration", "method_declaration"}:
-            name_node = node.child_by_field_name("name")
-            if not name_node:
-                stack.extend(list(node.children))
-                continue
-            func_name = _node_text(source, name_node)
-            receiver_node = node.child_by_field_name("receiver")
-            receiver = _node_text(source, receiver_node).strip() if receiver_node else None
-            functions.append(
-                {
-                    "type": "function",
-                    "name": func_name,
-                    "receiver": receiver,
-                    "start_line": node.start_point[0] + 1,
-                    "end_line": node.end_point[0] + 1,
-                    "file_path": file_path,
-                }
-            )
-        stack.extend(list(node.children))
-    return functions
+def _function_entry(node, source: str, file_path: str) -> Optional[Dict]:
+    name_node = node.child_by_field_name("name")
+    if not name_node:
+        return None
+    receiver_node = node.child_by_field_name("receiver")
+    receiver = _node_text(source, receiver_node).strip() if receiver_node else None
+    return {
+        "type": "function",
+        "name": _node_text(source, name_node),
+        "receiver": receiver,
+        "start_line": node.start_point[0] + 1,
+        "end_line": node.end_point[0] + 1,
+        "file_path": file_path,
+    }
 
 
-def _collect_types(root, source: str, file_path: str) -> List[Dict]:
-    types: List[Dict] = []
-    stack = [root]
-    while stack:
-        node = stack.pop()
-        if node.type == "type_spec":
-            name_node = node.child_by_field_name("name")
-            type_node = node.child_by_field_name("type")
-            if not name_node or not type_node:
-                stack.extend(list(node.children))
-                continue
-            type_name = _node_text(source, name_node)
-            types.append(
-                {
-                    "type": "type",
-                    "name": type_name,
-                    "start_line": node.start_point[0] + 1,
-                    "end_line": node.end_point[0] + 1,
-                    "type_kind": type_node.type,
-                    "file_path": file_path,
-                }
-            )
-        stack.extend(list(node.children))
-    return types
+def _type_entry(node, source: str, file_path: str) -> Optional[Dict]:
+    name_node = node.child_by_field_name("name")
+    type_node = node.child_by_field_name("type")
+    if not name_node or not type_node:
+        return None
+    return {
+        "type": "type",
+        "name": _node_text(source, name_node),
+        "start_line": node.start_point[0] + 1,
+        "end_line": node.end_point[0] + 1,
+        "type_kind": type_node.type,
+        "file_path": file_path,
+    }
 
 
 def _extract_call_name(function_node, source: str) -> Optional[str]:
@@ -145,63 +137,42 @@ def _extract_call_name(function_node, source: str) -> Optional[str]:
     return None
 
 
-def _collect_function_calls(root, source: str) -> List[Dict]:
-    calls: List[Dict] = []
-    stack = [root]
-    while stack:
-        node = stack.pop()
-        if node.type == "call_expression":
-            function_node = node.child_by_field_name("function")
-            call_name = _extract_call_name(function_node, source)
-            if call_name:
-                calls.append(
-                    {
-                        "type": "function_call",
-                        "name": call_name,
-                        "full_name": _node_text(source, function_node),
-                        "start_line": node.start_point[0] + 1,
-                        "end_line": node.end_point[0] + 1,
-                    }
-                )
-        stack.extend(list(node.children))
-    return calls
+def _call_entry(node, source: str) -> Optional[Dict]:
+    function_node = node.child_by_field_name("function")
+    call_name = _extract_call_name(function_node, source)
+    if not call_name:
+        return None
+    return {
+        "type": "function_call",
+        "name": call_name,
+        "full_name": _node_text(source, function_node),
+        "start_line": node.start_point[0] + 1,
+        "end_line": node.end_point[0] + 1,
+    }
 
 
-def _collect_imports(root, source: str, base_directory: Optional[str]) -> List[Dict]:
-    imports: List[Dict] = []
-    stack = [root]
-    while stack:
-        node = stack.pop()
-        if node.type == "import_declaration":
-            for child in node.named_children:
-                if child.type != "import_spec":
-                    continue
-                path_node = child.child_by_field_name("path")
-                if not path_node:
-                    continue
-                raw_path = _node_text(source, path_node)
-                path_value = _strip_quotes(raw_path)
-                alias_node = child.child_by_field_name("name")
-                alias = _node_text(source, alias_node) if alias_node else None
-                imported_name = alias or (path_value.split("/")[-1] if path_value else None)
-                origin = _resolve_import_origin(path_value, base_directory)
-                imports.append(
-                    {
-                        "type": "import",
-                        "imported_name": imported_name,
-                        "alias": alias,
-                        "from_module": path_value,
-                        "origin": origin,
-                        "line": child.start_point[0] + 1,
-                        "path_exists": bool(origin and os.path.exists(origin)),
-                        "usage_lines": [],
-                    }
-                )
-        stack.extend(list(node.children))
-    return imports
+def _import_entry(node, source: str, base_directory: Optional[str]) -> Optional[Dict]:
+    path_node = node.child_by_field_name("path")
+    if not path_node:
+        return None
+    path_value = _strip_quotes(_node_text(source, path_node))
+    alias_node = node.child_by_field_name("name")
+    alias = _node_text(source, alias_node) if alias_node else None
+    imported_name = alias or (path_value.split("/")[-1] if path_value else None)
+    origin = _resolve_import_origin(path_value, base_directory)
+    return {
+        "type": "import",
+        "imported_name": imported_name,
+        "alias": alias,
+        "from_module": path_value,
+        "origin": origin,
+        "line": node.start_point[0] + 1,
+        "path_exists": bool(origin and os.path.exists(origin)),
+        "usage_lines": [],
+    }
 
 
-def _annotate_import_usages(tree, source: str, imports: List[Dict]) -> None:
+def _annotate_import_usages(identifiers: List, imports: List[Dict]) -> None:
     alias_map = {}
     for item in imports:
         alias_key = item.get("alias") or item.get("imported_name")
@@ -209,10 +180,7 @@ def _annotate_import_usages(tree, source: str, imports: List[Dict]) -> None:
             alias_map[alias_key] = item
     if not alias_map:
         return
-    query = GO_LANGUAGE.query("(identifier) @ident")
-    cursor = QueryCursor(query)
-    captures = cursor.captures(tree.root_node)
-    for node in captures.get("ident", []):
+    for node in identifiers:
         ident = node.text.decode("utf-8")
         import_entry = alias_map.get(ident)
         if not import_entry:
@@ -238,19 +206,34 @@ def _attach_call_ranges(functions: List[Dict], calls: List[Dict]) -> None:
 
 
 def get_elements(tree, source: str, base_directory: str) -> Dict:
+    captures = _ELEMENT_EXTRACTOR.captures(tree.root_node)
+    functions: List[Dict] = []
+    for node in captures.get("function", []):
+        entry = _function_entry(node, source, "")
+        if entry:
+            functions.append(entry)
+    calls: List[Dict] = []
+    for node in captures.get("call", []):
+        entry = _call_entry(node, source)
+        if entry:
+            calls.append(entry)
+    types: List[Dict] = []
+    for node in captures.get("type", []):
+        entry = _type_entry(node, source, "")
+        if entry:
+            types.append(entry)
+    imports: List[Dict] = []
+    for node in captures.get("import", []):
+        entry = _import_entry(node, source, base_directory)
+        if entry:
+            imports.append(entry)
+    _attach_call_ranges(functions, calls)
+    _annotate_import_usages(captures.get("ident", []), imports)
     elements: Dict = {
-        "functions": [],
-        "function_calls": [],
-        "types": [],
+        "functions": functions,
+        "function_calls": calls,
+        "types": types,
     }
-    functions = _collect_functions(tree.root_node, source, "")
-    calls = _collect_function_calls(tree.root_node, source)
-    _attach_call_ranges(functions, calls)
-    elements["functions"] = functions
-    elements["function_calls"] = calls
-    elements["types"] = _collect_types(tree.root_node, source, "")
-    imports = _collect_imports(tree.root_node, source, base_directory)
-    _annotate_import_usages(tree, source, imports)
     return elements, imports
 
 
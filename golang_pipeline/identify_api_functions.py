@@ -2,11 +2,11 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence
 
-from tree_sitter import Language, Node, Parser
-import tree_sitter_go
+from tree_sitter import Node
 
-GO_LANGUAGE = Language(tree_sitter_go.language())
-parser = Parser(GO_LANGUAGE)
+from syntax_extractor import get_parser_pool, iter_nodes
+
+parser = get_parser_pool("go")
 
 
 HTTP_METHODS = {
@@ -46,27 +46,17 @@ def _strip_quotes(value: Optional[str]) -> str:
     return value
 
 
-def _collect_function_definitions(
-    root: Node, source: str, file_path: Path
-) -> Dict[str, Dict]:
-    functions: Dict[str, Dict] = {}
-    stack = [root]
-    while stack:
-        node = stack.pop()
-        if node.type == "function_declaration":
-            name_node = node.child_by_field_name("name")
-            if name_node:
-                func_name = _node_text(source, name_node)
-                entry = {
-                    "type": "function",
-                    "name": func_name,
-                    "start_line": node.start_point[0] + 1,
-                    "end_line": node.end_point[0] + 1,
-                    "file_path": str(file_path),
-                }
-                functions.setdefault(func_name, entry)
-        stack.extend(list(node.children))
-    return functions
+def _function_definition_entry(node: Node, source: str, file_path: Path) -> Optional[Dict]:
+    name_node = node.child_by_field_name("name")
+    if not name_node:
+        return None
+    return {
+        "type": "function",
+        "name": _node_text(source, name_node),
+        "start_line": node.start_point[0] + 1,
+        "end_line": node.end_point[0] + 1,
+        "file_path": str(file_path),
+    }
 
 
 def _iter_call_arguments(call_node: Node) -> Sequence[Node]:
@@ -334,23 +324,20 @@ def find_api_endpoints(file_path: Path, repo_root: str) -> List[Dict]:
         return []
 
     tree = parser.parse(source.encode("utf-8"))
-    functions_by_name = _collect_function_definitions(
-        tree.root_node, source, file_path
-    )
+    functions_by_name: Dict[str, Dict] = {}
+    call_nodes: List[Node] = []
+    for node in iter_nodes(tree.root_node, ("function_declaration", "call_expression")):
+        if node.type == "function_declaration":
+            entry = _function_definition_entry(node, source, file_path)
+            if entry:
+                functions_by_name.setdefault(entry["name"], entry)
+        elif not _is_call_operand_of_methods(node, source):
+            call_nodes.append(node)
 
     endpoints: List[Dict] = []
-    stack = [tree.root_node]
-    while stack:
-        node = stack.pop()
-        if node.type == "call_expression":
-            if _is_call_operand_of_methods(node, source):
-                stack.extend(list(node.children))
-                continue
-            routes = _extract_routes_from_call(
-                node, source, file_path, functions_by_name
-            )
-            if routes:
-                endpoints.extend(routes)
-        stack.extend(list(node.children))
+    for node in call_nodes:
+        routes = _extract_routes_from_call(node, source, file_path, functions_by_name)
+        if routes:
+            endpoints.extend(routes)
 
     return endpoints
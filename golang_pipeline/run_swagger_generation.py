@@ -3,26 +3,31 @@ import os
 import re
 import shutil
 import tempfile
+import threading
 import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from config import Configurations
+from config import get_configurations
+from dependency_index import FileDependencyIndex, load_file_metadata
+from file_cache import read_file_lines_or_none
+from symbol_table import Symbol, SymbolTable
 from golang_pipeline.definition_swagger_generator import (
     get_function_definition_swagger,
 )
 from golang_pipeline.find_api_definition_files import find_api_definition_files
 from golang_pipeline.generate_file_information import process_file
 from golang_pipeline.identify_api_functions import find_api_endpoints
+from endpoint_generation import (
+    EndpointJournal,
+    StaticDiscovery,
+    record_failed_endpoints,
+)
+from pipeline_stream import MetadataTracker, stream_endpoints
 from utils import get_git_commit_hash, get_github_repo_url, get_repo_path, get_repo_name
 
-config = Configurations()
+config = get_configurations()
 
-_FUNCTION_INDEX_CACHE: Dict[str, List[Dict[str, object]]] = {}
-_FUNCTION_INDEX_CACHE_ROOT: Optional[str] = None
-_FILE_CONTENT_CACHE: Dict[str, List[str]] = {}
-_METADATA_DIR: Optional[str] = None
 _HEADER_PATTERN = re.compile(
     r"""\.Get(?:String|Header)\(\s*["']([^"']+)["']\s*\)|
         Header\.Get\(\s*["']([^"']+)["']\s*\)""",
@@ -31,26 +36,50 @@ _HEADER_PATTERN = re.compile(
 
 
 def should_process_directory(dir_path: str) -> bool:
-    path_parts = dir_path.split(os.sep)
-    return not any(part in config.ignored_dirs for part in path_parts)
+    return not config.ignored_paths.is_ignored(dir_path)
 
 
 def _sanitize_json_filename(file_path: str) -> str:
     return f"{file_path.replace(os.sep, '_q_')}.json"
 
 
-def _ensure_function_index(directory_path: str) -> Dict[str, List[Dict[str, object]]]:
-    global _FUNCTION_INDEX_CACHE
-    global _FUNCTION_INDEX_CACHE_ROOT
+class GoRunState:
+    """
+    Metadata directory and function index of one run. Passed to the context
+    helpers, so concurrent runs in one process share nothing; file contents
+    come from the shared ``file_cache``.
+    """
+
+    def __init__(self, directory_path: str, metadata_dir: Optional[str]):
+        self.directory_path = directory_path
+        self.metadata_dir = metadata_dir
+        self.function_index: Optional[SymbolTable] = None
+        self.lock = threading.Lock()
+
+
+def _merge_paths(target: Dict, source: Dict) -> None:
+    for path_key, methods in source.get("paths", {}).items():
+        target.setdefault("paths", {}).setdefault(path_key, {})
+        for method, payload in methods.items():
+            target["paths"][path_key][method] = payload
+
+
+def _ensure_function_index(state: GoRunState) -> SymbolTable:
+    if state.function_index:
+        return state.function_index
+
+    with state.lock:
+        if state.function_index:
+            return state.function_index
+        function_index = _build_function_index(state.metadata_dir)
+        state.function_index = function_index
+        return function_index
 
-    if _FUNCTION_INDEX_CACHE and _FUNCTION_INDEX_CACHE_ROOT == directory_path:
-        return _FUNCTION_INDEX_CACHE
 
-    _FUNCTION_INDEX_CACHE = {}
-    _FUNCTION_INDEX_CACHE_ROOT = directory_path
-    metadata_dir = _METADATA_DIR
+def _build_function_index(metadata_dir: Optional[str]) -> SymbolTable:
+    function_index = SymbolTable()
     if not metadata_dir or not os.path.exists(metadata_dir):
-        return _FUNCTION_INDEX_CACHE
+        return function_index
 
     for entry in os.scandir(metadata_dir):
         if not entry.is_file() or not entry.name.endswith(".json"):
@@ -74,29 +103,23 @@ def _ensure_function_index(directory_path: str) -> Dict[str, List[Dict[str, obje
                 or not file_name
             ):
                 continue
-            _FUNCTION_INDEX_CACHE.setdefault(name, []).append(
-                {
-                    "file_path": file_name,
-                    "start_line": start_line,
-                    "end_line": end_line,
-                }
-            )
-    return _FUNCTION_INDEX_CACHE
+            function_index.add(name, file_name, start_line, end_line)
+    return function_index
 
 
 def _find_function_definition(
-    directory_path: str,
+    state: GoRunState,
     function_name: str,
     preferred_file: Optional[str] = None,
     route_file: Optional[str] = None,
-) -> Optional[Dict[str, object]]:
-    index = _ensure_function_index(directory_path)
-    entries = index.get(function_name, [])
+) -> Optional[Symbol]:
+    index = _ensure_function_index(state)
+    entries = index.lookup(function_name)
     if not entries:
         return None
     if preferred_file:
         for entry in entries:
-            if entry.get("file_path") == preferred_file:
+            if entry.file_path == preferred_file:
                 return entry
     if route_file:
         route_path = Path(route_file)
@@ -110,7 +133,7 @@ def _find_function_definition(
         best_score = -1
         for entry in entries:
             score = 0
-            file_path = entry.get("file_path") or ""
+            file_path = entry.file_path or ""
             if "controller" in file_path:
                 score += 5
             for token in tokens:
@@ -125,7 +148,7 @@ def _find_function_definition(
 
 
 def _hydrate_method_info(
-    directory_path: str, method_info: Dict[str, object]
+    state: GoRunState, method_info: Dict[str, object]
 ) -> Optional[Dict[str, object]]:
     if method_info.get("start_line") and method_info.get("end_line") and method_info.get("file_path" ):
         return method_info
@@ -136,61 +159,37 @@ def _hydrate_method_info(
 
     preferred_file = method_info.get("file_path")
     definition = _find_function_definition(
-        directory_path, handler_name, preferred_file, method_info.get("route_file")
+        state, handler_name, preferred_file, method_info.get("route_file")
     )
     if not definition:
         return None
 
     method_info = method_info.copy()
-    method_info["file_path"] = definition.get("file_path")
-    method_info["start_line"] = definition.get("start_line")
-    method_info["end_line"] = definition.get("end_line")
+    method_info["file_path"] = definition.file_path
+    method_info["start_line"] = definition.start_line
+    method_info["end_line"] = definition.end_line
     return method_info
 
 
-def _read_file_lines(file_path: str) -> Optional[List[str]]:
-    cached = _FILE_CONTENT_CACHE.get(file_path)
-    if cached is not None:
-        return cached
-    try:
-        with open(file_path, "r", encoding="utf-8") as handle:
-            lines = handle.readlines()
-    except OSError:
-        return None
-    _FILE_CONTENT_CACHE[file_path] = lines
-    return lines
-
-
 def get_dependencies(
-    data: Dict, start_line: int, end_line: int, file_path: str
+    data: Dict,
+    start_line: int,
+    end_line: int,
+    file_path: str,
+    index: Optional[FileDependencyIndex] = None,
 ) -> Tuple[List[Dict], List[Dict]]:
-    existing_function_names = [
-        item.get("name") for item in data.get("elements", {}).get("functions", [])
-    ]
+    if index is None:
+        index = FileDependencyIndex(data)
     in_file_dependency_functions: List[Dict] = []
-    for call in data.get("elements", {}).get("function_calls", []):
-        call_name = call.get("name")
-        call_start = call.get("start_line")
-        call_end = call.get("end_line")
-        if (
-            call_name in existing_function_names
-            and isinstance(call_start, int)
-            and isinstance(call_end, int)
-            and start_line <= call_start <= end_line
-        ):
+    for call in index.calls_starting_within(start_line, end_line):
+        if call.get("name") in index.function_names and isinstance(call.get("end_line"), int):
             entry = call.copy()
             entry["file_path"] = file_path
             in_file_dependency_functions.append(entry)
 
-    imported_functions: List[Dict] = []
-    for item in data.get("imports", []):
-        usage_lines = item.get("usage_lines", [])
-        if not usage_lines:
-            continue
-        for usage in usage_lines:
-            if start_line <= usage <= end_line:
-                imported_functions.append(item)
-                break
+    imported_functions: List[Dict] = [
+        item for item, _ in index.imports_used_within(start_line, end_line)
+    ]
     return in_file_dependency_functions, imported_functions
 
 
@@ -198,10 +197,10 @@ def get_code_blocks(
     in_file_dependency_functions: List[Dict],
     imported_functions: List[Dict],
     file_name: str,
-    directory_path: str,
+    state: GoRunState,
 ) -> List[List[str]]:
     code_blocks: List[List[str]] = []
-    lines = _read_file_lines(file_name) or []
+    lines = read_file_lines_or_none(file_name) or []
     for block in in_file_dependency_functions:
         start = block.get("function_start_line") or block.get("start_line")
         end = block.get("function_end_line") or block.get("end_line")
@@ -211,7 +210,7 @@ def get_code_blocks(
         if segment:
             code_blocks.append(segment)
 
-    metadata_dir = _METADATA_DIR
+    metadata_dir = state.metadata_dir
     if not metadata_dir:
         return code_blocks
     for imp in imported_functions:
@@ -233,14 +232,13 @@ def get_code_blocks(
             if not os.path.exists(json_file):
                 continue
             try:
-                with open(json_file, "r", encoding="utf-8") as handle:
-                    data = json.load(handle)
-            except (OSError, json.JSONDecodeError):
+                data, _ = load_file_metadata(json_file)
+            except (OSError, ValueError):
                 continue
             elements = data.get("elements", {})
             for func in elements.get("functions", []):
                 if func.get("name") == imp.get("imported_name"):
-                    origin_lines = _read_file_lines(candidate) or []
+                    origin_lines = read_file_lines_or_none(candidate) or []
                     snippet = origin_lines[
                         func.get("start_line", 1) - 1 : func.get("end_line", 1)
                     ]
@@ -274,9 +272,9 @@ def _build_header_hint_block(method_lines: List[str]) -> Optional[List[str]]:
 
 
 def _load_types_from_origin(
-    origin: str, alias: Optional[str], per_alias_limit: int
+    state: GoRunState, origin: str, alias: Optional[str], per_alias_limit: int
 ) -> List[List[str]]:
-    metadata_dir = _METADATA_DIR
+    metadata_dir = state.metadata_dir
     if not metadata_dir:
         return []
     file_candidates: List[str] = []
@@ -293,9 +291,8 @@ def _load_types_from_origin(
         if not os.path.exists(json_file):
             continue
         try:
-            with open(json_file, "r", encoding="utf-8") as handle:
-                data = json.load(handle)
-        except (OSError, json.JSONDecodeError):
+            data, _ = load_file_metadata(json_file)
+        except (OSError, ValueError):
             continue
         type_entries = data.get("elements", {}).get("types", [])
         if not type_entries:
@@ -305,7 +302,7 @@ def _load_types_from_origin(
             end = type_entry.get("end_line")
             if not isinstance(start, int) or not isinstance(end, int):
                 continue
-            lines = _read_file_lines(candidate)
+            lines = read_file_lines_or_none(candidate)
             if lines is None:
                 continue
             qualifier = f"{alias}." if alias else ""
@@ -318,7 +315,7 @@ def _load_types_from_origin(
 
 
 def _collect_import_type_blocks(
-    imports: List[Dict], per_alias_limit: int = 3
+    state: GoRunState, imports: List[Dict], per_alias_limit: int = 3
 ) -> List[List[str]]:
     if not imports:
         return []
@@ -335,38 +332,38 @@ def _collect_import_type_blocks(
         if key in seen:
             continue
         seen.add(key)
-        type_blocks = _load_types_from_origin(origin, alias, per_alias_limit)
+        type_blocks = _load_types_from_origin(state, origin, alias, per_alias_limit)
         blocks.extend(type_blocks)
     return blocks
 
 
 
 
-def provide_context_codeblock(directory_path: str, method_info: Dict):
+def provide_context_codeblock(state: GoRunState, method_info: Dict):
     file_name = method_info["file_path"]
-    lines = _read_file_lines(file_name) or []
+    lines = read_file_lines_or_none(file_name) or []
     start_line = method_info.get("start_line", 1)
     end_line = method_info.get("end_line", start_line)
     method_definition_code_block = lines[start_line - 1 : end_line]
 
-    metadata_dir = _METADATA_DIR
+    metadata_dir = state.metadata_dir
     data = {"elements": {"functions": [], "function_calls": []}, "imports": []}
+    index = None
     if metadata_dir:
         json_file = os.path.join(metadata_dir, _sanitize_json_filename(file_name))
         try:
-            with open(json_file, "r", encoding="utf-8") as handle:
-                data = json.load(handle)
-        except (OSError, json.JSONDecodeError):
-            data = {"elements": {"functions": [], "function_calls": []}, "imports": []}
+            data, index = load_file_metadata(json_file)
+        except (OSError, ValueError):
+            pass
 
     in_file_dependency_functions, imported_functions = get_dependencies(
-        data, start_line, end_line, file_name
+        data, start_line, end_line, file_name, index
     )
     context_code_blocks = get_code_blocks(
-        in_file_dependency_functions, imported_functions, file_name, directory_path
+        in_file_dependency_functions, imported_functions, file_name, state
     )
     header_block = _build_header_hint_block(method_definition_code_block)
-    type_blocks = _collect_import_type_blocks(data.get("imports", []))
+    type_blocks = _collect_import_type_blocks(state, data.get("imports", []))
     prefix_blocks: List[List[str]] = []
     if header_block:
         prefix_blocks.append(header_block)
@@ -375,14 +372,18 @@ def provide_context_codeblock(directory_path: str, method_info: Dict):
     return context_code_blocks, method_definition_code_block
 
 
-def run_swagger_generation(host: str) -> Dict:
+def run_swagger_generation(
+    host: str,
+    discovery: Optional[StaticDiscovery] = None,
+    journal: Optional[EndpointJournal] = None,
+) -> Dict:
     directory_path = get_repo_path()
     repo_name = get_repo_name()
-    global _METADATA_DIR
     metadata_dir = tempfile.mkdtemp(prefix="qodex_go_file_info_")
-    _METADATA_DIR = metadata_dir
+    state = GoRunState(directory_path, metadata_dir)
 
     try:
+        metadata_jobs: List[Tuple[str, str]] = []
         for root, _, files in os.walk(directory_path):
             for filename in files:
                 file_path = os.path.join(root, filename)
@@ -391,21 +392,10 @@ def run_swagger_generation(host: str) -> Dict:
                     and should_process_directory(file_path)
                     and file_path.endswith(".go")
                 ):
-                    try:
-                        file_info = process_file(file_path, directory_path)
-                    except Exception:
-                        continue
                     json_file_name = os.path.join(
                         metadata_dir, _sanitize_json_filename(file_path)
                     )
-                    with open(json_file_name, "w", encoding="utf-8") as handle:
-                        json.dump(file_info, handle, indent=4)
-
-        api_files = find_api_definition_files(directory_path)
-        endpoints: List[Dict] = []
-        for file in api_files:
-            endpoints.extend(find_api_endpoints(Path(file), directory_path))
-
+                    metadata_jobs.append((file_path, json_file_name))
         swagger = {
             "openapi": "3.0.0",
             "info": {
@@ -420,19 +410,25 @@ def run_swagger_generation(host: str) -> Dict:
             "paths": {},
         }
 
-        endpoint_jobs: List[Dict] = []
-        for endpoint in endpoints:
-            hydrated = _hydrate_method_info(directory_path, endpoint)
-            if not hydrated:
-                continue
-            endpoint_jobs.append(hydrated)
+        def _identify_endpoints(metadata: MetadataTracker) -> Iterator[Dict]:
+            api_files = find_api_definition_files(directory_path)
+            endpoints: List[Dict] = []
+            for file in api_files:
+                endpoints.extend(find_api_endpoints(Path(file), directory_path))
+
+            if discovery is not None:
+                discovery.record_api_files(api_files)
 
-        if not endpoint_jobs:
-            return swagger
+            # Handlers are resolved through a function index over every file.
+            metadata.wait_all()
+            for endpoint in endpoints:
+                hydrated = _hydrate_method_info(state, endpoint)
+                if hydrated:
+                    yield hydrated
 
         def _generate_swagger_fragment(method_info: Dict) -> Dict:
             context_blocks, method_definition = provide_context_codeblock(
-                directory_path, method_info
+                state, method_info
             )
             http_method = method_info.get("http_method") or "GET"
             if http_method:
@@ -444,20 +440,21 @@ def run_swagger_generation(host: str) -> Dict:
                 method_definition, context_blocks, method_info["route"], http_method
             )
 
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [
-                executor.submit(_generate_swagger_fragment, job)
-                for job in endpoint_jobs
-            ]
-            for future in as_completed(futures):
-                swagger_fragment = future.result()
-                for path_key, methods in swagger_fragment.get("paths", {}).items():
-                    swagger.setdefault("paths", {}).setdefault(path_key, {})
-                    for method, payload in methods.items():
-                        swagger["paths"][path_key][method] = payload
+        _, failed, skipped = stream_endpoints(
+            swagger,
+            _merge_paths,
+            metadata_jobs,
+            process_file,
+            directory_path,
+            _identify_endpoints,
+            _generate_swagger_fragment,
+            journal=journal,
+            discovery=discovery,
+            metadata_path_for=lambda path: os.path.join(metadata_dir, _sanitize_json_filename(path)),
+        )
+        record_failed_endpoints(swagger, failed, skipped)
 
         return swagger
     finally:
         if metadata_dir and os.path.exists(metadata_dir):
             shutil.rmtree(metadata_dir, ignore_errors=True)
-        _METADATA_DIR = None
@@ -0,0 +1,121 @@
+"""
+Line-offset indexes for slicing source by line numbers.
+
+``LineOffsets`` records where every line of a text or byte buffer starts, so
+offset-to-line and line-to-offset lookups are binary searches instead of
+counting newlines from the top. ``LineIndex`` keeps one over a source file
+and slices like the ``readlines()`` list did, but decodes only the lines
+asked for. Files of ``MMAP_MIN_BYTES`` or more are memory-mapped rather than
+read, so their content stays in the page cache instead of the heap.
+"""
+
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+from typing import Iterator, List, Tuple, Union
+
+# Each mapping holds a file descriptor until it is released, so small files,
+# which most sources are, are read instead.
+MMAP_MIN_BYTES = 1024 * 1024
+
+
+class LineOffsets:
+    """Start offsets of the lines of ``buffer`` (str, bytes or mmap), split on ``\\n``."""
+
+    __slots__ = ("starts", "length")
+
+    def __init__(self, buffer: Union[str, bytes, mmap.mmap]):
+        newline = "\n" if isinstance(buffer, str) else b"\n"
+        starts = array("q", [0])
+        find = buffer.find
+        position = find(newline)
+        while position != -1:
+            starts.append(position + 1)
+            position = find(newline, position + 1)
+        self.starts = starts
+        self.length = len(buffer)
+
+    @property
+    def line_count(self) -> int:
+        """Lines as ``readlines()`` counts them: a trailing newline starts no new line."""
+        if not self.length:
+            return 0
+        return len(self.starts) - (1 if self.starts[-1] == self.length else 0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.starts.itemsize * len(self.starts)
+
+    def line_at(self, offset: int) -> int:
+        """The 1-based line containing ``offset``."""
+        return bisect_right(self.starts, offset)
+
+    def span(self, start_line: int, end_line: int) -> Tuple[int, int]:
+        """Offsets of lines ``start_line`` through ``end_line`` (1-based, inclusive)."""
+        begin = self.starts[start_line - 1]
+        end = self.starts[end_line] if end_line < len(self.starts) else self.length
+        return begin, end
+
+
+class LineIndex:
+    """
+    The lines of a UTF-8 source file. ``index[a:b]`` returns the same list
+    of strings as ``readlines()[a:b]`` with CRLF line endings read as LF;
+    undecodable bytes are replaced rather than raised.
+    """
+
+    __slots__ = ("file_path", "_buffer", "offsets")
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size >= MMAP_MIN_BYTES:
+                self._buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = handle.read()
+        self.offsets = LineOffsets(self._buffer)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory the index can hold: the file content plus its offsets."""
+        return self.offsets.length + self.offsets.nbytes
+
+    def __len__(self) -> int:
+        return self.offsets.line_count
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines(1, len(self)))
+
+    def __getitem__(self, key):
+        line_count = len(self)
+        if isinstance(key, slice):
+            start, stop, step = key.indices(line_count)
+            if step != 1:
+                return [self.lines(number + 1, number + 1)[0] for number in range(start, stop, step)]
+            return self.lines(start + 1, stop)
+        if key < 0:
+            key += line_count
+        if not 0 <= key < line_count:
+            raise IndexError("line index out of range")
+        return self.lines(key + 1, key + 1)[0]
+
+    def lines(self, start_line: int, end_line: int) -> List[str]:
+        """Lines ``start_line`` through ``end_line`` (1-based, inclusive), decoded."""
+        if start_line > end_line:
+            return []
+        begin, end = self.offsets.span(start_line, end_line)
+        if isinstance(self._buffer, mmap.mmap) and self._buffer.size() < end:
+            # Reading a mapping past the end of a file truncated since would fault.
+            raise OSError(f"{self.file_path} was truncated while cached")
+        text = self._buffer[begin:end].decode("utf-8", errors="replace").replace("\r\n", "\n")
+        parts = text.split("\n")
+        lines = [part + "\n" for part in parts[:-1]]
+        if parts[-1]:
+            lines.append(parts[-1])
+        return lines
+
+    def line_at(self, byte_offset: int) -> int:
+        """The 1-based line containing ``byte_offset`` of the file."""
+        return self.offsets.line_at(byte_offset)
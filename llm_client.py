@@ -1,44 +1,92 @@
-from openai import OpenAI
-from langchain_openai import OpenAIEmbeddings
-from config import Configurations
-import json, os
+from config import get_configurations
+from run_budget import get_run_budget
+from run_deadline import get_run_deadline
+from run_planner import get_plan_recorder
+from user_config import read_user_config
+import threading
+
+config = get_configurations()
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+# One HTTP client (and connection pool) per API key for the life of the process.
+# openai and langchain_openai are imported when a client is first needed, so
+# dry runs and static listings never load them.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _pooled_client(kind, openai_api_key):
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get((kind, openai_api_key))
+        if client is None:
+            if kind == "chat":
+                from openai import OpenAI
+                client = OpenAI(api_key=openai_api_key)
+            else:
+                from langchain_openai import OpenAIEmbeddings
+                client = OpenAIEmbeddings(model=EMBEDDING_MODEL, openai_api_key=openai_api_key)
+            _CLIENTS[(kind, openai_api_key)] = client
+        return client
 
-config = Configurations()
 
 class OpenAiClient:
     def __init__(self):
         self.openai_api_key = self.load_openai_api_key()
-        self.client = OpenAI(
-            api_key=self.openai_api_key)
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-ada-002", openai_api_key=self.openai_api_key)
+        self._client = None
+        self._embeddings = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = _pooled_client("chat", self.openai_api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = _pooled_client("embeddings", self.openai_api_key)
+        return self._embeddings
+
+    @embeddings.setter
+    def embeddings(self, value):
+        self._embeddings = value
 
     def call_chat_completion(self, messages, temperature=0.5):
         model = self.load_openai_model()
-        if model.startswith("gpt-5"):
-            response = self.client.chat.completions.create(model=model, messages=messages, temperature=1)
-        else:
-            response = self.client.chat.completions.create(model=model, messages=messages, temperature=temperature)
+        recorder = get_plan_recorder()
+        if recorder is not None:
+            # Dry run: count the prompt instead of sending it.
+            return recorder.record(model, messages)
+        request_options = {}
+        deadline = get_run_deadline()
+        if deadline is not None:
+            # No new calls past the deadline; in-flight ones time out at it.
+            deadline.check()
+            request_options["timeout"] = deadline.remaining()
+        budget = get_run_budget()
+        reservation = budget.admit(model, messages) if budget is not None else None
+        try:
+            if model.startswith("gpt-5"):
+                response = self.client.chat.completions.create(model=model, messages=messages, temperature=1, **request_options)
+            else:
+                response = self.client.chat.completions.create(model=model, messages=messages, temperature=temperature, **request_options)
+        except Exception:
+            if reservation is not None:
+                budget.release(reservation)
+            raise
+        if reservation is not None:
+            budget.settle(reservation, getattr(response, "usage", None))
         return response.choices[0].message.content
 
     @staticmethod
     def load_openai_api_key():
-        config_file = os.environ.get("APIMESH_USER_CONFIG_PATH")
-        if config_file is None:
-            raise ValueError(
-                "APIMESH_USER_CONFIG_PATH environment variable is not set. "
-                "Please set it to the path of your config.json file."
-            )
-        with open(config_file, "r") as file:
-            user_config_data = json.load(file)
-        return user_config_data['openai_api_key']
+        return read_user_config()['openai_api_key']
 
     def load_openai_model(self):
-        config_file = os.environ.get("APIMESH_USER_CONFIG_PATH")
-        if config_file is None:
-            raise ValueError(
-                "APIMESH_USER_CONFIG_PATH environment variable is not set. "
-                "Please set it to the path of your config.json file."
-            )
-        with open(config_file, "r") as file:
-            user_config_data = json.load(file)
-        return user_config_data['openai_model']
+        return read_user_config()['openai_model']
@@ -0,0 +1,291 @@
+"""
+Parallel metadata extraction shared by the language pipelines.
+
+Each pipeline turns every source file into a metadata JSON document via its
+``process_file`` function. This module fans that work out over a pool of
+worker processes sized to the available CPUs. Every file gets a wall-clock
+limit and every worker a memory ceiling, so a pathological file (deep
+recursion in a visitor, a huge generated bundle, a crashing grammar) is
+skipped with a recorded reason instead of stalling or killing the run.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import get_configurations
+from run_deadline import deadline_expired
+
+config = get_configurations()
+
+_POLL_INTERVAL_SECONDS = 0.2
+
+
+def available_cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def _apply_memory_limit(memory_limit_mb: int) -> None:
+    if not memory_limit_mb or memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _run_job(
+    process_file: Callable,
+    file_path: str,
+    json_path: str,
+    base_directory: str,
+    max_file_bytes: int,
+) -> Optional[str]:
+    """Process one file and persist its metadata. Returns a skip reason or None."""
+    try:
+        if max_file_bytes and os.path.getsize(file_path) > max_file_bytes:
+            return f"file larger than {max_file_bytes} bytes"
+        file_info = process_file(file_path, base_directory)
+        with open(json_path, "w", encoding="utf-8") as handle:
+            json.dump(file_info, handle, indent=4)
+    except RecursionError:
+        return "maximum recursion depth exceeded"
+    except MemoryError:
+        return "worker memory limit exceeded"
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+def _worker_main(
+    task_queue,
+    result_pipe,
+    process_file: Callable,
+    base_directory: str,
+    max_file_bytes: int,
+    memory_limit_mb: int,
+) -> None:
+    _apply_memory_limit(memory_limit_mb)
+    while True:
+        job = task_queue.get()
+        if job is None:
+            return
+        file_path, json_path = job
+        reason = _run_job(process_file, file_path, json_path, base_directory, max_file_bytes)
+        result_pipe.send((file_path, reason))
+
+
+class _Worker:
+    """
+    One worker process with its own task queue and result pipe, so killing
+    it cannot leave a lock held on a channel the other workers write to.
+    """
+
+    def __init__(self, ctx, worker_id: int, worker_args: Tuple):
+        self.worker_id = worker_id
+        self.task_queue = ctx.SimpleQueue()
+        self.results, result_pipe = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.task_queue, result_pipe) + worker_args,
+            daemon=True,
+        )
+        self.process.start()
+        # Only the worker keeps the write end, so its exit reads as EOF here.
+        result_pipe.close()
+        self.job: Optional[Tuple[str, str]] = None
+        self.started_at = 0.0
+
+    def assign(self, job: Tuple[str, str]) -> None:
+        self.job = job
+        self.started_at = time.monotonic()
+        self.task_queue.put(job)
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.task_queue.put(None)
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.results.close()
+
+    def receive(self) -> List[Tuple[str, Optional[str]]]:
+        """The results the worker has sent that were not received yet."""
+        results = []
+        try:
+            while self.results.poll():
+                results.append(self.results.recv())
+        except (EOFError, OSError):
+            # Exited; the process checks report the job it was running.
+            self.results.close()
+        return results
+
+
+def _drain(workers: Iterable[_Worker]) -> List[Tuple[_Worker, str, Optional[str]]]:
+    """Wait briefly for any worker to send a result, then collect every result that is ready."""
+    by_pipe = {worker.results: worker for worker in workers if not worker.results.closed}
+    if not by_pipe:
+        time.sleep(_POLL_INTERVAL_SECONDS)
+        return []
+    results = []
+    for pipe in wait(list(by_pipe), timeout=_POLL_INTERVAL_SECONDS):
+        worker = by_pipe[pipe]
+        results.extend((worker, file_path, reason) for file_path, reason in worker.receive())
+    return results
+
+
+def extract_file_metadata(
+    jobs: Sequence[Tuple[str, str]],
+    process_file: Callable,
+    base_directory: str,
+    max_workers: Optional[int] = None,
+    file_timeout_seconds: Optional[float] = None,
+    max_file_bytes: Optional[int] = None,
+    memory_limit_mb: Optional[int] = None,
+    on_start: Optional[Callable[[], None]] = None,
+    on_result: Optional[Callable[[str, Optional[str]], None]] = None,
+    urgent: Optional[Callable[[], Iterable[str]]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Run ``process_file(file_path, base_directory)`` for every ``(file_path,
+    json_path)`` job in worker processes and write each result to its
+    ``json_path``.
+
+    For streaming callers: ``on_start()`` runs once the worker processes are
+    up (start threads there, not before forking), ``on_result(file_path,
+    reason)`` reports every file as soon as it is written or skipped, and
+    ``urgent()`` names files that should be processed ahead of the rest.
+
+    Returns the files that were skipped, each as ``{"file_path", "reason"}``.
+    """
+    if not jobs:
+        if on_start is not None:
+            on_start()
+        return []
+    if max_workers is None:
+        max_workers = config.metadata_workers or available_cpu_count()
+    if file_timeout_seconds is None:
+        file_timeout_seconds = config.metadata_file_timeout_seconds
+    if max_file_bytes is None:
+        max_file_bytes = config.metadata_max_file_bytes
+    if memory_limit_mb is None:
+        memory_limit_mb = config.metadata_worker_memory_mb
+
+    ctx = multiprocessing.get_context()
+    worker_args = (process_file, base_directory, max_file_bytes, memory_limit_mb)
+    worker_count = max(1, min(max_workers, len(jobs)))
+    workers: Dict[int, _Worker] = {}
+    next_worker_id = 0
+    for _ in range(worker_count):
+        workers[next_worker_id] = _Worker(ctx, next_worker_id, worker_args)
+        next_worker_id += 1
+
+    pending = list(reversed(jobs))
+    queued = {job[0]: job for job in jobs}
+    prioritized: List[Tuple[str, str]] = []
+    skipped: List[Dict[str, str]] = []
+    total = len(jobs)
+    completed = 0
+    reported = 0
+    start_time = time.time()
+
+    def _finished(file_path: str, reason: Optional[str]) -> None:
+        if reason:
+            skipped.append({"file_path": file_path, "reason": reason})
+        if on_result is not None:
+            on_result(file_path, reason)
+
+    def _next_job() -> Optional[Tuple[str, str]]:
+        for stack in (prioritized, pending):
+            while stack:
+                job = stack.pop()
+                if queued.pop(job[0], None) is not None:
+                    return job
+        return None
+
+    def _replace(worker: _Worker) -> None:
+        nonlocal next_worker_id
+        worker.kill()
+        del workers[worker.worker_id]
+        workers[next_worker_id] = _Worker(ctx, next_worker_id, worker_args)
+        next_worker_id += 1
+
+    try:
+        if on_start is not None:
+            on_start()
+        while completed < total:
+            if queued and deadline_expired():
+                while True:
+                    job = _next_job()
+                    if job is None:
+                        break
+                    _finished(job[0], "run deadline reached")
+                    completed += 1
+            if urgent is not None:
+                # Pushed in reverse so the first urgent file is popped first.
+                prioritized.extend(queued[path] for path in reversed(list(urgent())) if path in queued)
+            for worker in list(workers.values()):
+                if worker.job is None and queued:
+                    job = _next_job()
+                    if job is not None:
+                        worker.assign(job)
+
+            for worker, file_path, reason in _drain(workers.values()):
+                if worker.job and worker.job[0] == file_path:
+                    worker.job = None
+                    completed += 1
+                    _finished(file_path, reason)
+
+            now = time.monotonic()
+            for worker in list(workers.values()):
+                if worker.job is None:
+                    continue
+                reason = None
+                if not worker.process.is_alive():
+                    reason = f"worker process exited with code {worker.process.exitcode}"
+                elif file_timeout_seconds and now - worker.started_at > file_timeout_seconds:
+                    reason = f"timed out after {file_timeout_seconds:g} seconds"
+                if reason:
+                    _finished(worker.job[0], reason)
+                    completed += 1
+                    _replace(worker)
+
+            if completed != reported:
+                reported = completed
+                print(
+                    f"Extracted metadata for {completed}/{total} files in "
+                    f"{int(time.time() - start_time)} seconds",
+                    end="\r",
+                    flush=True,
+                )
+        print()
+    finally:
+        for worker in workers.values():
+            worker.stop()
+        for worker in workers.values():
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.kill()
+            worker.results.close()
+
+    if skipped:
+        print(f"Skipped {len(skipped)} files during metadata extraction:")
+        for entry in skipped:
+            print(f"  - {entry['file_path']}: {entry['reason']}")
+    return skipped
@@ -1,8 +1,8 @@
 import re
 from pathlib import Path
-from config import Configurations
+from config import get_configurations
 
-config = Configurations()
+config = get_configurations()
 
 API_DECORATOR_NAMES = {
     'route', 'get', 'post', 'put', 'delete', 'patch',
@@ -33,7 +33,7 @@ def find_node_files(directory):
     node_files = []
     for file in directory.rglob('*'):
         if file.suffix in ('.js'):
-            if not any(part in config.ignored_dirs for part in file.parts):
+            if not config.ignored_paths.is_ignored(file):
                 node_files.append(file)
     return node_files
 
@@ -51,10 +51,11 @@ def file_contains_api_defs(file_path):
 
     return False
 
-def find_api_definition_files(directory):
-    node_files = find_node_files(directory)
-    api_files = []
-    for node_file in node_files:
+def iter_api_definition_files(directory):
+    """Yield API definition files as they are found, for streaming callers."""
+    for node_file in find_node_files(directory):
         if file_contains_api_defs(node_file):
-            api_files.append(str(node_file))
-    return api_files
+            yield str(node_file)
+
+def find_api_definition_files(directory):
+    return list(iter_api_definition_files(directory))
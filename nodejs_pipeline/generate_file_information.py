@@ -1,11 +1,44 @@
-from tree_sitter import Language, Parser, QueryCursor
-import tree_sitter_javascript
 import os
 import json
+from syntax_extractor import QueryExtractor, get_parser_pool
 
-# Load JavaScript grammar
-JS_LANGUAGE = Language(tree_sitter_javascript.language())
-parser = Parser(JS_LANGUAGE)
+# JavaScript grammar is loaded on first parse
+parser = get_parser_pool("javascript")
+
+# Every element kind plus identifier usages, collected in a single query pass.
+_ELEMENT_EXTRACTOR = QueryExtractor("javascript", """
+    (class_declaration
+        name: (identifier) @class-name) @class
+
+    (function_declaration
+        name: (identifier) @func-name) @function
+
+    (variable_declarator
+        name: (identifier) @var-name) @variable
+
+    (call_expression
+        function: (identifier) @called-func) @func-call
+
+    (call_expression
+        function: (member_expression
+            property: (property_identifier) @method-name)) @method-call
+
+    ; ES6 imports
+    (import_statement
+        (import_clause (identifier) @imported-symbol)?
+        source: (string) @import-source)
+
+    ; CommonJS require
+    (variable_declarator
+        name: (identifier) @var-name
+        value: (call_expression
+            function: (identifier) @require-func
+            arguments: (arguments (string) @require-source)
+        )
+    )
+
+    (identifier) @ident
+""")
 
 def parse_file(filename):
     with open(filename, 'r', encoding='utf-8') as f:
@@ -33,13 +66,10 @@ def get_module_origin(module_name, base_directory):
 
     return "<node_builtin_or_external>"
 
-def find_import_usages(tree, imported_names):
+def find_import_usages(tree, imported_names, captures=None):
     """Find where imported identifiers are used."""
-    query = JS_LANGUAGE.query("""
-        (identifier) @ident
-    """)
-    cursor = QueryCursor(query)
-    captures = cursor.captures(tree.root_node)
+    if captures is None:
+        captures = _ELEMENT_EXTRACTOR.captures(tree.root_node)
 
     usages = {name: [] for name in imported_names}
     for node in captures.get("ident", []):
@@ -50,44 +80,12 @@ def find_import_usages(tree, imported_names):
                 usages[name].append(line)
     return usages
 
-def get_elements(tree, code, base_directory):
+def get_elements(tree, code, base_directory, captures=None):
     """
     Extract classes, functions, variables, function calls, imports.
     """
-    query = JS_LANGUAGE.query("""
-        (class_declaration
-            name: (identifier) @class-name) @class
-
-        (function_declaration
-            name: (identifier) @func-name) @function
-
-        (variable_declarator
-            name: (identifier) @var-name) @variable
-
-        (call_expression
-            function: (identifier) @called-func) @func-call
-
-        (call_expression
-            function: (member_expression
-                property: (property_identifier) @method-name)) @method-call
-
-        ; ES6 imports
-        (import_statement
-            (import_clause (identifier) @imported-symbol)?
-            source: (string) @import-source)
-
-        ; CommonJS require
-        (variable_declarator
-            name: (identifier) @var-name
-            value: (call_expression
-                function: (identifier) @require-func
-                arguments: (arguments (string) @require-source)
-            )
-        )
-    """)
-
-    cursor = QueryCursor(query)
-    captures = cursor.captures(tree.root_node)
+    if captures is None:
+        captures = _ELEMENT_EXTRACTOR.captures(tree.root_node)
 
     elements = {
         'classes': [],
@@ -169,7 +167,7 @@ def get_elements(tree, code, base_directory):
 
     # Find import usages
     if imported_names:
-        usages = find_import_usages(tree, imported_names)
+        usages = find_import_usages(tree, imported_names, captures)
         for imp in elements['imports']:
             name = imp['imported_name']
             if name and name in usages:
@@ -3,6 +3,8 @@ import esprima
 import json
 import re
 
+from line_index import LineOffsets
+
 
 API_METHODS = {"get", "post", "put", "delete", "patch", "options", "head"}
 ROUTE_OBJECT_KEYWORDS = {"app", "router", "route", "api", "controller", "server"}
@@ -35,6 +37,7 @@ def _parse_with_optional_catch_fallback(source, *, loc=True):
 def _extract_endpoints_with_regex(source: str, file_path: Path):
     """Fallback endpoint detector when esprima cannot parse the file."""
     endpoints = []
+    line_offsets = LineOffsets(source)
     for match in FALLBACK_ENDPOINT_PATTERN.finditer(source):
         method = match.group('method').upper()
         route_literal = match.group('route')
@@ -43,8 +46,8 @@ def _extract_endpoints_with_regex(source: str, file_path: Path):
             route = route_literal[1:-1]
         start = match.start()
         end = match.end()
-        start_line = source.count('\n', 0, start) + 1
-        end_line = source.count('\n', 0, end) + 1
+        start_line = line_offsets.line_at(start)
+        end_line = line_offsets.line_at(end)
         obj = match.group('object') or ""
         low = obj.lower()
         if not (low in ROUTE_OBJECT_KEYWORDS or any(low.endswith(suf) for suf in ROUTE_OBJECT_SUFFIXES) or low.startswith(('app', 'api'))):
@@ -0,0 +1,276 @@
+"""
+Streaming stage graph shared by the language pipelines.
+
+Instead of extracting metadata for the whole repository, then identifying
+every endpoint, then generating, the stages overlap:
+
+    scan -> metadata extraction (worker processes, main thread)
+    identify (thread) -> bounded queue -> dispatch (thread) -> generation (thread pool) -> merge
+
+An identified endpoint is dispatched to generation as soon as the metadata
+its context is built from has been written, and the metadata extractor is
+asked to process those files first. Fragments are merged into the spec as
+they complete.
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from config import get_configurations
+from endpoint_generation import EndpointGeneration, EndpointJournal, FragmentMerger, StaticDiscovery, _imported_repo_files
+from endpoint_inventory import inventory_mode
+from endpoint_scope import get_endpoint_scope
+from metadata_extraction import extract_file_metadata
+from run_context import bind
+
+config = get_configurations()
+
+_IDENTIFIED = "identified"
+_JOB = "job"
+_FILE = "file"
+_METADATA_DONE = "metadata_done"
+_FAILED = "failed"
+
+
+class MetadataTracker:
+    """Which files' metadata has been written or skipped so far."""
+
+    def __init__(self, files: Iterable[str]):
+        self.expected: Set[str] = set(files)
+        self.done: Set[str] = set()
+        self._urgent: List[str] = []
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+
+    def mark_done(self, file_path: str) -> None:
+        with self._lock:
+            self.done.add(file_path)
+
+    def mark_all_done(self) -> None:
+        with self._lock:
+            self.done.update(self.expected)
+        self._all_done.set()
+
+    @property
+    def all_done(self) -> bool:
+        return self._all_done.is_set()
+
+    def wait_all(self) -> None:
+        """Block until every file has been processed, for stages that need the whole index."""
+        self._all_done.wait()
+
+    def missing(self, files: Iterable[str]) -> Set[str]:
+        with self._lock:
+            return {path for path in files if path in self.expected and path not in self.done}
+
+    def request(self, files: Iterable[str]) -> None:
+        with self._lock:
+            self._urgent.extend(files)
+
+    def take_urgent(self) -> List[str]:
+        with self._lock:
+            urgent, self._urgent = self._urgent, []
+        return urgent
+
+
+def metadata_dependencies(metadata_path_for: Callable[[str], str]) -> Callable[[Dict], Set[str]]:
+    """
+    Files whose metadata an endpoint's context is built from: its own file
+    and, once that file's metadata exists, the in-repo files it imports.
+    """
+
+    def _dependencies(job: Dict) -> Set[str]:
+        file_path = job.get("file_path")
+        if not file_path:
+            return set()
+        return {file_path} | _imported_repo_files(metadata_path_for(file_path), file_path)
+
+    return _dependencies
+
+
+class _Dispatcher:
+    """Admits identified endpoints to generation once their metadata is ready."""
+
+    def __init__(
+        self,
+        events: "queue.Queue",
+        tracker: MetadataTracker,
+        generation: EndpointGeneration,
+        dependencies: Optional[Callable[[Dict], Set[str]]],
+        base_directory: str,
+        discovery: Optional[StaticDiscovery] = None,
+    ):
+        self.events = events
+        self.tracker = tracker
+        self.generation = generation
+        self.dependencies = dependencies
+        self.base_directory = base_directory
+        self.discovery = discovery
+        self.scope = get_endpoint_scope()
+        self.inventory_only = inventory_mode()
+        self.identified: List[Dict] = []
+        self.out_of_scope = 0
+        self.error: Optional[BaseException] = None
+        self._waiting: Dict[str, List[int]] = {}
+        self._parked: Dict[int, Set[str]] = {}
+
+    def _missing(self, index: int) -> Set[str]:
+        if self.tracker.all_done:
+            return set()
+        if self.dependencies is None:
+            # Context needs an index over every file.
+            return {_METADATA_DONE}
+        try:
+            return self.tracker.missing(self.dependencies(self.generation.jobs[index]))
+        except Exception:
+            # Let generation report the problem for this endpoint.
+            return set()
+
+    def _evaluate(self, index: int) -> None:
+        missing = self._missing(index)
+        if not missing:
+            self._parked.pop(index, None)
+            self.generation.start(index)
+            return
+        self._parked[index] = missing
+        for path in missing:
+            self._waiting.setdefault(path, []).append(index)
+        self.tracker.request(path for path in missing if path != _METADATA_DONE)
+
+    def _accept(self, job: Dict) -> None:
+        if self.scope is not None and not self.scope.admits(job, self.base_directory):
+            self.out_of_scope += 1
+            return
+        self.identified.append(job)
+        if self.discovery is not None:
+            self.discovery.record_endpoint(job)
+        if self.inventory_only or self.error is not None:
+            return
+        index = self.generation.add(job)
+        if index is not None:
+            self._evaluate(index)
+
+    def _release(self, path: str) -> None:
+        for index in self._waiting.pop(path, []):
+            if index in self._parked:
+                self._parked.pop(index)
+                self._evaluate(index)
+
+    def _handle(self, kind: str, payload) -> None:
+        if kind == _FAILED:
+            if self.error is None:
+                self.error = payload
+        elif kind == _JOB:
+            self._accept(payload)
+        elif self.error is not None:
+            return
+        elif kind == _FILE:
+            self._release(payload)
+        elif kind == _METADATA_DONE:
+            for index in sorted(self._parked):
+                self._parked.pop(index)
+                self.generation.start(index)
+            self._waiting.clear()
+
+    def run(self) -> None:
+        identified = metadata_done = False
+        while not (identified and metadata_done):
+            kind, payload = self.events.get()
+            if kind == _METADATA_DONE:
+                metadata_done = True
+            elif kind in (_IDENTIFIED, _FAILED):
+                identified = True
+            try:
+                self._handle(kind, payload)
+            except BaseException as exc:
+                # Keep draining: the identify thread and metadata extraction
+                # block on the bounded queue until this loop ends.
+                if self.error is None:
+                    self.error = exc
+
+def stream_endpoints(
+    swagger: Dict,
+    merge: Callable[[Dict, Dict], None],
+    metadata_jobs: Sequence[Tuple[str, str]],
+    process_file: Callable,
+    base_directory: str,
+    identify: Callable[[MetadataTracker], Iterable[Dict]],
+    generate: Callable[[Dict], Dict],
+    dependencies: Optional[Callable[[Dict], Set[str]]] = None,
+    journal: Optional[EndpointJournal] = None,
+    queue_size: Optional[int] = None,
+    discovery: Optional[StaticDiscovery] = None,
+    metadata_path_for: Optional[Callable[[str], str]] = None,
+) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Run metadata extraction, endpoint identification and generation as
+    overlapping stages and merge fragments into ``swagger`` with ``merge``
+    as they complete.
+
+    ``identify(tracker)`` yields endpoint jobs in discovery order; it runs on
+    its own thread and may call ``tracker.wait_all()`` if it needs the full
+    metadata. ``dependencies(job)`` returns the source files whose metadata
+    the job's context reads; None means it needs all of it. In-scope jobs
+    are recorded in ``discovery`` as they are identified, so the fallback
+    can reuse them even if the pipeline raises; ``metadata_path_for`` maps
+    a source file to its metadata JSON for resolving their imports.
+
+    Returns the in-scope endpoint jobs, the failed endpoints and the skipped
+    endpoints.
+    """
+    if queue_size is None:
+        queue_size = config.endpoint_queue_size
+    events: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+    tracker = MetadataTracker(file_path for file_path, _ in metadata_jobs)
+    merger = FragmentMerger(swagger, merge)
+    generation = EndpointGeneration(generate, journal=journal, on_fragment=merger.add)
+    dispatcher = _Dispatcher(events, tracker, generation, dependencies, base_directory, discovery)
+
+    def _identify() -> None:
+        try:
+            for job in identify(tracker):
+                events.put((_JOB, job))
+        except BaseException as exc:
+            events.put((_FAILED, exc))
+        else:
+            events.put((_IDENTIFIED, None))
+
+    def _on_result(file_path: str, reason: Optional[str]) -> None:
+        tracker.mark_done(file_path)
+        events.put((_FILE, file_path))
+
+    threads = [
+        threading.Thread(target=bind(_identify), name="identify-endpoints", daemon=True),
+        threading.Thread(target=bind(dispatcher.run), name="dispatch-endpoints", daemon=True),
+    ]
+
+    def _start() -> None:
+        for thread in threads:
+            thread.start()
+
+    try:
+        extract_file_metadata(
+            metadata_jobs,
+            process_file,
+            base_directory,
+            on_start=_start,
+            on_result=_on_result,
+            urgent=tracker.take_urgent,
+        )
+    finally:
+        tracker.mark_all_done()
+        events.put((_METADATA_DONE, None))
+        for thread in threads:
+            if thread.ident is not None:
+                thread.join()
+        if discovery is not None and metadata_path_for is not None:
+            discovery.resolve_references(metadata_path_for)
+    if dispatcher.error is not None:
+        generation.finish()
+        raise dispatcher.error
+    if dispatcher.scope is not None:
+        total = dispatcher.out_of_scope + len(dispatcher.identified)
+        print(f"Scope filters kept {len(dispatcher.identified)} of {total} endpoints")
+    _, failed, skipped = generation.finish()
+    return dispatcher.identified, failed, skipped
@@ -1,8 +1,8 @@
 from pathlib import Path
 import ast
-from config import Configurations
+from config import get_configurations
 
-config = Configurations()
+config = get_configurations()
 
 API_DECORATOR_NAMES = {
     'route', 'get', 'post', 'put', 'delete', 'patch',
@@ -13,7 +13,7 @@ def find_python_files(directory):
     python_files = []
     for py_file in directory.rglob('*.py'):
         # Check if any parent directory is in IGNORE_DIRS
-        if not any(part in config.ignored_dirs for part in py_file.parts):
+        if not config.ignored_paths.is_ignored(py_file):
             python_files.append(py_file)
     return python_files
 
@@ -51,13 +51,14 @@ def file_contains_api_defs(file_path):
                     return True
     return False
 
-def find_api_definition_files(directory):
-    py_files = find_python_files(directory)
-    api_files = []
-    for py_file in py_files:
+def iter_api_definition_files(directory):
+    """Yield API definition files as they are found, for streaming callers."""
+    for py_file in find_python_files(directory):
         if file_contains_api_defs(py_file):
-            api_files.append(str(py_file))
-    return api_files
+            yield str(py_file)
+
+def find_api_definition_files(directory):
+    return list(iter_api_definition_files(directory))
 
 # directory = Path('/Users/ankits/PycharmProjects/data-science-model-serving')
 # api_files = find_api_definition_files(directory)
@@ -1,16 +1,31 @@
-from tree_sitter import Language, Parser, QueryCursor
-import tree_sitter_python
 import ast
-import importlib.util
 import os
-import sys
-from config import Configurations
-
-config = Configurations()
-
-PY_LANGUAGE = Language(tree_sitter_python.language())
-
-parser = Parser(PY_LANGUAGE)
+from config import get_configurations
+from python_pipeline.module_resolver import get_module_resolver
+from syntax_extractor import QueryExtractor, get_parser_pool
+
+config = get_configurations()
+
+parser = get_parser_pool("python")
+
+_ELEMENT_EXTRACTOR = QueryExtractor("python", """
+    (class_definition
+        name: (identifier) @class-name) @class
+    (function_definition
+        name: (identifier) @func-name) @function
+    (assignment
+        left: (identifier) @var-name) @variable
+    (call
+        function: (identifier) @called-func) @func-call
+    (call
+        function: (attribute
+            attribute: (identifier) @method-name)) @method-call
+    (import_statement
+        name: (dotted_name (identifier) @imported-func))
+    (import_from_statement
+        name: (dotted_name (identifier) @imported-func))
+    (identifier) @ident
+""")
 
 
 def parse_file(filename):
@@ -21,39 +36,15 @@ def parse_file(filename):
 
 
 def get_module_origin(module_name, base_directory=None):
-    try:
-        original_path = sys.path.copy()
-        if base_directory and base_directory not in sys.path:
-            sys.path.insert(0, base_directory)
-
-        spec = importlib.util.find_spec(module_name)
-        if spec and spec.origin:
-            return spec.origin
-        elif spec is None:
-            return "<built-in>"
-    except Exception:
-        pass
-    finally:
-        sys.path = original_path
-
-    if base_directory and "." in module_name:
-        parts = module_name.split(".")
-        potential_path = os.path.join(base_directory, *parts)
-        for ext in (".py", "/__init__.py"):
-            candidate = potential_path + ext
-            if os.path.exists(candidate):
-                return candidate
-    return None
-
-
-def find_import_usages(tree, imported_names):
-    """Find lines where imported names are used in the code."""
-    query = PY_LANGUAGE.query("""
-        (identifier) @ident
-    """)
+    if not base_directory:
+        return None
+    return get_module_resolver(base_directory).resolve(module_name)
+
 
-    cursor = QueryCursor(query)
-    captures = cursor.captures(tree.root_node)
+def find_import_usages(tree, imported_names, captures=None):
+    """Find lines where imported names are used in the code."""
+    if captures is None:
+        captures = _ELEMENT_EXTRACTOR.captures(tree.root_node)
 
     usages = {name: [] for name in imported_names}
 
@@ -67,7 +58,7 @@ def find_import_usages(tree, imported_names):
     return usages
 
 
-def analyze_imports(filepath, base_directory=None, tree=None):
+def analyze_imports(filepath, base_directory=None, tree=None, captures=None):
     imports = []
     imported_names = set()  # Track imported names for usage lookup
     try:
@@ -78,16 +69,21 @@ def analyze_imports(filepath, base_directory=None, tree=None):
         for node in ast.walk(tree_ast):
             if isinstance(node, ast.ImportFrom):
                 module = node.module
-                if module is None:
-                    continue  # skip relative imports
-                origin = get_module_origin(module, base_directory)
+                if node.level:
+                    resolver = get_module_resolver(base_directory or os.path.dirname(filepath))
+                    from_module = "." * node.level + (module or "")
+                else:
+                    from_module = module
+                    origin = get_module_origin(module, base_directory)
                 for alias in node.names:
+                    if node.level:
+                        origin = resolver.resolve_relative(filepath, module, node.level, alias.name)
                     name = alias.asname if alias.asname else alias.name
                     imported_names.add(name)
                     imports.append({
                         'type': 'import',
                         'imported_name': alias.name,
-                        'from_module': module,
+                        'from_module': from_module,
                         'origin': origin,
                         'line': node.lineno,
                         'path_exists': False,  # Will be updated later
@@ -112,7 +108,7 @@ def analyze_imports(filepath, base_directory=None, tree=None):
 
     # Find where imported names are used
     if tree and imported_names:
-        usages = find_import_usages(tree, imported_names)
+        usages = find_import_usages(tree, imported_names, captures)
         for import_item in imports:
             name = import_item['imported_name']
             if import_item.get('asname'):
@@ -122,27 +118,9 @@ def analyze_imports(filepath, base_directory=None, tree=None):
     return imports
 
 
-def get_elements(tree):
-    query = PY_LANGUAGE.query("""
-        (class_definition
-            name: (identifier) @class-name) @class
-        (function_definition
-            name: (identifier) @func-name) @function
-        (assignment
-            left: (identifier) @var-name) @variable
-        (call
-            function: (identifier) @called-func) @func-call
-        (call
-            function: (attribute
-                attribute: (identifier) @method-name)) @method-call
-        (import_statement
-            name: (dotted_name (identifier) @imported-func))
-        (import_from_statement
-            name: (dotted_name (identifier) @imported-func))
-    """)
-
-    cursor = QueryCursor(query)
-    captures = cursor.captures(tree.root_node)
+def get_elements(tree, captures=None):
+    if captures is None:
+        captures = _ELEMENT_EXTRACTOR.captures(tree.root_node)
 
     elements = {
         'classes': [],
@@ -233,8 +211,9 @@ def process_file(filename, base_directory=None):
     if not base_directory:
         base_directory = os.path.dirname(filename)
     tree, code = parse_file(filename)
-    elements = get_elements(tree)
-    imports = analyze_imports(filename, base_directory, tree)
+    captures = _ELEMENT_EXTRACTOR.captures(tree.root_node)
+    elements = get_elements(tree, captures)
+    imports = analyze_imports(filename, base_directory, tree, captures)
     imports = check_path_exists(imports, base_directory)
     return {
         'filename': filename,
@@ -247,8 +226,7 @@ def should_process_directory(dir_path: str) -> bool:
     """
     Check if a directory should be processed or ignored
     """
-    path_parts = dir_path.split(os.sep)
-    return not any(part in config.ignored_dirs for part in path_parts)
+    return not config.ignored_paths.is_ignored(dir_path)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,8 @@ API_DECORATOR_NAMES = {
     'api', 'endpoint', 'router', 'viewset', 'view'
 }
 
+HTTP_METHOD_NAMES = {'get', 'post', 'put', 'delete', 'patch', 'head', 'options'}
+
 def has_api_decorator(decorator_node):
     if isinstance(decorator_node, ast.Call) and hasattr(decorator_node.func, 'attr'):
         if decorator_node.func.attr.lower() in API_DECORATOR_NAMES:
@@ -32,6 +34,37 @@ def extract_route_from_decorator(decorator_node):
     return None
 
 
+def extract_http_methods_from_decorator(decorator_node):
+    """
+    HTTP methods a route decorator declares: its verb (``@app.get``), its
+    ``methods=[...]``, or GET for a bare ``route`` as in Flask.
+    """
+    if not isinstance(decorator_node, ast.Call):
+        return []
+    name = getattr(decorator_node.func, 'attr', None) or getattr(decorator_node.func, 'id', None)
+    if not name:
+        return []
+    if name.lower() in HTTP_METHOD_NAMES:
+        return [name.upper()]
+    for keyword in decorator_node.keywords:
+        if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple, ast.Set)):
+            return [
+                element.value.upper() for element in keyword.value.elts
+                if isinstance(element, ast.Constant) and isinstance(element.value, str)
+            ]
+    if name.lower() == 'route':
+        return ['GET']
+    return []
+
+
+def set_http_method(endpoint, methods):
+    # An endpoint serving several methods is generated once, so it keeps no
+    # single method and is matched on its route alone.
+    if len(set(methods)) == 1:
+        endpoint['http_method'] = methods[0]
+    return endpoint
+
+
 def find_api_endpoints(file_path):
     try:
         source = file_path.read_text(encoding='utf-8')
@@ -46,14 +79,14 @@ def find_api_endpoints(file_path):
             for dec in node.decorator_list:
                 if has_api_decorator(dec):
                     route = extract_route_from_decorator(dec)
-                    endpoints.append({
+                    endpoints.append(set_http_method({
                         "type": "function",
                         "name": node.name,
                         "start_line": node.lineno,
                         "end_line": getattr(node, 'end_lineno', None),
                         "route": route,
                         "file_path": str(file_path)
-                    })
+                    }, extract_http_methods_from_decorator(dec)))
         if isinstance(node, ast.ClassDef):
             class_has_decorator = any(has_api_decorator(dec) for dec in node.decorator_list)
             class_route = None
@@ -76,22 +109,27 @@ def find_api_endpoints(file_path):
             for body_item in node.body:
                 if isinstance(body_item, (ast.FunctionDef, ast.AsyncFunctionDef)):
                     method_route = None
+                    method_methods = []
                     method_has_decorator = any(has_api_decorator(dec) for dec in body_item.decorator_list)
                     if method_has_decorator:
                         for dec in body_item.decorator_list:
                             if has_api_decorator(dec):
                                 method_route = extract_route_from_decorator(dec)
+                                method_methods = extract_http_methods_from_decorator(dec)
                                 if method_route:
                                     break
+                    if not method_methods and body_item.name.lower() in HTTP_METHOD_NAMES:
+                        # Class-based views name their handlers after the verb.
+                        method_methods = [body_item.name.upper()]
                     if method_has_decorator or class_has_decorator:
-                        method_entry = {
+                        method_entry = set_http_method({
                             "type": "method",
                             "name": body_item.name,
                             "start_line": body_item.lineno,
                             "end_line": getattr(body_item, 'end_lineno', None),
                             "route": method_route if method_route else class_route,
                             "file_path": str(file_path)
-                        }
+                        }, method_methods)
                         if node.name in class_endpoints:
                             class_endpoints[node.name]["methods"].append(method_entry)
     return endpoints
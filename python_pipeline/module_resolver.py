@@ -0,0 +1,159 @@
+"""
+Static module resolution for the Python pipeline.
+
+Maps dotted module names to source files without importing anything or
+touching ``sys.path``. The repository layout is indexed once per run, and
+installed packages are looked up through a top-level name index of the
+interpreter's search path.
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config import get_configurations
+
+config = get_configurations()
+
+BUILT_IN_ORIGIN = "<built-in>"
+_SOURCE_SUFFIXES = (".py",)
+_EXTENSION_SUFFIXES = (".py", ".pyc", ".so", ".pyd")
+
+
+def _module_file(path_without_suffix: str, suffixes: Iterable[str] = _SOURCE_SUFFIXES) -> Optional[str]:
+    """Return ``<path>.py`` or ``<path>/__init__.py`` when either exists."""
+    for suffix in suffixes:
+        candidate = path_without_suffix + suffix
+        if os.path.isfile(candidate):
+            return candidate
+    init_file = os.path.join(path_without_suffix, "__init__.py")
+    if os.path.isfile(init_file):
+        return init_file
+    return None
+
+
+class ModuleResolver:
+    def __init__(self, base_directory: str, search_paths: Optional[List[str]] = None):
+        self.base_directory = os.path.normpath(os.path.abspath(base_directory))
+        self._repo_modules = self._index_repository()
+        self._external_roots = self._index_search_paths(
+            search_paths if search_paths is not None else sys.path
+        )
+        self._external_cache: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _index_repository(self) -> Dict[str, str]:
+        modules: Dict[str, str] = {}
+        for root, dirs, files in os.walk(self.base_directory):
+            dirs[:] = config.ignored_paths.prune(dirs)
+            relative_dir = os.path.relpath(root, self.base_directory)
+            package_parts = [] if relative_dir == os.curdir else relative_dir.split(os.sep)
+            for file_name in files:
+                if not file_name.endswith(".py"):
+                    continue
+                if file_name == "__init__.py":
+                    if package_parts:
+                        modules[".".join(package_parts)] = os.path.join(root, file_name)
+                    continue
+                dotted = ".".join(package_parts + [file_name[: -len(".py")]])
+                modules.setdefault(dotted, os.path.join(root, file_name))
+        return modules
+
+    def _index_search_paths(self, search_paths: Iterable[str]) -> Dict[str, str]:
+        """Map each importable top-level name to the first search path providing it."""
+        roots: Dict[str, str] = {}
+        for entry in search_paths:
+            if not entry or not os.path.isabs(entry) or not os.path.isdir(entry):
+                continue
+            entry = os.path.normpath(entry)
+            if entry == self.base_directory or entry.startswith(self.base_directory + os.sep):
+                continue
+            try:
+                names = os.listdir(entry)
+            except OSError:
+                continue
+            for name in names:
+                top_level = name.split(".", 1)[0]
+                if top_level and top_level.isidentifier() and top_level not in roots:
+                    roots[top_level] = entry
+        return roots
+
+    def resolve(self, module_name: str) -> Optional[str]:
+        """Return the file defining ``module_name``, ``<built-in>`` or None."""
+        if not module_name:
+            return None
+        repo_origin = self._repo_modules.get(module_name)
+        if repo_origin:
+            return repo_origin
+        cached = self._external_cache.get(module_name)
+        if cached is not None or module_name in self._external_cache:
+            return cached
+        origin = self._resolve_external(module_name)
+        with self._lock:
+            self._external_cache[module_name] = origin
+        return origin
+
+    def _resolve_external(self, module_name: str) -> Optional[str]:
+        top_level = module_name.split(".", 1)[0]
+        if top_level in sys.builtin_module_names:
+            return "built-in"
+        root = self._external_roots.get(top_level)
+        if root is None:
+            return BUILT_IN_ORIGIN
+        origin = _module_file(os.path.join(root, *module_name.split(".")), _EXTENSION_SUFFIXES)
+        if origin is None and "." in module_name:
+            # Attribute-style imports such as ``os.path`` resolve to the parent.
+            return self.resolve(module_name.rsplit(".", 1)[0])
+        return origin
+
+    def resolve_relative(
+        self, importer_path: str, module: Optional[str], level: int, name: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Resolve ``from <dots><module> import <name>`` relative to the importing
+        file. When ``module`` is empty the imported ``name`` may itself be a
+        submodule, which takes precedence over the package.
+        """
+        package_dir = os.path.dirname(os.path.abspath(importer_path))
+        for _ in range(max(level, 1) - 1):
+            package_dir = os.path.dirname(package_dir)
+        target = os.path.join(package_dir, *module.split(".")) if module else package_dir
+        if not module and name:
+            submodule = _module_file(os.path.join(target, name))
+            if submodule:
+                return submodule
+        return _module_file(target)
+
+
+_RESOLVERS: Dict[str, ModuleResolver] = {}
+_RESOLVERS_LOCK = threading.Lock()
+
+
+def _reset_lock() -> None:
+    # A worker forked while another run's thread held the lock would wait on it forever.
+    global _RESOLVERS_LOCK
+    _RESOLVERS_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_lock)
+
+
+def get_module_resolver(base_directory: str, refresh: bool = False) -> ModuleResolver:
+    """
+    Return the resolver for ``base_directory``, building it on first use.
+    Pass ``refresh=True`` at the start of a run to pick up layout changes.
+    """
+    key = os.path.normpath(os.path.abspath(base_directory))
+    if not refresh:
+        with _RESOLVERS_LOCK:
+            resolver = _RESOLVERS.get(key)
+        if resolver is not None:
+            return resolver
+    # Built outside the lock: indexing one repository must not hold up
+    # lookups for another.
+    resolver = ModuleResolver(key)
+    with _RESOLVERS_LOCK:
+        if refresh or key not in _RESOLVERS:
+            _RESOLVERS[key] = resolver
+        return _RESOLVERS[key]
@@ -1,50 +1,45 @@
-import os, json, ast
+import os
 import shutil
 import datetime
 from pathlib import Path
 from python_pipeline.generate_file_information import process_file
-from python_pipeline.find_api_definition_files import find_api_definition_files
-from python_pipeline.identify_api_functions import set_parents, find_api_endpoints
-from config import Configurations
+from python_pipeline.find_api_definition_files import iter_api_definition_files
+from python_pipeline.identify_api_functions import find_api_endpoints
+from python_pipeline.module_resolver import get_module_resolver
+from config import get_configurations
+from dependency_index import FileDependencyIndex, load_file_metadata
+from file_cache import read_file_lines
+from endpoint_generation import record_failed_endpoints
+from pipeline_stream import metadata_dependencies, stream_endpoints
 from python_pipeline.definition_swagger_generator import get_function_definition_swagger
 from utils import get_git_commit_hash, get_github_repo_url, get_repo_path, get_repo_name
 
-config = Configurations()
+config = get_configurations()
+
+_HTTP_METHOD_NAMES = {'get', 'post', 'put', 'delete', 'patch'}
 
 
 def should_process_directory(dir_path: str) -> bool:
     """
     Check if a directory should be processed or ignored
     """
-    path_parts = dir_path.split(os.sep)
-    return not any(part in config.ignored_dirs for part in path_parts)
+    return not config.ignored_paths.is_ignored(dir_path)
 
-def run_swagger_generation(host):
+def run_swagger_generation(host, discovery=None, journal=None):
     directory_path = get_repo_path()
     repo_name = get_repo_name()
     new_dir_name = "qodex_file_information"
     new_dir_path = os.path.join(directory_path, new_dir_name)
     os.makedirs(new_dir_path, exist_ok=True)
+    metadata_jobs = []
     for root, dirs, files in os.walk(directory_path):
         for file in files:
             file_path = os.path.join(root, file)
             if os.path.exists(file_path) and should_process_directory(str(file_path)) and file_path.endswith(".py"):
-                file_info = process_file(file_path, directory_path)
                 json_file_name = new_dir_path +"/"+ str(file_path).replace("/", "_q_").strip(".py") + ".json"
-                with open(json_file_name, "w") as f:
-                    json.dump(file_info, f, indent=4)
-    api_definition_files = find_api_definition_files(directory_path)
-    all_endpoints_dict = dict()
-    for file in api_definition_files:
-        all_endpoints = []
-        py_file = Path(file)
-        source = py_file.read_text(encoding="utf-8")
-        tree = ast.parse(source)
-        set_parents(tree)
-        eps = find_api_endpoints(py_file)
-        if eps:
-            all_endpoints.extend(eps)
-            all_endpoints_dict[file] = all_endpoints
+                metadata_jobs.append((file_path, json_file_name))
+    # Build the module index before forking so workers share it.
+    get_module_resolver(directory_path, refresh=True)
     swagger = {
             "openapi": "3.0.0",
             "info": {
@@ -62,62 +57,72 @@ def run_swagger_generation(host):
             ],
             "paths": {}
         }
-    for key, value in all_endpoints_dict.items():
-        for item in value:
-            if item['type'] == 'class':
-                if item['methods']:
-                    for item1 in item['methods']:
-                        context_code_blocks, method_definition_code_block = provide_context_codeblock(directory_path, item1)
-                        swagger_for_def = get_function_definition_swagger(method_definition_code_block, context_code_blocks, item1['route'])
-                        key = list(swagger_for_def['paths'].keys())[0]
-                        if key not in swagger["paths"]:
-                            swagger["paths"][key] = {}
-                        _method_list = list(swagger_for_def['paths'][key].keys())
-                        if not _method_list:
-                            continue
-                        _method = _method_list[0]
-                        swagger["paths"][key][_method] = swagger_for_def['paths'][key][_method]
-            else:
-                context_code_blocks, method_definition_code_block = provide_context_codeblock(directory_path,item)
-                swagger_for_def = get_function_definition_swagger(method_definition_code_block, context_code_blocks, item['route'])
-                key = list(swagger_for_def['paths'].keys())[0]
-                if key not in swagger["paths"]:
-                    swagger["paths"][key] = {}
-                _method_list = list(swagger_for_def['paths'][key].keys())
-                if not _method_list:
-                    continue
-                _method = _method_list[0]
-                swagger["paths"][key][_method] = swagger_for_def['paths'][key][_method]
+    metadata_path_for = lambda path: new_dir_path + "/" + str(path).replace("/", "_q_").strip(".py") + ".json"
+
+    def _identify_endpoints(metadata):
+        api_definition_files = []
+        for file in iter_api_definition_files(directory_path):
+            api_definition_files.append(file)
+            for item in find_api_endpoints(Path(file)) or []:
+                if item['type'] == 'class':
+                    yield from item['methods'] or []
+                else:
+                    yield item
+        if discovery is not None:
+            discovery.record_api_files(api_definition_files)
+
+    def _generate_swagger_fragment(method_info):
+        context_code_blocks, method_definition_code_block = provide_context_codeblock(directory_path, method_info)
+        return get_function_definition_swagger(method_definition_code_block, context_code_blocks, method_info['route'])
+
+    _, failed, skipped = stream_endpoints(
+        swagger,
+        _merge_paths,
+        metadata_jobs,
+        process_file,
+        directory_path,
+        _identify_endpoints,
+        _generate_swagger_fragment,
+        dependencies=metadata_dependencies(metadata_path_for),
+        journal=journal,
+        discovery=discovery,
+        metadata_path_for=metadata_path_for,
+    )
+    record_failed_endpoints(swagger, failed, skipped)
     shutil.rmtree(new_dir_path)
     return swagger
 
 
-def get_dependencies(data, start_line, end_line, file_path):
-    existing_function_names = [item['name'] for item in data['elements']['functions'] if item['name'] not in ['get', 'post', 'put', 'delete', 'patch']]
+def _merge_paths(swagger, swagger_for_def):
+    key = list(swagger_for_def['paths'].keys())[0]
+    if key not in swagger["paths"]:
+        swagger["paths"][key] = {}
+    _method_list = list(swagger_for_def['paths'][key].keys())
+    if not _method_list:
+        return
+    _method = _method_list[0]
+    swagger["paths"][key][_method] = swagger_for_def['paths'][key][_method]
+
+
+def get_dependencies(data, start_line, end_line, file_path, index=None):
+    if index is None:
+        index = FileDependencyIndex(data)
     in_file_dependency_functions = []
-    for item in data['elements']['function_calls']:
-        if (item['name'] in existing_function_names) and item['start_line'] >= start_line and item['end_line'] <= end_line:
-            item['file_path'] = file_path
-            in_file_dependency_functions.append(item)
+    for item in index.calls_starting_within(start_line, end_line):
+        if item['name'] in index.function_names and item['name'] not in _HTTP_METHOD_NAMES and item['end_line'] <= end_line:
+            in_file_dependency_functions.append(dict(item, file_path=file_path))
+    # Calls found above lie inside the handler, so usages inside them are
+    # already counted; each usage line in range adds the import once more.
     imported_functions = []
-    for item in data['imports']:
-        if not item['path_exists']:
-            continue
-        for k in item['usage_lines']:
-            if start_line<=k<=end_line:
-                imported_functions.append(item)
-            if in_file_dependency_functions:
-                for item1 in in_file_dependency_functions:
-                    if item1['start_line'] <= k <= item1['end_line'] and item not in imported_functions:
-                        imported_functions.append(item)
+    for item, usages in index.imports_used_within(start_line, end_line):
+        if item['path_exists']:
+            imported_functions.extend([item] * usages)
     return in_file_dependency_functions, imported_functions
 
 def get_code_blocks(in_file_dependency_functions, imported_functions, file_name, directory_path):
     code_blocks = []
     for block in in_file_dependency_functions:
-        with open(file_name, "r") as f:
-            lines = f.readlines()
-            f.close()
+        lines = read_file_lines(file_name)
         code_blocks.append(lines[block['function_start_line'] - 1 : block['function_start_line']])
     for func in imported_functions:
         visited = False
@@ -125,32 +130,24 @@ def get_code_blocks(in_file_dependency_functions, imported_functions, file_name,
         json_dir_path = directory_path + "/" + "qodex_file_information"
         json_file = str(file_name).replace("/", "_q_").strip(".py") + ".json"
         complete_json_file_path = json_dir_path + "/" + json_file
-        with open(complete_json_file_path, "r") as f:
-            data = json.load(f)
-            f.close()
+        data, _ = load_file_metadata(complete_json_file_path)
         for item in data['elements']['classes']:
             if item['name'] == func['imported_name']:
                 visited = True
-                with open(file_name, "r") as f:
-                    lines = f.readlines()
-                    f.close()
+                lines = read_file_lines(file_name)
                 code_blocks.append(lines[item['start_line']-1: item['end_line']])
                 break
         if not visited:
             for item in data['elements']['functions']:
                 if item['name'] == func['imported_name']:
                     visited = True
-                    with open(file_name, "r") as f:
-                        lines = f.readlines()
-                        f.close()
+                    lines = read_file_lines(file_name)
                     code_blocks.append(lines[item['start_line'] - 1: item['end_line']])
                     break
         if not visited:
             for item in data['elements']['variables']:
                 if item['name'] == func['imported_name']:
-                    with open(file_name, "r") as f:
-                        lines = f.readlines()
-                        f.close()
+                    lines = read_file_lines(file_name)
                     code_blocks.append(lines[item['start_line'] - 1: item['end_line']])
                     break
     return code_blocks
@@ -158,15 +155,13 @@ def get_code_blocks(in_file_dependency_functions, imported_functions, file_name,
 
 def provide_context_codeblock(directory_path, method_info):
     file_name = method_info['file_path']
-    with open(method_info['file_path'], "r") as f:
-        lines = f.readlines()
+    lines = read_file_lines(method_info['file_path'])
     method_definition_code_block = lines[method_info["start_line"]-1: method_info["end_line"]]
     json_dir_path = directory_path + "/" + "qodex_file_information"
     json_file = str(file_name).replace("/", "_q_").strip(".py") + ".json"
     complete_json_file_path = json_dir_path + "/" + json_file
-    with open(complete_json_file_path, "r") as f:
-        data = json.load(f)
-    in_file_dependency_functions, imported_functions = get_dependencies(data, method_info["start_line"], method_info["end_line"], method_info['file_path'])
+    data, index = load_file_metadata(complete_json_file_path)
+    in_file_dependency_functions, imported_functions = get_dependencies(data, method_info["start_line"], method_info["end_line"], method_info['file_path'], index)
     context_code_blocks = get_code_blocks(in_file_dependency_functions, imported_functions, file_name, directory_path)
     return context_code_blocks, method_definition_code_block
 
@@ -1,13 +1,13 @@
 from pathlib import Path
 from typing import List
 
-from config import Configurations
+from config import get_configurations
 
-config = Configurations()
+config = get_configurations()
 
 
 def _is_ignored(path: Path) -> bool:
-    return any(part in config.ignored_dirs for part in path.parts)
+    return config.ignored_paths.is_ignored(path)
 
 
 def _looks_like_controller(path: Path) -> bool:
@@ -1,15 +1,21 @@
 import os
 from typing import Dict, List, Optional
 
-from tree_sitter import Language, Parser
-import tree_sitter_ruby
+from config import get_configurations
+from syntax_extractor import get_parser_pool, iter_nodes
 
-from config import Configurations
+config = get_configurations()
 
-config = Configurations()
-
-RUBY_LANGUAGE = Language(tree_sitter_ruby.language())
-parser = Parser(RUBY_LANGUAGE)
+parser = get_parser_pool("ruby")
+_ELEMENT_NODE_TYPES = {
+    "class",
+    "module",
+    "method",
+    "singleton_method",
+    "call",
+    "command",
+    "command_call",
+}
 
 
 def parse_file(filename: str):
@@ -63,7 +69,7 @@ def _gather_method_info(node, source: str) -> Dict:
     }
 
 
-def _gather_call_info(node, source: str) -> Dict:
+def _gather_call_info(node, source: str, scopes: Optional[Dict] = None) -> Dict:
     name_node = node.child_by_field_name("method")
     if not name_node:
         name_node = node.child_by_field_name("name")
@@ -75,16 +81,35 @@ def _gather_call_info(node, source: str) -> Dict:
         "end_line": node.end_point[0] + 1,
     }
 
-    definition_range = _infer_definition_range(node, source)
+    definition_range = _infer_definition_range(node, source, scopes)
     if definition_range:
         call_info.update(definition_range)
     return call_info
 
 
-def _infer_definition_range(node, source: str) -> Optional[Dict]:
+def _scope_methods(scope, source: str, scopes: Dict) -> Dict[str, Dict]:
+    """Definition ranges of the methods directly inside ``scope``, by name; first one wins."""
+    methods = scopes.get(scope)
+    if methods is None:
+        methods = {}
+        for child in scope.children:
+            if child.type in {"method", "singleton_method"}:
+                method_name_node = child.child_by_field_name("name")
+                if method_name_node:
+                    methods.setdefault(_node_text(source, method_name_node), {
+                        "function_start_line": child.start_point[0] + 1,
+                        "function_end_line": child.end_point[0] + 1,
+                    })
+        scopes[scope] = methods
+    return methods
+
+
+def _infer_definition_range(node, source: str, scopes: Optional[Dict] = None) -> Optional[Dict]:
     """
     Attempt to infer the definition range for an inline function call by
     locating the matching method definition within the same source buffer.
+    ``scopes`` memoizes the methods of each enclosing scope across the calls
+    of one file, so each scope's children are scanned once.
     """
     name_node = node.child_by_field_name("method")
     if not name_node:
@@ -93,17 +118,14 @@ def _infer_definition_range(node, source: str) -> Optional[Dict]:
         return None
 
     name = _node_text(source, name_node)
-    # This heuristic scans siblings in the same scope looking for `def name`.
+    if scopes is None:
+        scopes = {}
+    # This heuristic looks for `def name` among the siblings in each enclosing scope.
     parent = node.parent
     while parent is not None:
-        for sibling in parent.children:
-            if sibling.type in {"method", "singleton_method"}:
-                method_name_node = sibling.child_by_field_name("name")
-                if method_name_node and _node_text(source, method_name_node) == name:
-                    return {
-                        "function_start_line": sibling.start_point[0] + 1,
-                        "function_end_line": sibling.end_point[0] + 1,
-                    }
+        definition_range = _scope_methods(parent, source, scopes).get(name)
+        if definition_range:
+            return dict(definition_range)
         parent = parent.parent
     return None
 
@@ -174,10 +196,9 @@ def get_elements(tree, source: str, base_directory: str) -> Dict:
         "function_calls": [],
     }
     imports: List[Dict] = []
+    scopes: Dict = {}
 
-    cursor = [tree.root_node]
-    while cursor:
-        node = cursor.pop()
+    for node in iter_nodes(tree.root_node, _ELEMENT_NODE_TYPES):
         node_type = node.type
         if node_type == "class":
             elements["classes"].append(_gather_class_info(node, source))
@@ -186,14 +207,12 @@ def get_elements(tree, source: str, base_directory: str) -> Dict:
         elif node_type in {"method", "singleton_method"}:
             elements["functions"].append(_gather_method_info(node, source))
         elif node_type in {"call", "command", "command_call"}:
-            elements["function_calls"].append(_gather_call_info(node, source))
+            elements["function_calls"].append(_gather_call_info(node, source, scopes))
 
             import_info = _gather_import_info(node, source, base_directory)
             if import_info:
                 imports.append(import_info)
 
-        cursor.extend(list(node.children))
-
     return elements, imports
 
 
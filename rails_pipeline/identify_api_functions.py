@@ -2,8 +2,9 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from tree_sitter import Language, Node, Parser
-import tree_sitter_ruby
+from tree_sitter import Node
+
+from syntax_extractor import get_parser_pool
 
 HTTP_METHODS = {"get", "post", "put", "patch", "delete"}
 REST_ACTION_ORDER = [
@@ -16,8 +17,7 @@ REST_ACTION_ORDER = [
     "destroy",
 ]
 
-RUBY_LANGUAGE = Language(tree_sitter_ruby.language())
-parser = Parser(RUBY_LANGUAGE)
+parser = get_parser_pool("ruby")
 
 
 def _iter_block_children(block_node: Optional[Node]):
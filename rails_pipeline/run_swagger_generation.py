@@ -2,13 +2,22 @@ import json
 import os
 import re
 import shutil
-import time
+import threading
 import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-
-from config import Configurations
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import get_configurations
+from dependency_index import FileDependencyIndex, load_file_metadata
+from file_cache import read_file_lines_or_none
+from symbol_table import StringPool, Symbol, SymbolTable
+from endpoint_generation import (
+    EndpointJournal,
+    StaticDiscovery,
+    record_failed_endpoints,
+)
+from pipeline_stream import MetadataTracker, stream_endpoints
 from utils import get_git_commit_hash, get_github_repo_url, get_repo_path, get_repo_name
 from rails_pipeline.definition_swagger_generator import (
     get_function_definition_swagger,
@@ -23,17 +32,12 @@ from rails_pipeline.identify_api_functions import (
     find_api_endpoints,
 )
 
-config = Configurations()
-
+config = get_configurations()
 
-_CLASS_INDEX_CACHE: Dict[str, Dict[str, object]] = {}
-_CLASS_INDEX_CACHE_ROOT: Optional[str] = None
-_CLASS_CODE_BLOCK_CACHE: Dict[str, List[str]] = {}
-_FILE_CONTENT_CACHE: Dict[str, List[str]] = {}
-_FUNCTION_INDEX_CACHE: Dict[str, List[Dict[str, object]]] = {}
 
 _PARAM_PATTERN = re.compile(r"params\[(?::|['\"])([A-Za-z0-9_]+)['\"]?\]")
 _PARAM_HINT_FUNCTIONS = {"apply_filters"}
+_HTTP_METHOD_NAMES = {"get", "post", "put", "delete", "patch"}
 
 
 def should_process_directory(dir_path: str) -> bool:
@@ -41,8 +45,7 @@ def should_process_directory(dir_path: str) -> bool:
     Check if a directory should be processed or ignored.
     Mirrors the logic used by the Node.js and Python generators.
     """
-    path_parts = dir_path.split(os.sep)
-    return not any(part in config.ignored_dirs for part in path_parts)
+    return not config.ignored_paths.is_ignored(dir_path)
 
 
 def _sanitize_json_filename(file_path: str) -> str:
@@ -54,14 +57,36 @@ def _sanitize_json_filename(file_path: str) -> str:
     return f"{normalized}.json"
 
 
-def run_swagger_generation(host: str) -> Dict:
+class RailsRunState:
+    """
+    Class and function indexes and class code blocks of one run. Passed to
+    the context helpers, so concurrent runs in one process share nothing;
+    file contents come from the shared ``file_cache``.
+    """
+
+    def __init__(self, directory_path: str, metadata_dir: str):
+        self.directory_path = directory_path
+        self.metadata_dir = metadata_dir
+        self.class_index = SymbolTable()
+        self.function_index = SymbolTable()
+        self.class_code_blocks: Dict[str, List[str]] = {}
+        self.lock = threading.Lock()
+
+
+def run_swagger_generation(
+    host: str,
+    discovery: Optional[StaticDiscovery] = None,
+    journal: Optional[EndpointJournal] = None,
+) -> Dict:
     directory_path = get_repo_path()
     repo_name = get_repo_name()
     new_dir_name = "qodex_file_information"
     new_dir_path = os.path.join(directory_path, new_dir_name)
     os.makedirs(new_dir_path, exist_ok=True)
+    state = RailsRunState(directory_path, new_dir_path)
 
     try:
+        metadata_jobs: List[Tuple[str, str]] = []
         for root, _, files in os.walk(directory_path):
             for filename in files:
                 file_path = os.path.join(root, filename)
@@ -70,34 +95,9 @@ def run_swagger_generation(host: str) -> Dict:
                     and should_process_directory(str(file_path))
                     and file_path.endswith(".rb")
                 ):
-                    try:
-                        file_info = process_file(file_path, directory_path)
-                    except Exception:
-                        # Skip files that fail to parse; we still want best-effort coverage.
-                        continue
-
                     json_file_name = _sanitize_json_filename(str(file_path))
                     json_file_path = os.path.join(new_dir_path, json_file_name)
-                    with open(json_file_path, "w", encoding="utf-8") as f:
-                        json.dump(file_info, f, indent=4)
-
-        api_definition_files = find_api_definition_files(directory_path)
-        all_endpoints_dict: Dict[str, List[Dict]] = {}
-        route_map: Dict[str, List[Dict]] = {}
-        controller_files: List[Path] = []
-
-        for file in api_definition_files:
-            ruby_file = Path(file)
-            if ruby_file.as_posix().endswith("config/routes.rb"):
-                find_api_endpoints(ruby_file, directory_path, route_map)
-            else:
-                controller_files.append(ruby_file)
-
-        for controller_file in controller_files:
-            endpoints = find_api_endpoints(controller_file, directory_path, route_map)
-            if endpoints:
-                all_endpoints_dict[str(controller_file)] = endpoints
-
+                    metadata_jobs.append((str(file_path), json_file_path))
         swagger = {
             "openapi": "3.0.0",
             "info": {
@@ -112,20 +112,31 @@ def run_swagger_generation(host: str) -> Dict:
             "paths": {},
         }
 
-        endpoint_jobs: List[Dict] = []
-        for _, endpoints in all_endpoints_dict.items():
-            for endpoint in endpoints:
-                if endpoint["type"] == "class":
-                    endpoint_jobs.extend(endpoint.get("methods", []))
+        def _identify_endpoints(metadata: MetadataTracker) -> Iterator[Dict]:
+            api_definition_files = find_api_definition_files(directory_path)
+            route_map: Dict[str, List[Dict]] = {}
+            controller_files: List[Path] = []
+
+            for file in api_definition_files:
+                ruby_file = Path(file)
+                if ruby_file.as_posix().endswith("config/routes.rb"):
+                    find_api_endpoints(ruby_file, directory_path, route_map)
                 else:
-                    endpoint_jobs.append(endpoint)
+                    controller_files.append(ruby_file)
+
+            if discovery is not None:
+                discovery.record_api_files(api_definition_files)
 
-        if not endpoint_jobs:
-            return swagger
+            for controller_file in controller_files:
+                for endpoint in find_api_endpoints(controller_file, directory_path, route_map) or []:
+                    if endpoint["type"] == "class":
+                        yield from endpoint.get("methods", [])
+                    else:
+                        yield endpoint
 
         def _generate_swagger_fragment(method_info: Dict) -> Dict:
             context_blocks, method_definition = provide_context_codeblock(
-                directory_path, method_info
+                state, method_info
             )
             http_method = method_info.get("http_method")
             if http_method:
@@ -142,23 +153,22 @@ def run_swagger_generation(host: str) -> Dict:
                 http_method=http_method,
             )
 
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            completed = 0
-            start_time = time.time()
-            latest_message = ""
-            futures = [executor.submit(_generate_swagger_fragment, method) for method in endpoint_jobs]
-            for future in as_completed(futures):
-                swagger_for_def = future.result()
-                _merge_paths(swagger, swagger_for_def)
-                completed += 1
-                end_time = time.time()
-                latest_message = (
-                    f"Completed generating endpoint related information for {completed} endpoints in "
-                    f"{int(end_time - start_time)} seconds"
-                )
-                print(latest_message, end="\r", flush=True)
-            if completed:
-                print(latest_message)
+        # Context comes from a class index over every file, so generation
+        # starts once all metadata is written; identification overlaps it.
+        # Files that fail to parse are skipped; we still want best-effort coverage.
+        _, failed, skipped = stream_endpoints(
+            swagger,
+            _merge_paths,
+            metadata_jobs,
+            process_file,
+            directory_path,
+            _identify_endpoints,
+            _generate_swagger_fragment,
+            journal=journal,
+            discovery=discovery,
+            metadata_path_for=lambda path: os.path.join(new_dir_path, _sanitize_json_filename(str(path))),
+        )
+        record_failed_endpoints(swagger, failed, skipped)
 
         return swagger
     finally:
@@ -178,109 +188,99 @@ def _merge_paths(target: Dict, source: Dict) -> None:
             target["paths"][path_key][method] = payload
 
 
-def _ensure_class_index(directory_path: str) -> Dict[str, Dict[str, object]]:
-    global _CLASS_INDEX_CACHE
-    global _CLASS_INDEX_CACHE_ROOT
-    global _CLASS_CODE_BLOCK_CACHE
-    global _FUNCTION_INDEX_CACHE
-    if _CLASS_INDEX_CACHE and _CLASS_INDEX_CACHE_ROOT == directory_path:
-        return _CLASS_INDEX_CACHE
-
-    _CLASS_INDEX_CACHE = {}
-    _CLASS_CODE_BLOCK_CACHE = {}
-    _FILE_CONTENT_CACHE.clear()
-    _FUNCTION_INDEX_CACHE = {}
-    _CLASS_INDEX_CACHE_ROOT = directory_path
-
-    json_dir_path = os.path.join(directory_path, "qodex_file_information")
-    if not os.path.exists(json_dir_path):
-        return _CLASS_INDEX_CACHE
+def _ensure_class_index(state: RailsRunState) -> SymbolTable:
+    if state.class_index:
+        return state.class_index
+
+    # Endpoint workers call this concurrently; build the index once and only
+    # publish it when complete so no worker sees a partial index.
+    with state.lock:
+        if state.class_index:
+            return state.class_index
+        strings = StringPool()
+        class_index = SymbolTable(strings)
+        function_index = SymbolTable(strings)
+        json_dir_path = state.metadata_dir
+        if os.path.exists(json_dir_path):
+            entries = list(os.scandir(json_dir_path))
+        else:
+            entries = []
+
+        for entry in entries:
+            if not entry.is_file() or not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
 
-    for entry in os.scandir(json_dir_path):
-        if not entry.is_file() or not entry.name.endswith(".json"):
-            continue
-        try:
-            with open(entry.path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError):
-            continue
+            source_file = data.get("filename")
+            if not source_file:
+                continue
 
-        source_file = data.get("filename")
-        if not source_file:
-            continue
+            elements = data.get("elements", {})
+            classes = elements.get("classes", [])
+            functions = [
+                func
+                for func in elements.get("functions", [])
+                if func.get("name")
+                and isinstance(func.get("start_line"), int)
+                and isinstance(func.get("end_line"), int)
+            ]
+            # Added in start order, the methods of a class are one run of
+            # rows, found by bisecting the start lines.
+            functions.sort(key=lambda func: func["start_line"])
+            first_row = len(function_index)
+            method_starts = [func["start_line"] for func in functions]
+            for func in functions:
+                function_index.add(func["name"], source_file, func["start_line"], func["end_line"])
+
+            for klass in classes:
+                name = klass.get("name")
+                # The first definition of a class is kept, as the dict index
+                # did; a class reopened in a later file does not replace it.
+                if not name or name in class_index:
+                    continue
+                class_start = klass.get("start_line")
+                class_end = klass.get("end_line")
+                members = (0, 0)
+                if isinstance(class_start, int) and isinstance(class_end, int):
+                    members = (
+                        first_row + bisect_left(method_starts, class_start),
+                        first_row + bisect_right(method_starts, class_end),
+                    )
+                class_index.add(
+                    name, source_file, class_start, class_end,
+                    parent=klass.get("superclass"), members=members,
+                )
 
-        elements = data.get("elements", {})
-        classes = elements.get("classes", [])
-        functions = elements.get("functions", [])
+        state.function_index = function_index
+        state.class_index = class_index
+        return class_index
 
-        for klass in classes:
-            name = klass.get("name")
-            if not name or name in _CLASS_INDEX_CACHE:
-                continue
-            class_start = klass.get("start_line")
-            class_end = klass.get("end_line")
-            method_map: Dict[str, Dict[str, int]] = {}
-            if isinstance(class_start, int) and isinstance(class_end, int):
-                for func in functions:
-                    method_name = func.get("name")
-                    start_line = func.get("start_line")
-                    end_line = func.get("end_line")
-                    if (
-                        method_name
-                        and isinstance(start_line, int)
-                        and isinstance(end_line, int)
-                        and class_start <= start_line <= class_end
-                    ):
-                        method_map[method_name] = {
-                            "start_line": start_line,
-                            "end_line": end_line,
-                        }
-            _CLASS_INDEX_CACHE[name] = {
-                "file_path": source_file,
-                "superclass": klass.get("superclass"),
-                "start_line": klass.get("start_line"),
-                "end_line": klass.get("end_line"),
-                "methods": method_map,
-            }
-
-        for func in functions:
-            func_name = func.get("name")
-            start_line = func.get("start_line")
-            end_line = func.get("end_line")
-            if (
-                not func_name
-                or not isinstance(start_line, int)
-                or not isinstance(end_line, int)
-            ):
-                continue
-            _FUNCTION_INDEX_CACHE.setdefault(func_name, []).append(
-                {
-                    "file_path": source_file,
-                    "start_line": start_line,
-                    "end_line": end_line,
-                }
-            )
 
-    return _CLASS_INDEX_CACHE
+def _class_methods(state: RailsRunState, entry: Symbol) -> Dict[str, Symbol]:
+    """The methods defined inside a class, by name; a later definition wins."""
+    return {method.name: method for method in state.function_index.rows(*entry.members)}
 
 
-def _collect_parent_class_names(directory_path: str, class_name: Optional[str]) -> List[str]:
+def _collect_parent_class_names(state: RailsRunState, class_name: Optional[str]) -> List[str]:
     if not class_name:
         return []
-    class_index = _ensure_class_index(directory_path)
+    class_index = _ensure_class_index(state)
     parents: List[str] = []
     visited: set = set()
     current = class_name
 
     while current:
-        entry = class_index.get(current)
+        entry = class_index.first(current)
         if not entry:
             break
-        superclass = entry.get("superclass")
+        superclass = entry.parent
         if not superclass or superclass in visited:
             break
-        parent_entry = class_index.get(superclass)
-        if not parent_entry:
+        if superclass not in class_index:
             break
         parents.append(superclass)
         visited.add(superclass)
@@ -289,51 +289,37 @@ def _collect_parent_class_names(directory_path: str, class_name: Optional[str])
     return parents
 
 
-def _get_class_code_block(directory_path: str, class_name: str) -> Optional[List[str]]:
-    class_index = _ensure_class_index(directory_path)
-    entry = class_index.get(class_name)
+def _get_class_code_block(state: RailsRunState, class_name: str) -> Optional[List[str]]:
+    class_index = _ensure_class_index(state)
+    entry = class_index.first(class_name)
     if not entry:
         return None
 
-    cache_key = f"{directory_path}:{class_name}"
-    cached_block = _CLASS_CODE_BLOCK_CACHE.get(cache_key)
+    cached_block = state.class_code_blocks.get(class_name)
     if cached_block is not None:
         return cached_block
 
-    file_path = entry.get("file_path")
-    start_line = entry.get("start_line")
-    end_line = entry.get("end_line")
+    file_path = entry.file_path
+    start_line = entry.start_line
+    end_line = entry.end_line
     if not file_path or not isinstance(start_line, int) or not isinstance(end_line, int):
         return None
 
-    lines = _read_file_lines(file_path)
+    lines = read_file_lines_or_none(file_path)
     if lines is None:
         return None
 
     block = lines[start_line - 1 : end_line]
-    _CLASS_CODE_BLOCK_CACHE[cache_key] = block
+    state.class_code_blocks[class_name] = block
     return block
 
 
-def _read_file_lines(file_path: str) -> Optional[List[str]]:
-    cached = _FILE_CONTENT_CACHE.get(file_path)
-    if cached is not None:
-        return cached
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except OSError:
-        return None
-    _FILE_CONTENT_CACHE[file_path] = lines
-    return lines
-
-
 def _collect_parent_class_blocks(
-    directory_path: str, parent_names: List[str]
+    state: RailsRunState, parent_names: List[str]
 ) -> List[List[str]]:
     blocks: List[List[str]] = []
     for parent_name in parent_names:
-        block = _get_class_code_block(directory_path, parent_name)
+        block = _get_class_code_block(state, parent_name)
         if block:
             blocks.append(block)
     return blocks
@@ -348,7 +334,7 @@ def _extract_params_from_lines(lines: List[str]) -> List[str]:
 
 
 def _build_helper_param_hint_block(
-    directory_path: str,
+    state: RailsRunState,
     parent_names: List[str],
     method_definition_block: List[str],
 ) -> Optional[List[str]]:
@@ -358,27 +344,27 @@ def _build_helper_param_hint_block(
     if not method_text.strip():
         return None
 
-    class_index = _ensure_class_index(directory_path)
+    class_index = _ensure_class_index(state)
     helper_params: Dict[str, List[str]] = {}
 
     for parent_name in parent_names:
-        entry = class_index.get(parent_name)
+        entry = class_index.first(parent_name)
         if not entry:
             continue
-        methods = entry.get("methods", {})
-        file_path = entry.get("file_path")
-        if not isinstance(methods, dict) or not file_path:
+        methods = _class_methods(state, entry)
+        file_path = entry.file_path
+        if not file_path:
             continue
 
-        lines = _read_file_lines(file_path)
+        lines = read_file_lines_or_none(file_path)
         if lines is None:
             continue
 
-        for helper_name, meta in methods.items():
+        for helper_name, method in methods.items():
             if not helper_name or not re.search(rf"\b{re.escape(helper_name)}\b", method_text):
                 continue
-            start_line = meta.get("start_line")
-            end_line = meta.get("end_line")
+            start_line = method.start_line
+            end_line = method.end_line
             if not isinstance(start_line, int) or not isinstance(end_line, int):
                 continue
             helper_lines = lines[start_line - 1 : end_line]
@@ -428,23 +414,22 @@ def _build_direct_param_hint_block(
 
 
 def _collect_special_function_blocks(
-    directory_path: str,
+    state: RailsRunState,
     function_names: List[str],
     per_name_limit: int = 2,
 ) -> List[List[str]]:
     if not function_names:
         return []
-    _ensure_class_index(directory_path)
+    _ensure_class_index(state)
     blocks: List[List[str]] = []
     seen_entries = set()
     for func_name in function_names:
         if func_name not in _PARAM_HINT_FUNCTIONS:
             continue
-        entries = _FUNCTION_INDEX_CACHE.get(func_name, [])
-        for entry in entries[:per_name_limit]:
-            file_path = entry.get("file_path")
-            start_line = entry.get("start_line")
-            end_line = entry.get("end_line")
+        for entry in state.function_index.lookup(func_name, limit=per_name_limit):
+            file_path = entry.file_path
+            start_line = entry.start_line
+            end_line = entry.end_line
             if (
                 not file_path
                 or not isinstance(start_line, int)
@@ -455,7 +440,7 @@ def _collect_special_function_blocks(
             if cache_key in seen_entries:
                 continue
             seen_entries.add(cache_key)
-            lines = _read_file_lines(file_path)
+            lines = read_file_lines_or_none(file_path)
             if lines is None:
                 continue
             block = [
@@ -467,34 +452,29 @@ def _collect_special_function_blocks(
 
 
 def get_dependencies(
-    data: Dict, start_line: int, end_line: int, file_path: str
+    data: Dict,
+    start_line: int,
+    end_line: int,
+    file_path: str,
+    index: Optional[FileDependencyIndex] = None,
 ) -> Tuple[List[Dict], List[Dict]]:
-    existing_function_names = [
-        item["name"]
-        for item in data["elements"]["functions"]
-        if item["name"] not in {"get", "post", "put", "delete", "patch"}
-    ]
+    if index is None:
+        index = FileDependencyIndex(data)
     in_file_dependency_functions: List[Dict] = []
-    for item in data["elements"]["function_calls"]:
+    for item in index.calls_starting_within(start_line, end_line):
         if (
-            item["name"] in existing_function_names
-            and item["start_line"] >= start_line
+            item["name"] in index.function_names
+            and item["name"] not in _HTTP_METHOD_NAMES
             and item["end_line"] <= end_line
         ):
-            item["file_path"] = file_path
-            in_file_dependency_functions.append(item)
+            in_file_dependency_functions.append(dict(item, file_path=file_path))
 
+    # Calls found above lie inside the handler, so usages inside them are
+    # already counted; each usage line in range adds the import once more.
     imported_functions: List[Dict] = []
-    for item in data.get("imports", []):
-        if not item.get("path_exists"):
-            continue
-        for usage_line in item.get("usage_lines", []):
-            if start_line <= usage_line <= end_line:
-                imported_functions.append(item)
-            for dep in in_file_dependency_functions:
-                if dep["start_line"] <= usage_line <= dep["end_line"]:
-                    if item not in imported_functions:
-                        imported_functions.append(item)
+    for item, usages in index.imports_used_within(start_line, end_line):
+        if item.get("path_exists"):
+            imported_functions.extend([item] * usages)
     return in_file_dependency_functions, imported_functions
 
 
@@ -505,11 +485,7 @@ def get_code_blocks(
     directory_path: str,
 ) -> List[List[str]]:
     code_blocks: List[List[str]] = []
-    try:
-        with open(file_name, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except OSError:
-        lines = []
+    lines = read_file_lines_or_none(file_name) or []
 
     for block in in_file_dependency_functions:
         if lines:
@@ -528,17 +504,12 @@ def get_code_blocks(
             continue
 
         try:
-            with open(complete_json_file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError):
+            data, _ = load_file_metadata(complete_json_file_path)
+        except (OSError, ValueError):
             continue
 
         origin_file_name = origin
-        try:
-            with open(origin_file_name, "r", encoding="utf-8") as f:
-                origin_lines = f.readlines()
-        except OSError:
-            origin_lines = []
+        origin_lines = read_file_lines_or_none(origin_file_name) or []
 
         visited = False
         for item in data["elements"]["classes"]:
@@ -574,61 +545,51 @@ def get_code_blocks(
     return code_blocks
 
 
-def provide_context_codeblock(directory_path: str, method_info: Dict):
+def provide_context_codeblock(state: RailsRunState, method_info: Dict):
     file_name = method_info["file_path"]
-    try:
-        with open(file_name, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except OSError:
-        lines = []
+    lines = read_file_lines_or_none(file_name) or []
 
     method_definition_code_block = lines[
         method_info["start_line"] - 1 : method_info["end_line"]
     ]
 
-    json_dir_path = os.path.join(directory_path, "qodex_file_information")
     json_file = _sanitize_json_filename(str(file_name))
-    complete_json_file_path = os.path.join(json_dir_path, json_file)
+    complete_json_file_path = os.path.join(state.metadata_dir, json_file)
     try:
-        with open(complete_json_file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (OSError, json.JSONDecodeError):
+        data, index = load_file_metadata(complete_json_file_path)
+    except (OSError, ValueError):
         data = {"elements": {"functions": [], "function_calls": []}, "imports": []}
+        index = FileDependencyIndex(data)
 
     in_file_dependency_functions, imported_functions = get_dependencies(
         data,
         method_info["start_line"],
         method_info["end_line"],
         method_info["file_path"],
+        index,
     )
     context_code_blocks = get_code_blocks(
-        in_file_dependency_functions, imported_functions, file_name, directory_path
+        in_file_dependency_functions, imported_functions, file_name, state.directory_path
     )
     parent_names = _collect_parent_class_names(
-        directory_path, method_info.get("class_name")
+        state, method_info.get("class_name")
     )
-    parent_class_blocks = _collect_parent_class_blocks(directory_path, parent_names)
+    parent_class_blocks = _collect_parent_class_blocks(state, parent_names)
     function_calls_in_method: List[str] = []
-    for call in data["elements"].get("function_calls", []):
-        call_start = call.get("start_line")
+    for call in index.calls_starting_within(method_info["start_line"], method_info["end_line"]):
         call_end = call.get("end_line")
-        if not isinstance(call_start, int) or not isinstance(call_end, int):
-            continue
-        if (
-            call_start >= method_info["start_line"]
-            and call_end <= method_info["end_line"]
-        ):
+        if isinstance(call_end, int) and call_end <= method_info["end_line"]:
             call_name = call.get("name")
             if call_name:
                 function_calls_in_method.append(call_name)
     special_function_blocks = _collect_special_function_blocks(
-        directory_path, function_calls_in_method
+        state, function_calls_in_method
     )
     direct_param_block = _build_direct_param_hint_block(
         method_definition_code_block
     )
     helper_hint_block = _build_helper_param_hint_block(
-        directory_path, parent_names, method_definition_code_block
+        state, parent_names, method_definition_code_block
     )
     prefix_blocks: List[List[str]] = []
     if direct_param_block:
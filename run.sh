@@ -13,6 +13,7 @@ CURRENT_DIR="$(pwd)"
 OPENAI_API_KEY=""
 PROJECT_API_KEY=""
 AI_CHAT_ID=""
+EXTRA_ARGS=()
 
 # Parse command line arguments
 while [[ $# -gt 0 ]]; do
@@ -29,9 +30,13 @@ while [[ $# -gt 0 ]]; do
       AI_CHAT_ID="$2"
       shift 2
       ;;
+    --resume)
+      EXTRA_ARGS+=("--resume")
+      shift
+      ;;
     *)
       echo "Unknown option: $1"
-      echo "Usage: $0 [--openai-api-key KEY] [--project-api-key KEY] [--ai-chat-id ID]"
+      echo "Usage: $0 [--openai-api-key KEY] [--project-api-key KEY] [--ai-chat-id ID] [--resume]"
       exit 1
       ;;
   esac
@@ -141,7 +146,7 @@ export APIMESH_USER_CONFIG_PATH="$CURRENT_DIR/apimesh/config.json"
 export APIMESH_USER_REPO_PATH="$CURRENT_DIR"
 export APIMESH_OUTPUT_FILEPATH="$CURRENT_DIR/apimesh/swagger.json"
 
-python3 -m apimesh.apimesh.swagger_generation_cli "$OPENAI_API_KEY" "$PROJECT_API_KEY" "$AI_CHAT_ID"
+python3 -m apimesh.apimesh.swagger_generation_cli "$OPENAI_API_KEY" "$PROJECT_API_KEY" "$AI_CHAT_ID" "" ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"}
 
 CLI_EXIT_CODE=$?
 
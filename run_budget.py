@@ -0,0 +1,159 @@
+"""
+Per-run token and spend budget enforced where LLM traffic is admitted.
+
+Every chat completion reserves its prompt tokens plus an expected completion
+size before it is sent and settles against the reported usage afterwards, so
+concurrent calls cannot overshoot the caps together. Embedding batches are
+charged the same way. A call that does not fit is refused with
+``BudgetExceeded`` and its endpoint is reported as skipped; smaller calls
+are still admitted until not even a minimal one would fit.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from config import get_configurations
+from run_context import current_run
+from run_deadline import RunLimitExceeded
+from utils import num_tokens_from_string
+
+config = get_configurations()
+
+
+class BudgetExceeded(RunLimitExceeded):
+    pass
+
+
+def count_tokens(text: str) -> int:
+    """Token count for budgeting; falls back to a character estimate if the encoding cannot be loaded."""
+    try:
+        return num_tokens_from_string(text)
+    except Exception:
+        return len(text) // 4 + 1
+
+
+class RunBudget:
+    def __init__(
+        self,
+        max_prompt_tokens: int = 0,
+        max_completion_tokens: int = 0,
+        max_cost_usd: float = 0.0,
+        expected_completion_tokens: Optional[int] = None,
+        prices: Optional[Dict[str, Dict[str, float]]] = None,
+        min_prompt_tokens: Optional[int] = None,
+    ):
+        budget_config = config.run_budget
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_completion_tokens = max_completion_tokens
+        self.max_cost_usd = max_cost_usd
+        if expected_completion_tokens is None:
+            expected_completion_tokens = int(budget_config.get("expected_completion_tokens", 1500))
+        self.expected_completion_tokens = expected_completion_tokens
+        if min_prompt_tokens is None:
+            min_prompt_tokens = int(budget_config.get("min_prompt_tokens", 100))
+        self.min_prompt_tokens = min_prompt_tokens
+        self.prices = prices if prices is not None else budget_config.get("prices_per_million_tokens", {})
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.embedding_tokens = 0
+        self.cost_usd = 0.0
+        self.calls = 0
+        self.refused = 0
+        self._models: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_prompt_tokens or self.max_completion_tokens or self.max_cost_usd)
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether not even a minimal chat completion would fit any more."""
+        models = self._models or {""}
+        cost = min(self.estimate_cost(model, self.min_prompt_tokens, self.expected_completion_tokens) for model in models)
+        with self._lock:
+            return not self._fits(self.min_prompt_tokens, self.expected_completion_tokens, cost)
+
+    def _price(self, model: str, kind: str) -> float:
+        model_prices = self.prices.get(model) or self.prices.get("default") or {}
+        return float(model_prices.get(kind, 0.0)) / 1_000_000
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        return prompt_tokens * self._price(model, "prompt") + completion_tokens * self._price(model, "completion")
+
+    def _fits(self, prompt_tokens: int, completion_tokens: int, cost: float) -> bool:
+        if self.max_prompt_tokens and self.prompt_tokens + prompt_tokens > self.max_prompt_tokens:
+            return False
+        if self.max_completion_tokens and self.completion_tokens + completion_tokens > self.max_completion_tokens:
+            return False
+        if self.max_cost_usd and self.cost_usd + cost > self.max_cost_usd:
+            return False
+        return True
+
+    def admit(self, model: str, messages: Iterable[Dict]) -> Dict:
+        """Reserve budget for a chat completion or raise ``BudgetExceeded``."""
+        prompt_tokens = sum(count_tokens(str(message.get("content", ""))) for message in messages)
+        completion_tokens = self.expected_completion_tokens
+        cost = self.estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self._models.add(model)
+            if not self._fits(prompt_tokens, completion_tokens, cost):
+                self.refused += 1
+                raise BudgetExceeded("Run token/spend budget exhausted")
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cost_usd += cost
+            self.calls += 1
+        return {"model": model, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cost": cost}
+
+    def settle(self, reservation: Dict, usage=None) -> None:
+        """Replace a reservation with the usage the API reported; without usage the estimate stands."""
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if prompt_tokens is None:
+            prompt_tokens = reservation["prompt_tokens"]
+        if completion_tokens is None:
+            completion_tokens = reservation["completion_tokens"]
+        self._adjust(reservation, prompt_tokens, completion_tokens)
+
+    def release(self, reservation: Dict) -> None:
+        """Return a reservation for a call that failed before being billed."""
+        self._adjust(reservation, 0, 0)
+        with self._lock:
+            self.calls -= 1
+
+    def _adjust(self, reservation: Dict, prompt_tokens: int, completion_tokens: int) -> None:
+        cost = self.estimate_cost(reservation["model"], prompt_tokens, completion_tokens)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens - reservation["prompt_tokens"]
+            self.completion_tokens += completion_tokens - reservation["completion_tokens"]
+            self.cost_usd += cost - reservation["cost"]
+
+    def charge_embedding(self, model: str, tokens: int) -> None:
+        cost = tokens * self._price(model, "prompt")
+        with self._lock:
+            if self.max_cost_usd and self.cost_usd + cost > self.max_cost_usd:
+                self.refused += 1
+                raise BudgetExceeded("Run spend budget exhausted while embedding")
+            self.embedding_tokens += tokens
+            self.cost_usd += cost
+
+    def summary(self) -> str:
+        return (
+            f"LLM usage: {self.calls} calls, {self.prompt_tokens} prompt tokens, "
+            f"{self.completion_tokens} completion tokens, {self.embedding_tokens} embedding tokens, "
+            f"estimated ${self.cost_usd:.4f}"
+        )
+
+
+def set_run_budget(budget: Optional[RunBudget]) -> None:
+    current_run().budget = budget
+
+
+def get_run_budget() -> Optional[RunBudget]:
+    return current_run().budget
+
+
+def budget_exhausted() -> bool:
+    budget = current_run().budget
+    return budget is not None and budget.exhausted
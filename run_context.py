@@ -0,0 +1,99 @@
+"""
+Per-run state.
+
+A ``RunContext`` holds what one generation run owns: the repository, output
+and user config paths, its deadline, budget, plan recorder, endpoint scope,
+progress, inventory mode and where its output goes. The active context lives
+in a context variable, so runs on different threads of one process (the
+daemon and the MCP job tools) never see each other's state. Threads a run
+starts inherit it only when their target is wrapped with ``bind``.
+
+Outside any ``activate`` block the process default context is used, with
+paths taken from the APIMESH_* environment variables, as the CLI always has.
+"""
+
+import contextvars
+import functools
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, TextIO
+
+
+class RunContext:
+    def __init__(self, repo_path: Optional[str] = None, output_path: Optional[str] = None,
+                 user_config_path: Optional[str] = None, stdout: Optional[TextIO] = None):
+        self.repo_path = repo_path
+        self.output_path = output_path
+        self.user_config_path = user_config_path
+        self.stdout = stdout
+        self.deadline = None
+        self.budget = None
+        self.plan_recorder = None
+        self.scope = None
+        self.progress = None
+        self.inventory_mode = False
+        self.lock = threading.Lock()
+
+
+_DEFAULT_RUN = RunContext()
+_CURRENT_RUN: contextvars.ContextVar = contextvars.ContextVar("apimesh_run", default=None)
+_STDOUT_LOCK = threading.Lock()
+
+
+def current_run() -> RunContext:
+    run = _CURRENT_RUN.get()
+    return run if run is not None else _DEFAULT_RUN
+
+
+@contextmanager
+def activate(run: RunContext) -> Iterator[RunContext]:
+    """Make ``run`` the current context of this thread for the ``with`` block."""
+    if run.stdout is not None:
+        _route_stdout()
+    token = _CURRENT_RUN.set(run)
+    try:
+        yield run
+    finally:
+        _CURRENT_RUN.reset(token)
+
+
+def bind(function: Callable) -> Callable:
+    """``function`` made to run in the caller's current context, on whichever thread calls it."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(function)
+    def bound(*args, **kwargs):
+        # A context can only be entered by one thread at a time; the copy
+        # still refers to the same RunContext.
+        return context.copy().run(function, *args, **kwargs)
+
+    return bound
+
+
+class _RunStdout:
+    """Sends writes to the current run's ``stdout``, or to the stream it replaced."""
+
+    def __init__(self, fallback: TextIO):
+        self._fallback = fallback
+
+    def _target(self) -> TextIO:
+        run = _CURRENT_RUN.get()
+        if run is not None and run.stdout is not None:
+            return run.stdout
+        return self._fallback
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+def _route_stdout() -> None:
+    with _STDOUT_LOCK:
+        if not isinstance(sys.stdout, _RunStdout):
+            sys.stdout = _RunStdout(sys.stdout)
@@ -0,0 +1,83 @@
+"""
+Run-level deadline shared by the CLI, the pipelines and the LLM client.
+
+Once the deadline passes no new LLM call is admitted, in-flight requests time
+out at the deadline, and the pipelines return the spec built so far marked
+with ``x-apimesh-incomplete``.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from run_context import RunContext, current_run
+
+INCOMPLETE_KEY = "x-apimesh-incomplete"
+
+
+class RunLimitExceeded(Exception):
+    """A run-level limit (deadline or budget) refused further LLM work."""
+
+
+class DeadlineExceeded(RunLimitExceeded):
+    pass
+
+
+class RunDeadline:
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.cancelled = False
+
+    @classmethod
+    def after(cls, seconds: float) -> "RunDeadline":
+        return cls(time.time() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded("Run cancelled" if self.cancelled else "Run deadline reached")
+
+    def cancel(self) -> None:
+        """Expire now; the run stops as it would at its deadline."""
+        self.cancelled = True
+        self.expires_at = min(self.expires_at, time.time())
+
+
+def set_run_deadline(deadline: Optional[RunDeadline]) -> None:
+    run = current_run()
+    with run.lock:
+        run.deadline = deadline
+
+
+def get_run_deadline() -> Optional[RunDeadline]:
+    return current_run().deadline
+
+
+def deadline_expired() -> bool:
+    deadline = current_run().deadline
+    return deadline is not None and deadline.expired
+
+
+def cancel_run(run: Optional[RunContext] = None) -> None:
+    """Stop ``run`` (default: the current one): no new LLM calls, and the partial spec is written."""
+    run = run or current_run()
+    with run.lock:
+        if run.deadline is None:
+            run.deadline = RunDeadline(time.time())
+        run.deadline.cancel()
+
+
+def mark_incomplete(swagger: Dict, reason: str, skipped: List[Dict]) -> Dict:
+    """Flag the spec as partial and list the endpoints that were not generated."""
+    swagger.setdefault("info", {})[INCOMPLETE_KEY] = True
+    swagger[INCOMPLETE_KEY] = {"reason": reason, "skipped_endpoints": skipped}
+    print(f"Spec is incomplete ({reason}); {len(skipped)} endpoints were skipped:")
+    for entry in skipped:
+        label = " ".join(str(entry[field]) for field in ("http_method", "route") if field in entry)
+        print(f"  - {label or entry.get('name', '<unknown>')}")
+    return swagger
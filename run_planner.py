@@ -0,0 +1,96 @@
+"""
+Dry-run planning: estimate LLM calls, tokens, cost and wall time for a run
+without sending any LLM traffic.
+
+While a ``PlanRecorder`` is active, ``OpenAiClient`` records every fully built
+prompt instead of sending it and answers with a minimal Swagger stub, so the
+language pipelines build prompts exactly as a real run would.
+"""
+
+import json
+import math
+import threading
+from typing import Dict, List, Optional
+
+from config import get_configurations
+from run_budget import RunBudget, count_tokens
+from run_context import current_run
+
+config = get_configurations()
+
+PLAN_STUB_RESPONSE = json.dumps({"paths": {"/__plan__": {"get": {}}}})
+
+
+class PlanRecorder:
+    def __init__(self):
+        self.calls: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, model: str, messages: List[Dict], stage: str = "endpoint_generation") -> str:
+        prompt_tokens = sum(count_tokens(str(message.get("content", ""))) for message in messages)
+        with self._lock:
+            self.calls.append({"stage": stage, "model": model, "prompt_tokens": prompt_tokens})
+        return PLAN_STUB_RESPONSE
+
+
+def set_plan_recorder(recorder: Optional[PlanRecorder]) -> None:
+    current_run().plan_recorder = recorder
+
+
+def get_plan_recorder() -> Optional[PlanRecorder]:
+    return current_run().plan_recorder
+
+
+def build_plan_report(recorder: PlanRecorder, framework: str, static_seconds: float) -> Dict:
+    """
+    Project the run from the recorded prompts. Completion sizes use the
+    budget's expected_completion_tokens; wall time assumes the configured
+    endpoint concurrency and the latency model under ``plan`` in config.yml.
+    """
+    budget = RunBudget()
+    plan_config = config.plan
+    overhead = float(plan_config.get("request_overhead_seconds", 2))
+    output_rate = float(plan_config.get("output_tokens_per_second", 60)) or 1.0
+    completion_per_call = budget.expected_completion_tokens
+
+    stages: Dict[str, Dict] = {}
+    for call in recorder.calls:
+        stage = stages.setdefault(call["stage"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+        stage["calls"] += 1
+        stage["prompt_tokens"] += call["prompt_tokens"]
+        stage["completion_tokens"] += completion_per_call
+        stage["cost_usd"] += budget.estimate_cost(call["model"], call["prompt_tokens"], completion_per_call)
+
+    seconds_per_call = overhead + completion_per_call / output_rate
+    llm_seconds = 0.0
+    for name, stage in stages.items():
+        workers = config.endpoint_workers if name == "endpoint_generation" else 1
+        llm_seconds += math.ceil(stage["calls"] / max(workers, 1)) * seconds_per_call
+
+    return {
+        "framework": framework,
+        "calls": sum(stage["calls"] for stage in stages.values()),
+        "prompt_tokens": sum(stage["prompt_tokens"] for stage in stages.values()),
+        "completion_tokens": sum(stage["completion_tokens"] for stage in stages.values()),
+        "estimated_cost_usd": round(sum(stage["cost_usd"] for stage in stages.values()), 4),
+        "estimated_wall_seconds": round(static_seconds + llm_seconds, 1),
+        "static_stage_seconds": round(static_seconds, 1),
+        "endpoint_workers": config.endpoint_workers,
+        "stages": stages,
+    }
+
+
+def print_plan_report(report: Dict) -> None:
+    print("\n***************************************************")
+    print(f"Plan for framework {report['framework']}")
+    print(f"  LLM calls:          {report['calls']}")
+    print(f"  Prompt tokens:      {report['prompt_tokens']}")
+    print(f"  Completion tokens:  {report['completion_tokens']} (estimated)")
+    print(f"  Estimated cost:     ${report['estimated_cost_usd']:.4f}")
+    print(
+        f"  Estimated time:     {report['estimated_wall_seconds']}s "
+        f"(static stage {report['static_stage_seconds']}s, {report['endpoint_workers']} workers)"
+    )
+    for name, stage in report["stages"].items():
+        print(f"    {name}: {stage['calls']} calls, {stage['prompt_tokens']} prompt tokens")
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,147 @@
+"""
+Progress of the current run, for callers that watch a run while it executes
+(the MCP job tools).
+
+The CLI reports the stage, ``EndpointGeneration`` reports endpoint counts
+and token usage is read from the active budget. ``on_update(snapshot)`` is
+called on every stage change and at most once per ``min_interval`` seconds
+for endpoint updates. Cancelling expires the run deadline, so a cancelled
+run stops the way one that ran out of time does.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from run_budget import get_run_budget
+from run_context import current_run
+from run_deadline import cancel_run
+
+STAGE_STARTING = "starting"
+STAGE_FRAMEWORK = "framework_identification"
+STAGE_STATIC = "static_analysis"
+STAGE_ENDPOINTS = "endpoint_generation"
+STAGE_FALLBACK = "fallback_generation"
+STAGE_SAVING = "saving"
+STAGE_DONE = "done"
+
+
+class RunProgress:
+    def __init__(self, on_update: Optional[Callable[[Dict], None]] = None, min_interval: float = 1.0):
+        self.on_update = on_update
+        self.min_interval = min_interval
+        self.started_at = time.time()
+        self.stage = STAGE_STARTING
+        self.stage_started_at = self.started_at
+        self.endpoints_total = 0
+        self.endpoints_done = 0
+        self.endpoints_failed = 0
+        self.endpoints_skipped = 0
+        self.framework: Optional[str] = None
+        self.cancel_requested = False
+        self.budget = None
+        # The run reporting here; set by set_run_progress.
+        self.run = None
+        self._generation_started_at: Optional[float] = None
+        self._last_update = 0.0
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """Stop the run this progress belongs to; the spec built so far is still written."""
+        self.cancel_requested = True
+        if self.run is not None:
+            cancel_run(self.run)
+
+    def set_stage(self, stage: str, framework: Optional[str] = None) -> None:
+        if self.cancel_requested and stage != STAGE_DONE:
+            # The run may have installed its deadline after the cancel arrived.
+            cancel_run(self.run)
+        with self._lock:
+            self.stage = stage
+            self.stage_started_at = time.time()
+            if framework:
+                self.framework = framework
+            if stage != STAGE_DONE:
+                # Token usage is read from this run's budget, not whichever run is active later.
+                self.budget = get_run_budget() or self.budget
+        self._notify(force=True)
+
+    def update_endpoints(self, total: int, done: int, failed: int = 0, skipped: int = 0) -> None:
+        with self._lock:
+            if self.stage in (STAGE_STARTING, STAGE_FRAMEWORK, STAGE_STATIC) and total:
+                self.stage = STAGE_ENDPOINTS
+                self.stage_started_at = time.time()
+            if self._generation_started_at is None and total:
+                self._generation_started_at = time.time()
+            self.endpoints_total = total
+            self.endpoints_done = done
+            self.endpoints_failed = failed
+            self.endpoints_skipped = skipped
+        self._notify()
+
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining endpoint generation time at the rate observed so far."""
+        if self._generation_started_at is None or not self.endpoints_done:
+            return None
+        remaining = self.endpoints_total - self.endpoints_done - self.endpoints_failed - self.endpoints_skipped
+        if remaining <= 0:
+            return 0.0
+        elapsed = time.time() - self._generation_started_at
+        return round(elapsed / self.endpoints_done * remaining, 1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snapshot = {
+                "stage": self.stage,
+                "framework": self.framework,
+                "elapsed_seconds": round(time.time() - self.started_at, 1),
+                "stage_elapsed_seconds": round(time.time() - self.stage_started_at, 1),
+                "endpoints": {
+                    "total": self.endpoints_total,
+                    "done": self.endpoints_done,
+                    "failed": self.endpoints_failed,
+                    "skipped": self.endpoints_skipped,
+                },
+                "eta_seconds": self.eta_seconds(),
+            }
+        budget = self.budget
+        if budget is not None:
+            snapshot["tokens"] = {
+                "prompt": budget.prompt_tokens,
+                "completion": budget.completion_tokens,
+                "embedding": budget.embedding_tokens,
+            }
+            snapshot["llm_calls"] = budget.calls
+            snapshot["estimated_cost_usd"] = round(budget.cost_usd, 4)
+        return snapshot
+
+    def _notify(self, force: bool = False) -> None:
+        if self.on_update is None:
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_update < self.min_interval:
+                return
+            self._last_update = now
+        try:
+            self.on_update(self.snapshot())
+        except Exception:
+            # A watcher going away must not fail the run.
+            pass
+
+
+def set_run_progress(progress: Optional[RunProgress]) -> None:
+    run = current_run()
+    run.progress = progress
+    if progress is not None:
+        progress.run = run
+
+
+def get_run_progress() -> Optional[RunProgress]:
+    return current_run().progress
+
+
+def report_stage(stage: str, framework: Optional[str] = None) -> None:
+    progress = current_run().progress
+    if progress is not None:
+        progress.set_stage(stage, framework)
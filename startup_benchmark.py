@@ -0,0 +1,87 @@
+"""
+Startup-time benchmark for the CLI.
+
+Each measurement runs in a fresh interpreter, so it includes Python startup
+and every import the entry point triggers, and reports the median of
+``--repeat`` runs:
+
+    python startup_benchmark.py
+    python startup_benchmark.py --repeat 10 --top 15
+
+``--top`` also lists the slowest imports (cumulative, from ``-X importtime``)
+for ``import swagger_generation_cli``.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CASES = [
+    ("python startup", ["-c", "pass"]),
+    ("import swagger_generation_cli", ["-c", "import swagger_generation_cli"]),
+    ("swagger_generation_cli --help", ["swagger_generation_cli.py", "--help"]),
+    ("import python pipeline", ["-c", "import python_pipeline.run_swagger_generation"]),
+    ("import nodejs pipeline", ["-c", "import nodejs_pipeline.run_swagger_generation"]),
+    ("import rails pipeline", ["-c", "import rails_pipeline.run_swagger_generation"]),
+    ("import golang pipeline", ["-c", "import golang_pipeline.run_swagger_generation"]),
+    ("import llm_client + openai", ["-c", "import llm_client, openai"]),
+    ("import faiss_index_generator", ["-c", "import faiss_index_generator"]),
+]
+
+
+def _environment():
+    env = os.environ.copy()
+    env.setdefault("APIMESH_CONFIG_PATH", os.path.join(PACKAGE_DIR, "config.yml"))
+    env["PYTHONPATH"] = PACKAGE_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def time_case(arguments, repeat, env):
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=PACKAGE_DIR, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples)
+
+
+def slowest_imports(module, top, env):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PACKAGE_DIR,
+                          env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Measure cold start time of the CLI and its heavy imports.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the median is reported.")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports of the CLI.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    env = _environment()
+    width = max(len(name) for name, _ in CASES)
+    for name, arguments in CASES:
+        print(f"{name:<{width}}  {time_case(arguments, max(1, args.repeat), env) * 1000:8.1f} ms")
+    if args.top:
+        print("\nSlowest imports of swagger_generation_cli (cumulative):")
+        for microseconds, module in slowest_imports("swagger_generation_cli", args.top, env):
+            print(f"  {microseconds / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
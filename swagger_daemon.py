@@ -0,0 +1,334 @@
+"""
+Long-running generator server.
+
+Keeps the heavy imports (langchain, faiss, openai, tiktoken), the tree-sitter
+grammars, the pooled LLM clients and recently built embedding indexes
+resident between requests, so repeated runs skip Python startup and the cold
+parts of repository analysis. Requests are served over local HTTP or a Unix
+socket:
+
+    python swagger_daemon.py --socket /tmp/apimesh.sock
+    curl --unix-socket /tmp/apimesh.sock http://localhost/generate \\
+        -d '{"repo_path": "/path/to/repo", "args": ["--include-route", "/v2/**"]}'
+
+Endpoints:
+
+    POST /generate     run the generator for ``repo_path``
+    POST /regenerate   drop warm state for ``repo_path``, then generate
+    POST /endpoints    list the statically identified endpoints, no LLM calls
+    POST /regenerate_endpoint
+                       regenerate one ``method`` and ``path`` in the saved spec
+    GET  /status       uptime, runs served, active runs, file cache statistics
+    POST /shutdown     stop the server
+
+The request body may also carry ``openai_api_key``, ``user_config_path``
+(default ``<repo>/apimesh/config.json``), ``output_path`` (default
+``<repo>/apimesh/swagger.json``) and ``args``, which takes the same flags as
+swagger_generation_cli.py. Each run has its own ``RunContext``, so runs on
+different repositories proceed concurrently; runs on the same repository
+wait for each other because they write the same files.
+"""
+
+import argparse
+import importlib
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import swagger_generation_cli
+from faiss_index_generator import clear_index_cache
+from file_cache import get_file_cache
+from python_pipeline.module_resolver import get_module_resolver
+from run_context import RunContext, activate
+from run_progress import STAGE_DONE, RunProgress, set_run_progress
+from syntax_extractor import _GRAMMAR_MODULES, get_language
+
+LOG_TAIL_CHARS = 200_000
+
+_WARM_MODULES = ("openai", "langchain_openai", "tiktoken", "faiss_index_generator")
+
+
+class GeneratorService:
+    """Serves generation requests in-process, one run at a time per repository."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.runs = 0
+        self.active_repos: List[str] = []
+        self._lock = threading.Lock()
+        self._repo_locks: Dict[str, threading.Lock] = {}
+
+    def warm_up(self) -> None:
+        """
+        Import what the CLI loads lazily and every grammar up front, so no
+        request pays for it; metadata workers forked later inherit them.
+        """
+        for module_name in _WARM_MODULES + tuple(sorted(set(swagger_generation_cli._PIPELINE_MODULES.values()))):
+            importlib.import_module(module_name)
+        for name in _GRAMMAR_MODULES:
+            get_language(name)
+
+    def status(self) -> Dict:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "runs": self.runs,
+            "busy": bool(self.active_repos),
+            "active_repos": list(self.active_repos),
+            "file_cache": get_file_cache().stats(),
+        }
+
+    @staticmethod
+    def _run_context(request: Dict, repo_path: str, log: io.StringIO) -> RunContext:
+        apimesh_dir = os.path.join(repo_path, "apimesh")
+        return RunContext(
+            repo_path=repo_path,
+            output_path=os.path.abspath(request.get("output_path") or os.path.join(apimesh_dir, "swagger.json")),
+            user_config_path=os.path.abspath(
+                request.get("user_config_path") or os.path.join(apimesh_dir, "config.json")
+            ),
+            stdout=log,
+        )
+
+    @staticmethod
+    def _build_argv(request: Dict) -> List[str]:
+        args = request.get("args") or []
+        if not isinstance(args, list):
+            raise ValueError("args must be a list of command line flags")
+        # Positional arguments: openai_api_key, project_api_key, ai_chat_id, is_mcp.
+        return [request.get("openai_api_key") or "", "null", "null", "true"] + [str(arg) for arg in args]
+
+    @staticmethod
+    def _resolve_repo(request: Dict) -> str:
+        repo_path = request.get("repo_path")
+        if not repo_path:
+            raise ValueError("Missing required parameter: repo_path")
+        repo_path = os.path.abspath(os.path.expanduser(repo_path))
+        if not os.path.isdir(repo_path):
+            raise ValueError(f"repo_path is not a directory: {repo_path}")
+        return repo_path
+
+    @contextmanager
+    def _repository(self, repo_path: str) -> Iterator[None]:
+        """Hold ``repo_path`` for one run; other repositories are not blocked."""
+        with self._lock:
+            repo_lock = self._repo_locks.setdefault(repo_path, threading.Lock())
+        with repo_lock:
+            with self._lock:
+                self.active_repos.append(repo_path)
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self.active_repos.remove(repo_path)
+                    self.runs += 1
+
+    def generate(self, request: Dict, regenerate: bool = False, progress: Optional[RunProgress] = None,
+                 on_start: Optional[Callable[[], None]] = None) -> Dict:
+        """
+        Run the generator for ``request``. ``progress`` receives the run's
+        stage and endpoint counts; ``on_start`` is called once the run holds
+        the repository, after any run ahead of it there has finished.
+        """
+        repo_path = self._resolve_repo(request)
+        argv = self._build_argv(request)
+        log = io.StringIO()
+        run = self._run_context(request, repo_path, log)
+        output_path = run.output_path
+
+        with self._repository(repo_path):
+            if on_start is not None:
+                on_start()
+            if progress is not None and progress.cancel_requested:
+                # Cancelled while waiting for the run ahead of it.
+                progress.set_stage(STAGE_DONE)
+                return {"status": "cancelled", "exit_code": None, "repo_path": repo_path,
+                        "output_path": output_path, "output_written": False,
+                        "duration_seconds": 0.0, "log": ""}
+            previous_mtime = os.path.getmtime(output_path) if os.path.exists(output_path) else None
+            started_at = time.time()
+            exit_code = 0
+            with activate(run):
+                try:
+                    if regenerate:
+                        clear_index_cache(repo_path)
+                        get_module_resolver(repo_path, refresh=True)
+                    set_run_progress(progress)
+                    try:
+                        swagger_generation_cli.main(argv, run=run)
+                    except SystemExit as exc:
+                        exit_code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+                    except Exception:
+                        traceback.print_exc(file=log)
+                        exit_code = 1
+                finally:
+                    set_run_progress(None)
+                    if progress is not None:
+                        progress.set_stage(STAGE_DONE)
+        output_written = os.path.exists(output_path) and os.path.getmtime(output_path) != previous_mtime
+        return {
+            "status": "ok" if exit_code == 0 else "error",
+            "exit_code": exit_code,
+            "repo_path": repo_path,
+            "output_path": output_path,
+            "output_written": output_written,
+            "duration_seconds": round(time.time() - started_at, 2),
+            "log": log.getvalue()[-LOG_TAIL_CHARS:],
+        }
+
+    def _call(self, request: Dict, action: Callable) -> Dict:
+        """Run ``action(runner, args)`` for the repository in ``request`` and return its result with the log."""
+        repo_path = self._resolve_repo(request)
+        argv = self._build_argv(request)
+        args = swagger_generation_cli.parse_args(argv)
+        log = io.StringIO()
+        run = self._run_context(request, repo_path, log)
+        started_at = time.time()
+        with self._repository(repo_path), activate(run):
+            runner = swagger_generation_cli.RunSwagger(args.project_api_key, args.openai_api_key, args.ai_chat_id, True)
+            try:
+                result = action(runner, args)
+            except SystemExit as exc:
+                # The CLI exits when the deadline or budget stops the pipeline;
+                # that must not end the request thread without a response.
+                lines = [line for line in log.getvalue().splitlines() if line.strip()]
+                reason = lines[-1].strip() if lines else f"exit code {exc.code}"
+                raise RuntimeError(f"Run stopped before completing: {reason}") from None
+        result["duration_seconds"] = round(time.time() - started_at, 2)
+        result["log"] = log.getvalue()[-LOG_TAIL_CHARS:]
+        return result
+
+    def list_endpoints(self, request: Dict) -> Dict:
+        """The statically identified endpoints of ``repo_path``; no LLM calls."""
+        return self._call(request, lambda runner, args: runner.list_endpoints(swagger_generation_cli.build_scope(args)))
+
+    def regenerate_endpoint(self, request: Dict) -> Dict:
+        """Regenerate the operation ``method`` ``path`` and patch it into the saved spec."""
+        method, path = request.get("method"), request.get("path")
+        if not method or not path:
+            raise ValueError("Missing required parameters: method and path")
+        return self._call(
+            request,
+            lambda runner, args: runner.regenerate_endpoint(method, path, swagger_generation_cli.build_budget(args)),
+        )
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "apimesh-daemon"
+
+    @property
+    def service(self) -> GeneratorService:
+        return self.server.service
+
+    def address_string(self) -> str:
+        # Unix sockets have no (host, port) client address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) and self.client_address else "local"
+
+    def log_message(self, format, *args) -> None:
+        print(f"[daemon] {self.address_string()} {format % args}", file=sys.stderr)
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        payload = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        return payload
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/status":
+            self._send_json(200, self.service.status())
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        route = self.path.rstrip("/")
+        if route == "/shutdown":
+            self._send_json(200, {"status": "shutting down"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        handlers = {
+            "/generate": self.service.generate,
+            "/regenerate": lambda request: self.service.generate(request, regenerate=True),
+            "/endpoints": self.service.list_endpoints,
+            "/regenerate_endpoint": self.service.regenerate_endpoint,
+        }
+        if route not in handlers:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            result = handlers[route](self._read_json())
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        except Exception as exc:
+            self._send_json(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        self._send_json(200, result)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def build_server(service: GeneratorService, host: str = "127.0.0.1", port: Optional[int] = None,
+                 socket_path: Optional[str] = None) -> Tuple[socketserver.BaseServer, str]:
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixServer(socket_path, _RequestHandler)
+        address = socket_path
+    else:
+        server = _TCPServer((host, port or 0), _RequestHandler)
+        address = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    server.service = service
+    return server, address
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Serve OpenAPI generation requests from a warm process.")
+    parser.add_argument("--socket", dest="socket_path", default=None,
+                        help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind for TCP; keep it local.")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    service = GeneratorService()
+    service.warm_up()
+    server, address = build_server(service, args.host, args.port, args.socket_path)
+    print(f"[daemon] listening on {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket_path and os.path.exists(args.socket_path):
+            os.remove(args.socket_path)
+
+
+if __name__ == "__main__":
+    main()
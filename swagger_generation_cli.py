@@ -1,20 +1,47 @@
+import argparse
+import importlib
 import traceback
 import os
+import time
 
 from user_config import UserConfigurations
 from swagger_generator import SwaggerGeneration
 from file_scanner import FileScanner
 from framework_identifier import FrameworkIdentifier
 from endpoints_extractor import EndpointsExtractor
-from faiss_index_generator import GenerateFaissIndex
-from nodejs_pipeline.run_swagger_generation import run_swagger_generation as nodejs_swagger_generator
-from python_pipeline.run_swagger_generation import run_swagger_generation as python_swagger_generator
-from rails_pipeline.run_swagger_generation import run_swagger_generation as ruby_on_rails_swagger_generator
-from golang_pipeline.run_swagger_generation import run_swagger_generation as golang_swagger_generator
-from utils import get_output_filepath
-import requests, json
+from endpoint_generation import FAILED_ENDPOINTS_KEY, EndpointJournal, StaticDiscovery
+from endpoint_inventory import inventory_entry, match_endpoints, patch_spec, set_inventory_mode
+from endpoint_scope import EndpointScope, apply_endpoint_scope, get_endpoint_scope, set_endpoint_scope
+from config import get_configurations
+from run_budget import RunBudget, budget_exhausted, get_run_budget, set_run_budget
+from run_context import RunContext, activate
+from run_deadline import INCOMPLETE_KEY, RunDeadline, deadline_expired, set_run_deadline
+from run_planner import PlanRecorder, build_plan_report, print_plan_report, set_plan_recorder
+from run_progress import STAGE_FALLBACK, STAGE_FRAMEWORK, STAGE_SAVING, STAGE_STATIC, report_stage
+from utils import get_git_commit_hash, get_journal_filepath, get_output_filepath, get_repo_path
+import json
 import sys
 
+config = get_configurations()
+
+# Language pipeline per framework. Only the detected framework's pipeline,
+# and with it its parser and grammar, is imported.
+_PIPELINE_MODULES = {
+    "django": "python_pipeline.run_swagger_generation",
+    "flask": "python_pipeline.run_swagger_generation",
+    "fastapi": "python_pipeline.run_swagger_generation",
+    "express": "nodejs_pipeline.run_swagger_generation",
+    "ruby_on_rails": "rails_pipeline.run_swagger_generation",
+    "golang": "golang_pipeline.run_swagger_generation",
+}
+
+
+def load_pipeline(framework):
+    module_name = _PIPELINE_MODULES.get(framework)
+    if module_name is None:
+        return None
+    return importlib.import_module(module_name).run_swagger_generation
+
 class RunSwagger:
     def __init__(self, project_api_key, openai_api_key, ai_chat_id, is_mcp):
         self.ai_chat_id = ai_chat_id
@@ -23,24 +50,38 @@ class RunSwagger:
         self.framework_identifier = FrameworkIdentifier()
         self.file_scanner = FileScanner()
         self.endpoints_extractor = EndpointsExtractor()
-        self.faiss_index = GenerateFaissIndex()
+        self._faiss_index = None
         self.swagger_generator = SwaggerGeneration()
 
+    @property
+    def faiss_index(self):
+        # FAISS and langchain are only needed by the fallback procedure.
+        if self._faiss_index is None:
+            from faiss_index_generator import GenerateFaissIndex
+            self._faiss_index = GenerateFaissIndex()
+        return self._faiss_index
 
-    def run_python_nodejs_ruby(self, framework):
+
+    def run_python_nodejs_ruby(self, framework, discovery=None, journal=None):
         swagger = None
         try:
-            if framework == "django" or framework == "flask" or framework == "fastapi":
-                swagger = python_swagger_generator(self.user_config['api_host'])
-            elif framework == "express":
-                swagger = nodejs_swagger_generator(self.user_config['api_host'])
-            elif framework == "ruby_on_rails":
-                swagger = ruby_on_rails_swagger_generator(self.user_config['api_host'])
-            elif framework == "golang":
-                swagger = golang_swagger_generator(self.user_config['api_host'])
+            pipeline = load_pipeline(framework)
+            if pipeline is not None:
+                swagger = pipeline(self.user_config['api_host'], discovery, journal)
         except Exception as ex:
             traceback.print_exc()
+            if deadline_expired() or budget_exhausted():
+                print("Run deadline or budget reached before the spec could be generated")
+                exit()
+            print("Fallback to old procedure")
+            return None
+        if deadline_expired() or budget_exhausted():
+            # Out of time or budget: emit whatever was built rather than starting the fallback.
+            return swagger
+        if swagger and not swagger.get("paths") and swagger.get(FAILED_ENDPOINTS_KEY):
+            # Every endpoint failed; a partial spec is only kept when something succeeded.
             print("Fallback to old procedure")
+            return None
         return swagger
 
     def _resolve_ai_chat_id(self, ai_chat_id):
@@ -49,14 +90,92 @@ class RunSwagger:
             return candidate
         return self.user_config.get("ai_chat_id", "null")
 
-    def run(self, ai_chat_id=None):
+    def plan(self, framework, file_paths):
+        """Run the static pipeline with LLM calls recorded instead of sent and report the projection."""
+        recorder = PlanRecorder()
+        if not self.user_config.get('framework', None):
+            model = self.framework_identifier.openai_client.load_openai_model()
+            recorder.record(model, self.framework_identifier.build_messages(file_paths), stage="framework_identification")
+        set_plan_recorder(recorder)
+        start_time = time.time()
+        try:
+            swagger = self.run_python_nodejs_ruby(framework)
+        finally:
+            set_plan_recorder(None)
+        if swagger is None:
+            print(f"No static pipeline completed for {framework}; the fallback procedure is not included in the plan.")
+        print_plan_report(build_plan_report(recorder, framework, time.time() - start_time))
+
+    def _static_framework(self, file_paths):
+        """The configured framework, or the guess from the file layout; never calls the LLM."""
+        if self.user_config.get('framework', None):
+            return self.user_config['framework']
+        framework = self.framework_identifier.guess_framework(file_paths)['framework']
+        if not framework:
+            raise ValueError("No supported framework detected")
+        return framework
+
+    def list_endpoints(self, scope=None):
+        """Endpoints the static pipeline identifies, without generating any of them."""
+        set_run_deadline(None)
+        set_run_budget(None)
+        set_endpoint_scope(scope)
+        framework = self._static_framework(self.file_scanner.get_all_file_paths())
+        discovery = StaticDiscovery()
+        set_inventory_mode(True)
+        try:
+            swagger = self.run_python_nodejs_ruby(framework, discovery)
+        finally:
+            set_inventory_mode(False)
+        if swagger is None:
+            raise RuntimeError(f"The static pipeline for {framework} could not identify endpoints")
+        repo_path = get_repo_path()
+        return {
+            "framework": framework,
+            "endpoints": [inventory_entry(job, repo_path) for job in discovery.identified],
+        }
+
+    def regenerate_endpoint(self, method, path, budget=None):
+        """Generate the endpoints serving ``method path`` again and patch them into the saved spec."""
+        output_filepath = get_output_filepath()
+        if not os.path.exists(output_filepath):
+            raise ValueError(f"No saved spec at {output_filepath}; run a full generation first")
+        with open(output_filepath, "r") as file:
+            spec = json.load(file)
+        inventory = self.list_endpoints()
+        matches = match_endpoints(inventory["endpoints"], method, path)
+        if not matches:
+            raise ValueError(f"No statically identified endpoint serves {method.upper()} {path}")
+        print(f"Regenerating {len(matches)} endpoints for {method.upper()} {path}")
+        set_run_deadline(None)
+        set_run_budget(budget)
+        set_endpoint_scope(EndpointScope(include_endpoints=[entry["key"] for entry in matches]))
+        try:
+            regenerated = self.run_python_nodejs_ruby(inventory["framework"])
+        finally:
+            set_endpoint_scope(None)
+        updated = patch_spec(spec, regenerated or {}, method, path)
+        if not updated:
+            raise RuntimeError(f"Regenerating {method.upper()} {path} failed; the saved spec was left unchanged")
+        self.swagger_generator.save_swagger_json(spec, output_filepath)
+        return {"endpoints": matches, "updated": updated, "output_path": output_filepath}
+
+    def run(self, ai_chat_id=None, resume=False, deadline=None, budget=None, plan=False, scope=None):
+        set_run_deadline(deadline)
+        set_run_budget(budget)
+        set_endpoint_scope(scope)
         resolved_ai_chat_id = self._resolve_ai_chat_id(ai_chat_id if ai_chat_id is not None else self.ai_chat_id)
         try:
+            report_stage(STAGE_FRAMEWORK)
             file_paths = self.file_scanner.get_all_file_paths()
             print("\n***************************************************")
             if self.user_config.get('framework', None):
                 print(f"Using Existing Framework - {self.user_config['framework']}")
                 framework =  self.user_config.get('framework', "")
+            elif plan:
+                framework = self.framework_identifier.guess_framework(file_paths)['framework']
+                if not framework:
+                    raise ValueError("No supported framework detected")
             else:
                 print("Started framework identification")
                 framework = self.framework_identifier.get_framework(file_paths)['framework']
@@ -66,25 +185,47 @@ class RunSwagger:
             print("We do not support this framework currently. Please contact QodexAI support.")
             exit()
         print(f"completed framework identification - {framework}")
+        if plan:
+            self.plan(framework, file_paths)
+            return
         print("\n***************************************************")
         print("Started finding files related to API information")
         try:
-            swagger = self.run_python_nodejs_ruby(framework)
+            report_stage(STAGE_STATIC, framework)
+            discovery = StaticDiscovery()
+            journal = EndpointJournal(get_journal_filepath(), get_git_commit_hash(), resume=resume)
+            swagger = self.run_python_nodejs_ruby(framework, discovery, journal)
+            journal.close()
             if swagger:
+                report_stage(STAGE_SAVING)
                 output_filepath = get_output_filepath()
                 self.swagger_generator.save_swagger_json(swagger, output_filepath)
+                if not swagger.get(FAILED_ENDPOINTS_KEY) and not swagger.get(INCOMPLETE_KEY):
+                    # Keep the journal while endpoints failed or were skipped so --resume can retry them.
+                    journal.discard()
                 #self.upload_swagger_to_qodex(resolved_ai_chat_id)
                 exit()
+            report_stage(STAGE_FALLBACK)
             api_files = self.file_scanner.find_api_files(file_paths, framework)
+            scope = get_endpoint_scope()
+            if scope is not None:
+                api_files = [path for path in api_files if scope.admits_file(path, get_repo_path())]
             print("Completed finding files related to API information")
-            all_endpoints = []
-            for filePath in api_files:
-                endpoints = self.endpoints_extractor.extract_endpoints_with_gpt(filePath, framework)
-                all_endpoints.extend(endpoints)
+            handled_files = discovery.handled_files
+            self.endpoints_extractor.seed(discovery.seed_endpoints, handled_files)
+            if discovery.seed_endpoints:
+                print(f"Reusing {len(discovery.seed_endpoints)} endpoints identified by the static pipeline")
+            all_endpoints = apply_endpoint_scope(self.endpoints_extractor.extract_endpoints(api_files, framework), get_repo_path())
+            # Only embed what the endpoints need when the static stage got far enough to tell.
+            retrieval_files = file_paths
+            if discovery.referenced_files:
+                retrieval_files = sorted(
+                    discovery.referenced_files | {path for path in api_files if path not in handled_files}
+                )
             print("\n***************************************************")
-            print("Started creating faiss index for all files")
-            faiss_vector = self.faiss_index.create_faiss_index(file_paths, framework)
-            print("Completed creating faiss index for all files")
+            print(f"Started creating faiss index for {len(retrieval_files)} files")
+            faiss_vector = self.faiss_index.create_faiss_index(retrieval_files, framework)
+            print("Completed creating faiss index")
             print("Fetching authentication related information")
             authentication_information = self.faiss_index.get_authentication_related_information(faiss_vector)
             print("Completed Fetching authentication related information")
@@ -95,6 +236,7 @@ class RunSwagger:
             print("Oops! looks like we encountered an issue. Please try after some time.")
             exit()
         try:
+            report_stage(STAGE_SAVING)
             output_filepath = get_output_filepath()
             self.swagger_generator.save_swagger_json(swagger, output_filepath)
         except Exception as ex:
@@ -104,6 +246,7 @@ class RunSwagger:
 
 
     def upload_swagger_to_qodex(self, ai_chat_id):
+        import requests
         qodex_api_key = self.user_config['qodex_api_key']
         if qodex_api_key:
             print("Uploading swagger to Qodex.AI")
@@ -131,9 +274,98 @@ class RunSwagger:
         return
 
 
-openai_api_key = sys.argv[1] if len(sys.argv) > 1 else ""
-project_api_key = sys.argv[2] if len(sys.argv) > 2 else ""
-ai_chat_id = sys.argv[3] if len(sys.argv) > 3 else ""
-is_mcp = sys.argv[4] if len(sys.argv) > 4 else False
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate an OpenAPI spec for the current repository.")
+    parser.add_argument("openai_api_key", nargs="?", default="")
+    parser.add_argument("project_api_key", nargs="?", default="")
+    parser.add_argument("ai_chat_id", nargs="?", default="")
+    parser.add_argument("is_mcp", nargs="?", default=False)
+    parser.add_argument("--resume", action="store_true",
+                        help="Reuse endpoints checkpointed by an interrupted run and generate only the missing ones.")
+    parser.add_argument("--deadline", type=float, default=config.run_deadline_seconds or None,
+                        help="Seconds after which no new LLM calls are made and the partial spec is written.")
+    parser.add_argument("--deadline-at", type=float, default=None,
+                        help="Absolute deadline as a Unix timestamp; takes precedence over --deadline.")
+    parser.add_argument("--plan", action="store_true",
+                        help="Estimate LLM calls, tokens, cost and wall time without calling the LLM.")
+    parser.add_argument("--list-endpoints", action="store_true",
+                        help="Print the endpoints the static pipeline identifies as JSON, without calling the LLM.")
+    parser.add_argument("--regenerate-endpoint", nargs=2, metavar=("METHOD", "PATH"),
+                        help="Regenerate one operation, e.g. GET /users/{id}, and patch it into the saved spec.")
+    parser.add_argument("--include-route", dest="include_routes", action="append", metavar="PATTERN",
+                        help="Only generate routes under this prefix or matching this glob, e.g. /v2/public/**. Repeatable.")
+    parser.add_argument("--exclude-route", dest="exclude_routes", action="append", metavar="PATTERN",
+                        help="Skip routes under this prefix or matching this glob. Repeatable.")
+    parser.add_argument("--include-file", dest="include_files", action="append", metavar="GLOB",
+                        help="Only generate endpoints defined in source files matching this glob. Repeatable.")
+    parser.add_argument("--exclude-file", dest="exclude_files", action="append", metavar="GLOB",
+                        help="Skip endpoints defined in source files matching this glob. Repeatable.")
+    parser.add_argument("--include-handler", dest="include_handlers", action="append", metavar="PATTERN",
+                        help="Only generate endpoints whose handler, controller or Controller#action matches. Repeatable.")
+    parser.add_argument("--exclude-handler", dest="exclude_handlers", action="append", metavar="PATTERN",
+                        help="Skip endpoints whose handler, controller or Controller#action matches. Repeatable.")
+    budget_config = config.run_budget
+    parser.add_argument("--max-prompt-tokens", type=int, default=int(budget_config.get("max_prompt_tokens", 0) or 0),
+                        help="Cap on prompt tokens sent to the chat model in this run.")
+    parser.add_argument("--max-completion-tokens", type=int, default=int(budget_config.get("max_completion_tokens", 0) or 0),
+                        help="Cap on completion tokens generated in this run.")
+    parser.add_argument("--max-cost", type=float, default=float(budget_config.get("max_cost_usd", 0) or 0),
+                        help="Cap on the estimated spend in USD for this run, embeddings included.")
+    return parser.parse_args(argv)
+
+
+def build_deadline(args):
+    if args.deadline_at:
+        return RunDeadline(args.deadline_at)
+    if args.deadline:
+        return RunDeadline.after(args.deadline)
+    return None
+
+
+def build_budget(args):
+    return RunBudget(
+        max_prompt_tokens=args.max_prompt_tokens,
+        max_completion_tokens=args.max_completion_tokens,
+        max_cost_usd=args.max_cost,
+    )
+
+
+def build_scope(args):
+    """Scope from the command line; a filter given on the command line replaces the configured one."""
+    scope_config = config.scope
+    filters = {
+        name: getattr(args, name) if getattr(args, name) is not None else scope_config.get(name) or []
+        for name in ("include_routes", "exclude_routes", "include_files", "exclude_files", "include_handlers", "exclude_handlers")
+    }
+    scope = EndpointScope(**filters)
+    return scope if scope.enabled else None
+
+
+def main(argv=None, is_mcp=None, run=None):
+    """
+    Run the CLI in ``run``, or in a fresh ``RunContext`` so nothing carries
+    over from an earlier call in the same process.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if is_mcp is not None:
+        args.is_mcp = is_mcp
+    with activate(run or RunContext()):
+        try:
+            runner = RunSwagger(args.project_api_key, args.openai_api_key, args.ai_chat_id, args.is_mcp)
+            if args.list_endpoints:
+                print(json.dumps(runner.list_endpoints(build_scope(args)), indent=2))
+            elif args.regenerate_endpoint:
+                method, path = args.regenerate_endpoint
+                print(json.dumps(runner.regenerate_endpoint(method, path, build_budget(args)), indent=2))
+            else:
+                runner.run(
+                    args.ai_chat_id, resume=args.resume, deadline=build_deadline(args), budget=build_budget(args),
+                    plan=args.plan, scope=build_scope(args),
+                )
+        finally:
+            if get_run_budget() is not None and not (args.plan or args.list_endpoints):
+                print(get_run_budget().summary())
+
 
-RunSwagger(project_api_key, openai_api_key, ai_chat_id, is_mcp).run(ai_chat_id)
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from llm_client import OpenAiClient
-from config import Configurations
+from config import get_configurations
+from run_context import bind
 import prompts
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
@@ -8,7 +9,7 @@ import os, re
 import datetime
 from utils import get_git_commit_hash, get_github_repo_url, get_repo_path, get_repo_name, format_repo_name
 
-config = Configurations()
+config = get_configurations()
 
 class SwaggerGeneration:
     def __init__(self):
@@ -45,7 +46,7 @@ class SwaggerGeneration:
             return endpoint["path"], endpoint["method"].lower(), endpoint_swagger
 
         with ThreadPoolExecutor(max_workers=8) as executor:
-            future_to_endpoint = {executor.submit(process_endpoint, endpoint): endpoint
+            future_to_endpoint = {executor.submit(bind(process_endpoint), endpoint): endpoint
                                   for endpoint in endpoints}
 
             for future in as_completed(future_to_endpoint):
@@ -1,13 +1,27 @@
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from typing import Optional
-import os, subprocess, shutil, sys
+import asyncio, json, os, subprocess, shutil, sys, threading, time, uuid
 
 APP_NAME = "SwaggerGenerator MCP"
 DEFAULT_WORK_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_SCRIPT_URL = "https://raw.githubusercontent.com/qodex-ai/apimesh/main/bootstrap_mcp_runner.sh"
+# Time reserved after the run deadline for writing the partial spec and cleanup.
+DEADLINE_GRACE_SECONDS = 30
+# Finished jobs kept for status and result calls.
+MAX_FINISHED_JOBS = 20
+# Log characters returned with a result; the spec itself stays on disk.
+RESULT_LOG_CHARS = 4000
 
 mcp = FastMCP(APP_NAME)
 
+# Generator service from the package this file ships in, loaded once and kept
+# warm across tool calls. None until loaded, False when the package is absent.
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
 def _require(name: str, val: Optional[str]):
     if not val or str(val).strip().lower() == "null":
         raise ValueError(f"Missing required parameter: {name}")
@@ -19,28 +33,37 @@ def _need(cmd: str):
 def _ensure_dir(p: str):
     os.makedirs(p, exist_ok=True)
 
-@mcp.tool()
-def run_swagger_generation(
-    openai_api_key: str,
-    repo_path: str,
-    timeout_seconds: int = 900
-) -> dict:
+def _load_generator():
     """
-    This tool takes the path of the repository, openai_api_key and timeout to generate a openapi spec swagger json for that repo.
+    Import the generator from the package next to this file, or from
+    APIMESH_PACKAGE_DIR. Returns None when this file was downloaded on its own.
     """
-    _require("openai_api_key", openai_api_key)
-    _require("repo_path", repo_path)
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            package_dir = os.path.abspath(os.environ.get("APIMESH_PACKAGE_DIR") or DEFAULT_WORK_DIR)
+            _SERVICE = False
+            if os.path.exists(os.path.join(package_dir, "swagger_daemon.py")):
+                if package_dir not in sys.path:
+                    sys.path.insert(0, package_dir)
+                os.environ.setdefault("APIMESH_CONFIG_PATH", os.path.join(package_dir, "config.yml"))
+                try:
+                    from swagger_daemon import GeneratorService
+                    service = GeneratorService()
+                    service.warm_up()
+                    _SERVICE = service
+                except ImportError as exc:
+                    print(f"[mcp] generator package not importable ({exc}); using the bootstrap runner", file=sys.stderr)
+        return _SERVICE or None
 
+def _run_bootstrap(job, openai_api_key: str, repo_path: str, extra_args: list, timeout_seconds: int) -> dict:
+    """Download the runner script, which installs the generator into a fresh venv and runs it."""
     for dep in ("bash", "curl", "git", "python3", "pip3"):
         _need(dep)
 
     base_dir = DEFAULT_WORK_DIR
     _ensure_dir(base_dir)
 
-    repo_path = os.path.abspath(os.path.expanduser(repo_path))
-    if not os.path.isdir(repo_path):
-        raise ValueError(f"repo_path is not a directory: {repo_path}")
-
     # --- fetch script (be sure it's a STRING, not a tuple) ---
     script_url = DEFAULT_SCRIPT_URL  # <-- no trailing comma
     script_path = os.path.join(base_dir, "bootstrap_mcp_runner.sh")  # <-- no trailing comma
@@ -78,27 +101,281 @@ def run_swagger_generation(
         "--project-api-key", "null",
         "--ai-chat-id", "null",
         "--is-mcp", "true",
-    ]
+    ] + extra_args
     print(f"[mcp] running: {cmd} (cwd={base_dir})", file=sys.stderr)
 
-    proc = subprocess.run(
+    proc = subprocess.Popen(
         cmd,
         cwd=base_dir,
         env=env,
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
-        timeout=timeout_seconds,
     )
-    os.remove(script_path)
+    job.process = proc
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout_seconds)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        stdout, stderr = proc.communicate()
+    finally:
+        os.remove(script_path)
 
     result = {
         "exit_code": proc.returncode,
         "work_dir": base_dir,
-        "stdout": proc.stdout[-200_000:],
-        "stderr": proc.stderr[-200_000:],
+        "output_path": os.path.join(repo_path, "apimesh", "swagger.json"),
+        "log": (stdout + stderr)[-200_000:],
+    }
+    return result
+
+class _Job:
+    def __init__(self, repo_path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.repo_path = repo_path
+        self.state = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.progress = None
+        self.process = None
+        self.cancel_requested = False
+        self.result = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def status(self) -> dict:
+        status = {
+            "job_id": self.id,
+            "repo_path": self.repo_path,
+            "state": self.state,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.created_at, 1),
+        }
+        if self.progress is not None:
+            status["progress"] = self.progress.snapshot()
+        if self.error:
+            status["error"] = self.error
+        return status
+
+def _notifier(ctx: Optional[Context], job: _Job):
+    """Send progress to the client that started the job as structured log notifications."""
+    if ctx is None:
+        return None
+    session = ctx.session
+    loop = asyncio.get_running_loop()
+
+    def _send(snapshot: dict):
+        data = {"job_id": job.id, "state": job.state, **snapshot}
+        asyncio.run_coroutine_threadsafe(session.send_log_message(level="info", data=data, logger="apimesh"), loop)
+
+    return _send
+
+def _summarize_spec(output_path: str) -> dict:
+    try:
+        with open(output_path, "r") as file:
+            spec = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    paths = spec.get("paths") or {}
+    incomplete = spec.get("x-apimesh-incomplete")
+    return {
+        "paths": len(paths),
+        "operations": sum(len(operations) for operations in paths.values() if isinstance(operations, dict)),
+        "incomplete": bool(incomplete),
+        "incomplete_reason": incomplete.get("reason") if isinstance(incomplete, dict) else None,
+        "failed_endpoints": len(spec.get("x-apimesh-failed-endpoints") or []),
+    }
+
+def _run_job(job: _Job, openai_api_key: str, extra_args: list, timeout_seconds: int, on_update):
+    service = _load_generator()
+    try:
+        if service is not None:
+            from run_progress import RunProgress
+            with job.lock:
+                job.progress = RunProgress(on_update)
+                job.progress.cancel_requested = job.cancel_requested
+
+            def _on_start():
+                with job.lock:
+                    if not job.cancel_requested:
+                        job.state = "running"
+
+            result = service.generate(
+                {"repo_path": job.repo_path, "openai_api_key": openai_api_key, "args": extra_args},
+                progress=job.progress,
+                on_start=_on_start,
+            )
+        else:
+            with job.lock:
+                if job.cancel_requested:
+                    return
+                job.state = "running"
+            result = _run_bootstrap(job, openai_api_key, job.repo_path, extra_args, timeout_seconds)
+        job.result = result
+        if job.cancel_requested:
+            job.state = "cancelled"
+        elif result["exit_code"] == 0:
+            job.state = "succeeded"
+        else:
+            job.state = "failed"
+    except Exception as exc:
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.state = "failed"
+    finally:
+        if job.cancel_requested and job.state in ("queued", "running"):
+            job.state = "cancelled"
+        job.finished_at = time.time()
+        if on_update is not None and job.progress is None:
+            on_update({"stage": "done"})
+
+def _get_job(job_id: str) -> _Job:
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    if job is None:
+        raise ValueError(f"Unknown job_id: {job_id}")
+    return job
+
+def _remember(job: _Job):
+    with _JOBS_LOCK:
+        _JOBS[job.id] = job
+        finished = sorted((j for j in _JOBS.values() if j.finished_at), key=lambda j: j.finished_at)
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _JOBS[old.id]
+
+@mcp.tool()
+async def start_swagger_generation(
+    openai_api_key: str,
+    repo_path: str,
+    timeout_seconds: int = 900,
+    resume: bool = False,
+    ctx: Context = None,
+) -> dict:
+    """
+    Start generating an OpenAPI spec for the repository at repo_path and return a job_id immediately.
+    Poll get_swagger_generation_status for progress (stage, endpoints done/total, tokens used, ETA) and
+    call get_swagger_generation_result when it finishes. Progress is also sent as log notifications.
+    Set resume to continue a run that timed out, reusing the endpoints it already generated.
+    Shortly before timeout_seconds the run stops making LLM calls and writes the partial spec.
+    """
+    started_at = time.time()
+    _require("openai_api_key", openai_api_key)
+    _require("repo_path", repo_path)
+
+    repo_path = os.path.abspath(os.path.expanduser(repo_path))
+    if not os.path.isdir(repo_path):
+        raise ValueError(f"repo_path is not a directory: {repo_path}")
+
+    extra_args = ["--resume"] if resume else []
+    grace = min(DEADLINE_GRACE_SECONDS, timeout_seconds / 10)
+    extra_args += ["--deadline-at", str(started_at + timeout_seconds - grace)]
+
+    job = _Job(repo_path)
+    _remember(job)
+    threading.Thread(
+        target=_run_job,
+        args=(job, openai_api_key, extra_args, timeout_seconds, _notifier(ctx, job)),
+        name=f"swagger-job-{job.id}",
+        daemon=True,
+    ).start()
+    print(f"[mcp] started job {job.id} for {repo_path!r}", file=sys.stderr)
+    return job.status()
+
+@mcp.tool()
+def get_swagger_generation_status(job_id: str) -> dict:
+    """
+    Return the state of a generation job (queued, running, succeeded, failed or cancelled) and its
+    progress: stage, endpoints total/done/failed/skipped, tokens used, estimated cost and ETA in seconds.
+    """
+    return _get_job(job_id).status()
+
+@mcp.tool()
+def get_swagger_generation_result(job_id: str, include_spec: bool = False, log_chars: int = RESULT_LOG_CHARS) -> dict:
+    """
+    Return the outcome of a finished generation job: where the spec was written, a summary of it
+    (paths, operations, whether it is incomplete, failed endpoints) and the tail of the run log.
+    Set include_spec to also return the spec itself.
+    """
+    job = _get_job(job_id)
+    result = job.status()
+    if job.finished_at is None:
+        return result
+    outcome = job.result or {}
+    output_path = outcome.get("output_path")
+    result["exit_code"] = outcome.get("exit_code")
+    result["output_path"] = output_path
+    if output_path and os.path.exists(output_path) and os.path.getmtime(output_path) >= job.created_at:
+        result["spec_summary"] = _summarize_spec(output_path)
+        if include_spec:
+            with open(output_path, "r") as file:
+                result["spec"] = json.load(file)
+    log = outcome.get("log", "")
+    result["log_tail"] = log[-max(0, log_chars):] if log_chars else ""
+    return result
+
+@mcp.tool()
+def cancel_swagger_generation(job_id: str) -> dict:
+    """
+    Cancel a generation job. A queued job never starts; a running job stops making LLM calls and
+    writes the spec generated so far, marked incomplete.
+    """
+    job = _get_job(job_id)
+    with job.lock:
+        if job.finished_at is None:
+            job.cancel_requested = True
+            if job.state == "queued":
+                if job.progress is not None:
+                    job.progress.cancel_requested = True
+            elif job.progress is not None:
+                job.progress.cancel()
+            elif job.process is not None:
+                job.process.terminate()
+    return job.status()
+
+def _require_generator():
+    service = _load_generator()
+    if service is None:
+        raise RuntimeError("This tool needs swagger_mcp.py to run from a checkout of the generator package")
+    return service
+
+@mcp.tool()
+async def list_api_endpoints(repo_path: str, include_routes: Optional[list] = None) -> dict:
+    """
+    List the API endpoints found by static analysis of the repository at repo_path: HTTP method, route,
+    handler, source file and line. Makes no LLM calls and takes seconds. include_routes optionally
+    restricts the listing to route prefixes or globs such as /v2/**.
+    """
+    _require("repo_path", repo_path)
+    args = []
+    for pattern in include_routes or []:
+        args += ["--include-route", str(pattern)]
+    # Off the event loop, so status and cancel calls for running jobs are answered meanwhile.
+    result = await asyncio.to_thread(lambda: _require_generator().list_endpoints({"repo_path": repo_path, "args": args}))
+    result.pop("log", None)
+    result["count"] = len(result["endpoints"])
+    return result
+
+@mcp.tool()
+async def regenerate_api_endpoint(openai_api_key: str, repo_path: str, method: str, path: str) -> dict:
+    """
+    Regenerate the OpenAPI operation for one HTTP method and path, e.g. GET /users/{id}, and patch it
+    into the spec saved by a previous generation. Only the endpoints serving that operation are sent
+    to the LLM.
+    """
+    _require("openai_api_key", openai_api_key)
+    _require("repo_path", repo_path)
+    _require("method", method)
+    _require("path", path)
+    request = {
+        "repo_path": repo_path,
+        "openai_api_key": openai_api_key,
+        "method": method,
+        "path": path,
     }
+    result = await asyncio.to_thread(lambda: _require_generator().regenerate_endpoint(request))
+    result["log_tail"] = result.pop("log", "")[-RESULT_LOG_CHARS:]
     return result
 
 if __name__ == "__main__":
+    # Import the generator while the client finishes its handshake.
+    threading.Thread(target=_load_generator, daemon=True).start()
     print("[mcp] server booted; waiting on stdio", file=sys.stderr)
     mcp.run()
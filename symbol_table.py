@@ -0,0 +1,139 @@
+"""
+Compact repository-wide symbol tables.
+
+The Go and Rails pipelines index every function (and class) of a repository
+to resolve handlers and parent controllers. A dict per symbol repeats its
+keys and a copy of its file path; ``SymbolTable`` keeps one row per symbol
+in columns instead: names and paths interned once in a ``StringPool`` and
+stored as integer ids, line numbers in ``array("I")``. Rows are handed out as
+slotted ``Symbol`` records built on demand, so the resident cost of a symbol
+is a few array slots rather than a dict.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class StringPool:
+    """Each distinct string stored once, addressed by an integer id; id 0 is None."""
+
+    __slots__ = ("_strings", "_ids")
+
+    def __init__(self):
+        self._strings: List[Optional[str]] = [None]
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, text: Optional[str]) -> int:
+        if text is None:
+            return 0
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(text)
+            self._ids[text] = string_id
+        return string_id
+
+    def id_of(self, text: str) -> int:
+        """The id of ``text``, or 0 if it was never interned."""
+        return self._ids.get(text, 0)
+
+    def get(self, string_id: int) -> Optional[str]:
+        return self._strings[string_id]
+
+
+class Symbol:
+    """
+    One row of a ``SymbolTable``. ``parent`` is the symbol's superclass or
+    receiver where the table records one; ``members`` is the row range of
+    its members in the table they were added to, e.g. a class's methods.
+    """
+
+    __slots__ = ("name", "file_path", "start_line", "end_line", "parent", "members")
+
+    def __init__(self, name: str, file_path: str, start_line: Optional[int], end_line: Optional[int],
+                 parent: Optional[str] = None, members: Tuple[int, int] = (0, 0)):
+        self.name = name
+        self.file_path = file_path
+        self.start_line = start_line
+        self.end_line = end_line
+        self.parent = parent
+        self.members = members
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.name!r}, {self.file_path!r}, {self.start_line}, {self.end_line})"
+
+
+class SymbolTable:
+    """
+    Append-only table of symbols, looked up by name in insertion order.
+    Line numbers are 1-based; a missing line is stored as 0 and read back as None.
+    """
+
+    def __init__(self, strings: Optional[StringPool] = None):
+        self.strings = strings if strings is not None else StringPool()
+        self._names = array("I")
+        self._files = array("I")
+        self._starts = array("I")
+        self._ends = array("I")
+        self._parents = array("I")
+        self._member_starts = array("I")
+        self._member_ends = array("I")
+        self._rows_by_name: Dict[int, array] = {}
+
+    def add(self, name: str, file_path: str, start_line: Optional[int], end_line: Optional[int],
+            parent: Optional[str] = None, members: Tuple[int, int] = (0, 0)) -> int:
+        """Append a symbol and return its row."""
+        row = len(self._names)
+        name_id = self.strings.intern(name)
+        self._names.append(name_id)
+        self._files.append(self.strings.intern(file_path))
+        self._starts.append(start_line if isinstance(start_line, int) and start_line > 0 else 0)
+        self._ends.append(end_line if isinstance(end_line, int) and end_line > 0 else 0)
+        self._parents.append(self.strings.intern(parent))
+        self._member_starts.append(members[0])
+        self._member_ends.append(members[1])
+        rows = self._rows_by_name.get(name_id)
+        if rows is None:
+            rows = self._rows_by_name[name_id] = array("I")
+        rows.append(row)
+        return row
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        name_id = self.strings.id_of(name)
+        return bool(name_id) and bool(self._rows_by_name.get(name_id))
+
+    def symbol(self, row: int) -> Symbol:
+        strings = self.strings
+        return Symbol(
+            strings.get(self._names[row]),
+            strings.get(self._files[row]),
+            self._starts[row] or None,
+            self._ends[row] or None,
+            strings.get(self._parents[row]),
+            (self._member_starts[row], self._member_ends[row]),
+        )
+
+    def lookup(self, name: str, limit: Optional[int] = None) -> List[Symbol]:
+        """Symbols called ``name``, in the order they were added; at most ``limit``."""
+        name_id = self.strings.id_of(name)
+        if not name_id:
+            # Id 0 is None, not a name: an unknown name has no rows.
+            return []
+        rows = self._rows_by_name.get(name_id)
+        if not rows:
+            return []
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.symbol(row) for row in rows]
+
+    def first(self, name: str) -> Optional[Symbol]:
+        symbols = self.lookup(name, limit=1)
+        return symbols[0] if symbols else None
+
+    def rows(self, start: int, end: int) -> Iterator[Symbol]:
+        """Symbols of rows ``start`` up to ``end``, e.g. a ``members`` range."""
+        for row in range(start, end):
+            yield self.symbol(row)
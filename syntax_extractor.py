@@ -0,0 +1,153 @@
+"""
+Shared tree-sitter extraction helpers used by the language pipelines.
+
+Grammars are loaded lazily the first time a language is used, parsers are
+handed out per thread so pipelines can parse from inside their executors,
+and queries are compiled once per language so every element kind a pipeline
+cares about is collected from a single ``QueryCursor`` pass.
+"""
+
+import importlib
+import os
+import threading
+import weakref
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from tree_sitter import Language, Node, Parser, Query, QueryCursor, Tree
+
+_GRAMMAR_MODULES = {
+    "python": "tree_sitter_python",
+    "javascript": "tree_sitter_javascript",
+    "go": "tree_sitter_go",
+    "ruby": "tree_sitter_ruby",
+}
+_LANGUAGES: Dict[str, Language] = {}
+_PARSER_POOLS: Dict[str, "ParserPool"] = {}
+_REGISTRY_LOCK = threading.Lock()
+_QUERY_EXTRACTORS: "weakref.WeakSet[QueryExtractor]" = weakref.WeakSet()
+
+
+def _reset_locks() -> None:
+    # Metadata workers are forked while other threads may be importing a
+    # grammar or compiling a query.
+    global _REGISTRY_LOCK
+    _REGISTRY_LOCK = threading.Lock()
+    for extractor in list(_QUERY_EXTRACTORS):
+        extractor._lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_locks)
+
+
+def get_language(name: str) -> Language:
+    """Import the grammar package for ``name`` on first use and cache it."""
+    language = _LANGUAGES.get(name)
+    if language is not None:
+        return language
+    with _REGISTRY_LOCK:
+        language = _LANGUAGES.get(name)
+        if language is None:
+            module_name = _GRAMMAR_MODULES.get(name)
+            if module_name is None:
+                raise ValueError(f"Unsupported tree-sitter language: {name}")
+            grammar = importlib.import_module(module_name)
+            language = Language(grammar.language())
+            _LANGUAGES[name] = language
+    return language
+
+
+class ParserPool:
+    """
+    Hands out one ``Parser`` per thread for a language.
+
+    A tree-sitter ``Parser`` keeps mutable state between calls, so a single
+    module-level instance cannot be shared by executor threads.
+    """
+
+    def __init__(self, language_name: str):
+        self.language_name = language_name
+        self._local = threading.local()
+
+    @property
+    def language(self) -> Language:
+        return get_language(self.language_name)
+
+    def get(self) -> Parser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = Parser(self.language)
+            self._local.parser = parser
+        return parser
+
+    def parse(self, source: bytes) -> Tree:
+        return self.get().parse(source)
+
+
+def get_parser_pool(name: str) -> ParserPool:
+    pool = _PARSER_POOLS.get(name)
+    if pool is not None:
+        return pool
+    with _REGISTRY_LOCK:
+        pool = _PARSER_POOLS.get(name)
+        if pool is None:
+            if name not in _GRAMMAR_MODULES:
+                raise ValueError(f"Unsupported tree-sitter language: {name}")
+            pool = ParserPool(name)
+            _PARSER_POOLS[name] = pool
+    return pool
+
+
+class QueryExtractor:
+    """
+    Lazily compiled tree-sitter query that returns all captures in one pass.
+
+    The compiled ``Query`` is shared; a fresh ``QueryCursor`` is created per
+    call because cursors carry execution state.
+    """
+
+    def __init__(self, language_name: str, source: str):
+        self._language_name = language_name
+        self._source = source
+        self._query: Optional[Query] = None
+        self._lock = threading.Lock()
+        _QUERY_EXTRACTORS.add(self)
+
+    @property
+    def query(self) -> Query:
+        if self._query is None:
+            with self._lock:
+                if self._query is None:
+                    self._query = Query(get_language(self._language_name), self._source)
+        return self._query
+
+    def captures(self, node: Node) -> Dict[str, List[Node]]:
+        """
+        Run the query once over ``node`` and return captures grouped by name,
+        each list in document order so callers can rely on positional pairing.
+        """
+        captures = QueryCursor(self.query).captures(node)
+        for nodes in captures.values():
+            nodes.sort(key=_node_position)
+        return captures
+
+
+def _node_position(node: Node):
+    return node.start_byte, -node.end_byte
+
+
+def iter_nodes(root: Node, node_types: Optional[Iterable[str]] = None) -> Iterator[Node]:
+    """
+    Pre-order walk over ``root`` using a ``TreeCursor`` and yield nodes whose
+    type is in ``node_types`` (or every node when ``node_types`` is None).
+    """
+    wanted = frozenset(node_types) if node_types is not None else None
+    cursor = root.walk()
+    while True:
+        node = cursor.node
+        if wanted is None or node.type in wanted:
+            yield node
+        if cursor.goto_first_child():
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return
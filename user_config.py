@@ -3,22 +3,57 @@ Utility helpers for capturing and persisting user-specific configuration
 for the Swagger Generator CLI.
 """
 
-import os, json
-from config import Configurations
+import os, json, threading
+from types import MappingProxyType
+from config import get_configurations
+from run_context import current_run
 from utils import get_repo_name, get_repo_path
-configurations = Configurations()
+configurations = get_configurations()
 
-# Get JSON config file path from environment variable
-config_file = os.environ.get("APIMESH_USER_CONFIG_PATH")
-if config_file is None:
-    raise ValueError(
-        "APIMESH_USER_CONFIG_PATH environment variable is not set. "
-        "Please set it to the path of your config.json file."
-    )
 
-# Ensure the directory exists
-config_dir = os.path.dirname(config_file)
-os.makedirs(config_dir, exist_ok=True)
+def get_user_config_filepath():
+    """
+    Path of the user's JSON config file: the current run's, else
+    APIMESH_USER_CONFIG_PATH, read on every call so a long-running process
+    can serve several repositories.
+    """
+    config_file = current_run().user_config_path or os.environ.get("APIMESH_USER_CONFIG_PATH")
+    if config_file is None:
+        raise ValueError(
+            "APIMESH_USER_CONFIG_PATH environment variable is not set. "
+            "Please set it to the path of your config.json file."
+        )
+    # Ensure the directory exists
+    config_dir = os.path.dirname(config_file)
+    if config_dir:
+        os.makedirs(config_dir, exist_ok=True)
+    return config_file
+
+
+# Parsed user config by (path, mtime, size); credential and model lookups
+# happen on every LLM call and must not re-read the file each time.
+_USER_CONFIGS = {}
+_USER_CONFIGS_LOCK = threading.Lock()
+
+
+def read_user_config(config_file=None):
+    """
+    Read-only view of the user's JSON config, parsed once per change to the
+    file. Raises FileNotFoundError if it does not exist.
+    """
+    config_file = config_file or get_user_config_filepath()
+    stat = os.stat(config_file)
+    key = (os.path.abspath(config_file), stat.st_mtime_ns, stat.st_size)
+    with _USER_CONFIGS_LOCK:
+        user_config = _USER_CONFIGS.get(key)
+        if user_config is None:
+            with open(config_file, "r") as file:
+                user_config = MappingProxyType(json.load(file))
+            for stale in [cached for cached in _USER_CONFIGS if cached[0] == key[0]]:
+                del _USER_CONFIGS[stale]
+            _USER_CONFIGS[key] = user_config
+        return user_config
+
 
 class UserConfigurations:
     def __init__(self, project_api_key, openai_api_key, ai_chat_id, is_mcp):
@@ -28,15 +63,20 @@ class UserConfigurations:
 
     @staticmethod
     def load_user_config():
+        config_file = get_user_config_filepath()
         if os.path.exists(config_file):
-            with open(config_file, "r") as file:
-                return json.load(file)
+            return dict(read_user_config(config_file))
         return {}
 
     @staticmethod
     def save_user_config(config):
+        config_file = get_user_config_filepath()
         with open(config_file, "w") as file:
             json.dump(config, file, indent=4)
+        with _USER_CONFIGS_LOCK:
+            # A rewrite within the mtime granularity could otherwise look unchanged.
+            for stale in [cached for cached in _USER_CONFIGS if cached[0] == os.path.abspath(config_file)]:
+                del _USER_CONFIGS[stale]
 
     @staticmethod
     def _sanitize_cli_value(value):
@@ -55,6 +95,7 @@ class UserConfigurations:
 
     def add_user_configs(self, project_api_key, openai_api_key):
         user_config = self.load_user_config()
+        stored_user_config = dict(user_config)
         self._print_section_header("OpenAI Credentials")
         stored_openai_api_key = user_config.get("openai_api_key", "")
         sanitized_openai_api_key = self._sanitize_cli_value(openai_api_key)
@@ -66,23 +107,22 @@ class UserConfigurations:
         else:
             resolved_openai_api_key = stored_openai_api_key
         user_config["openai_api_key"] = resolved_openai_api_key
-        self.save_user_config(user_config)
         print(f"  ✓ API Key: {resolved_openai_api_key}")
 
         self._print_section_header("Model Selection")
         default_openai_model = user_config.get("openai_model", "gpt-4.1")
         openai_model = default_openai_model
         user_config["openai_model"] = openai_model
-        self.save_user_config(user_config)
         print(f"  ✓ AI Model: {openai_model}")
 
         self._print_section_header("API Host Configuration")
         default_api_host = user_config.get("api_host", "https://api.example.com")
         api_host = default_api_host
         user_config["api_host"] = api_host
-        self.save_user_config(user_config)
+        if user_config != stored_user_config:
+            self.save_user_config(user_config)
         print(f"  ✓ API Host: {api_host}")
         # Check if the user entered something
         if not api_host.strip():
             print("  ✗ No api host provided. Exiting...")
-            exit(1)
\ No newline at end of file
+            exit(1)
@@ -1,20 +1,25 @@
-import tiktoken
 import subprocess
 import os
 import re
 
+from git_metadata import read_git_metadata
+from run_context import current_run
+
 def num_tokens_from_string(string: str, encoding_name: str = "cl100k_base") -> int:
+    # Imported on first use so commands that never count tokens skip loading it.
+    import tiktoken
     encoding = tiktoken.get_encoding(encoding_name)
     return len(encoding.encode(string))
 
 def get_repo_path() -> str:
     """
-    Get the repository path from APIMESH_USER_REPO_PATH environment variable.
+    Get the repository path of the current run, or from the
+    APIMESH_USER_REPO_PATH environment variable outside one.
     
     Returns:
         Repository path as a string (assumes APIMESH_USER_REPO_PATH is always set).
     """
-    repo_path = os.environ["APIMESH_USER_REPO_PATH"]
+    repo_path = current_run().repo_path or os.environ["APIMESH_USER_REPO_PATH"]
     return os.path.abspath(repo_path)
 
 def get_repo_name() -> str:
@@ -26,23 +31,8 @@ def get_repo_name() -> str:
     """
     repo_path = get_repo_path()
     try:
-        original_dir = os.getcwd()
-        try:
-            os.chdir(repo_path)
-            result = subprocess.run(
-                ['git', 'remote', 'get-url', 'origin'],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                check=False
-            )
-            os.chdir(original_dir)
-        except Exception:
-            os.chdir(original_dir)
-            return os.path.basename(repo_path)
-        
-        if result.returncode == 0 and result.stdout:
-            remote_url = result.stdout.strip()
+        remote_url = read_git_metadata(repo_path)["origin_url"]
+        if remote_url:
             # Extract repo name from various git URL formats
             # SSH: git@github.com:owner/repo.git -> repo
             # HTTPS: https://github.com/owner/repo.git -> repo
@@ -92,13 +82,14 @@ def format_repo_name(repo_name: str) -> str:
 
 def get_output_filepath() -> str:
     """
-    Get the output filepath from APIMESH_OUTPUT_FILEPATH environment variable.
+    Get the output filepath of the current run, or from the
+    APIMESH_OUTPUT_FILEPATH environment variable outside one.
     If not set, defaults to {repo_path}/apimesh/swagger.json
     
     Returns:
         Output filepath as a string.
     """
-    output_filepath = os.environ.get("APIMESH_OUTPUT_FILEPATH")
+    output_filepath = current_run().output_path or os.environ.get("APIMESH_OUTPUT_FILEPATH")
     if output_filepath:
         return os.path.abspath(output_filepath)
     # Default to repo_path/apimesh/swagger.json
@@ -115,24 +106,8 @@ def get_github_repo_url() -> str:
         GitHub repository URL (e.g., "https://github.com/owner/repo") or empty string if not available.
     """
     try:
-        repo_path = get_repo_path()
-        original_dir = os.getcwd()
-        try:
-            os.chdir(repo_path)
-            result = subprocess.run(
-                ['git', 'remote', 'get-url', 'origin'],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                check=False
-            )
-            os.chdir(original_dir)
-        except Exception:
-            os.chdir(original_dir)
-            return ""
-        
-        if result.returncode == 0 and result.stdout:
-            remote_url = result.stdout.strip()
+        remote_url = read_git_metadata(get_repo_path())["origin_url"]
+        if remote_url:
             # Convert SSH format (git@github.com:owner/repo.git) to HTTPS format
             # or extract from HTTPS format (https://github.com/owner/repo.git)
             ssh_pattern = r'git@github\.com:(.+?)(?:\.git)?$'
@@ -164,25 +139,48 @@ def get_git_commit_hash() -> str:
         Git commit hash as a string, or empty string if not available.
     """
     try:
-        repo_path = get_repo_path()
-        # Change to repo directory for git command
-        original_dir = os.getcwd()
-        try:
-            os.chdir(repo_path)
-            result = subprocess.run(
-                ['git', 'rev-parse', 'HEAD'],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                check=False
-            )
-            os.chdir(original_dir)
-        except Exception:
-            os.chdir(original_dir)
-            return ""
-        
-        if result.returncode == 0 and result.stdout:
-            return result.stdout.strip()
+        return read_git_metadata(get_repo_path())["commit"]
+    except Exception:
         return ""
+
+
+def get_file_churn(max_commits: int = 500) -> dict:
+    """
+    Count how many of the last ``max_commits`` commits touched each file.
+    ``--relative`` keeps paths relative to the repository path, which may be
+    a subdirectory of the git work tree.
+
+    Returns:
+        Mapping of absolute file path to commit count, empty if git is unavailable.
+    """
+    repo_path = get_repo_path()
+    try:
+        result = subprocess.run(
+            ['git', 'log', f'-n{max_commits}', '--format=', '--name-only', '--relative'],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            timeout=30,
+            check=False
+        )
     except Exception:
-        return ""
\ No newline at end of file
+        return {}
+    if result.returncode != 0:
+        return {}
+    churn = {}
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if line:
+            path = os.path.join(repo_path, line)
+            churn[path] = churn.get(path, 0) + 1
+    return churn
+
+
+def get_journal_filepath() -> str:
+    """
+    Get the checkpoint journal path for the current run, stored next to the
+    output file so it survives the bootstrap cleanup of the tool checkout.
+    """
+    output_filepath = get_output_filepath()
+    base, _ = os.path.splitext(output_filepath)
+    return base + ".journal.jsonl"